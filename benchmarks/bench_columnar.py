@@ -0,0 +1,63 @@
+"""Load/save time and file size of CSV vs Parquet vs Arrow IPC for a multi-well test set.
+
+Run from the repo root:  python -m benchmarks.bench_columnar --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from ipr import columnar
+from ipr.gas_batch import fit_gas_wells
+from ipr.synthetic import GAS_COLUMNS, gas_well_tests
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--points", type=int, default=5)
+    args = parser.parse_args()
+
+    data = gas_well_tests(args.rows // args.points, args.points)
+    fit = columnar.fit_frame(fit_gas_wells(data))
+    projection = [GAS_COLUMNS[0], GAS_COLUMNS[3]]
+    print(f"{len(data):,} test rows, {len(fit):,} wells\n")
+    print(f"{'format':10s} {'save s':>8s} {'load s':>8s} {'2 cols s':>9s} {'size MB':>9s}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, suffix in (("csv", ".csv"), ("parquet", ".parquet"), ("arrow", ".arrow")):
+            path = os.path.join(tmp, "tests" + suffix)
+            t_save, _ = timed(lambda: columnar.write_frame(data, path))
+            if fmt == "csv":
+                t_load, _ = timed(lambda: pd.read_csv(path))
+                t_proj, _ = timed(lambda: pd.read_csv(path, usecols=projection))
+            else:
+                t_load, _ = timed(lambda: columnar.read_frame(path))
+                t_proj, _ = timed(lambda: columnar.read_frame(path, columns=projection))
+            size = os.path.getsize(path) / 1e6
+            print(f"{fmt:10s} {t_save:8.3f} {t_load:8.3f} {t_proj:9.3f} {size:9.1f}")
+
+        # zero-copy: an Arrow table over a memory map, without converting to pandas
+        path = os.path.join(tmp, "tests.arrow")
+        t_map, table = timed(lambda: columnar.read_table(path))
+        print(f"\narrow memory-mapped table (no pandas conversion): {t_map * 1000:.2f} ms, "
+              f"{table.num_rows:,} rows")
+
+        print(f"\n{'results':10s} {'save s':>8s} {'load s':>8s} {'size MB':>9s}")
+        for fmt, suffix in (("csv", ".csv"), ("parquet", ".parquet")):
+            path = os.path.join(tmp, "fit" + suffix)
+            t_save, _ = timed(lambda: columnar.write_frame(fit, path))
+            t_load, _ = timed(lambda: pd.read_csv(path) if fmt == "csv" else columnar.read_frame(path))
+            print(f"{fmt:10s} {t_save:8.3f} {t_load:8.3f} {os.path.getsize(path) / 1e6:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Commingled multi-layer oil IPR: scaling with wells at dozens of layers each.
+
+Builds random oil layer sets (--layers per well) and times commingled_curves
+(all three methods, --points Pwf values) for increasing well counts, against
+a per-well loop over oil_curves on a subset.
+
+Run from the repo root:  python -m benchmarks.bench_commingled --wells 1000,2000,5000,10000 --layers 30
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ipr.commingled import commingled_curves, oil_layers
+from ipr.oil_batch import fit_oil_arrays, oil_curves
+
+
+def random_layers(n_wells, n_layers, rng):
+    n = n_wells * n_layers
+    Pws = rng.uniform(150, 350, n)
+    Pwf = Pws * rng.uniform(0.3, 0.9, n)
+    return np.repeat(np.arange(n_wells), n_layers), rng.uniform(100, 300, n), Pws, Pwf, rng.uniform(50, 500, n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", default="1000,2000,5000,10000")
+    parser.add_argument("--layers", type=int, default=30)
+    parser.add_argument("--points", type=int, default=50)
+    parser.add_argument("--loop-wells", type=int, default=200)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    for n_wells in (int(w) for w in args.wells.split(",")):
+        wells, Pb, Pws, Pwf, Qwf = random_layers(n_wells, args.layers, rng)
+        t0 = time.perf_counter()
+        cs = oil_layers(wells, Pb, Pws, Pwf, Qwf)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        commingled_curves(cs, args.points)
+        t = time.perf_counter() - t0
+        cells = n_wells * args.layers * args.points
+        print(f"{n_wells:>7,} wells × {args.layers} layers: build {t_build * 1e3:7.1f} ms, curves {t * 1e3:8.1f} ms "
+              f"({t / n_wells * 1e6:6.1f} µs/well, {cells / t / 1e6:5.1f} M layer-points/s)")
+
+    wells, Pb, Pws, Pwf, Qwf = random_layers(args.loop_wells, args.layers, rng)
+    t0 = time.perf_counter()
+    for w in range(args.loop_wells):
+        idx = slice(w * args.layers, (w + 1) * args.layers)
+        fit = fit_oil_arrays(Pb[idx], Pws[idx], Pwf[idx], Qwf[idx])
+        grid = np.broadcast_to(Pws[idx].max() * np.linspace(1, 0, args.points), (args.layers, args.points))
+        _, rates = oil_curves(fit, pwf=grid.copy())
+        {m: q.sum(axis=0) for m, q in rates.items()}
+    t = time.perf_counter() - t0
+    print(f"per-well loop over oil_curves: {t / args.loop_wells * 1e6:.1f} µs/well")
+
+
+if __name__ == "__main__":
+    main()
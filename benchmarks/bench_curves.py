@@ -0,0 +1,68 @@
+"""10k-point IPR curves for every method: vectorized grid vs per-point Python calls,
+and adaptive refinement (points used and error against a dense reference).
+
+Run from the repo root:  python -m benchmarks.bench_curves --points 10000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from ipr import curves, oil
+from ipr.gas_batch import fit_gas_wells
+
+SAMPLE = "gas_well_data.csv"
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def models():
+    data = pd.read_csv(SAMPLE)
+    data.insert(0, "Well ID", "sample")
+    fit = fit_gas_wells(data)
+    Pws, Pb = 3000.0, 2000.0
+    J = oil.Calc_J(600.0, Pws, Pb, 1500.0)
+    n, c = oil.fetkovich(1800.0, 500.0, 1200.0, 900.0, Pws)
+    out = {
+        "vogel": (curves.vogel(Pws, oil.return_Qmax(500.0, 1800.0, Pws)), Pws, ()),
+        "constant_j": (curves.constant_j(oil.Productivity_Index(500.0, Pws, 1800.0), Pws), Pws, ()),
+        "fetkovich": (curves.fetkovich(n, c, Pws), Pws, ()),
+        "composite_vogel": (curves.composite_vogel(J, Pws, Pb), Pws, (Pb,)),
+        "composite_fetkovich": (curves.composite_fetkovich(J, Pws, Pb), Pws, (Pb,)),
+    }
+    Pr = fit["Pr"][0]
+    out.update({name: (model, Pr, ()) for name, model in curves.gas_models(fit).items()})
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=10_000)
+    parser.add_argument("--tol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    print(f"{'method':22s} {'vector ms':>10s} {'per-point ms':>13s} {'speedup':>8s} "
+          f"{'adaptive ms':>12s} {'adapt pts':>10s} {'max rel err':>12s}")
+    for name, (model, p_top, breaks) in models().items():
+        t_vec, (pwf, q) = timed(lambda: curves.evaluate(model, p_top, 0.0, args.points))
+        grid = pwf.tolist()
+        t_loop, _ = timed(lambda: [model(np.float64(p)) for p in grid], repeat=1)
+        t_ad, (pa, qa) = timed(lambda: curves.adaptive(model, p_top, 0.0, tol=args.tol,
+                                                       max_points=args.points, breakpoints=breaks))
+        # linear interpolation of the adaptive curve against the dense grid
+        q_interp = np.interp(pwf[::-1], pa[::-1], qa[::-1])[::-1]
+        err = np.nanmax(np.abs(q_interp - q)) / np.nanmax(np.abs(q))
+        print(f"{name:22s} {t_vec * 1e3:10.3f} {t_loop * 1e3:13.1f} {t_loop / t_vec:7.0f}x "
+              f"{t_ad * 1e3:12.3f} {len(pa):10d} {err:12.2e}")
+
+
+if __name__ == "__main__":
+    main()
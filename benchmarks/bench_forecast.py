@@ -0,0 +1,77 @@
+"""Depletion forecast over a full field: decline profiles and streamed future
+IPR curves vs marching each well on its own.
+
+Run from the repo root:  python -m benchmarks.bench_forecast --wells 100000 --days 3650 --step 7
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from ipr.forecast import decline_profile, forecast_gas, forecast_oil
+from ipr.gas_batch import fit_gas_wells
+from ipr.oil_batch import fit_oil_wells
+from ipr.synthetic import gas_well_tests, oil_well_tests
+
+
+def _subset(fit, index):
+    return {k: v[index] for k, v in fit.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=100_000)
+    parser.add_argument("--days", type=float, default=3650)
+    parser.add_argument("--step", type=float, default=7, help="time step in days")
+    parser.add_argument("--curve-wells", type=int, default=10_000,
+                        help="wells for the streamed run with IPR curves")
+    parser.add_argument("--num-points", type=int, default=20)
+    parser.add_argument("--loop-wells", type=int, default=200,
+                        help="wells marched one at a time for the baseline (extrapolated)")
+    args = parser.parse_args()
+    times = np.arange(0.0, args.days, args.step)
+    rng = np.random.default_rng(0)
+
+    oil = fit_oil_wells(oil_well_tests(args.wells))
+    N = rng.uniform(2e5, 2e6, args.wells)
+    gas = fit_gas_wells(gas_well_tests(args.wells))
+    G = rng.uniform(5e6, 5e7, args.wells)
+    cases = {
+        "oil": (oil, lambda fit, idx, **kw: forecast_oil(fit, N[idx], 0.5 * fit["Pb"], times, **kw)),
+        "gas": (gas, lambda fit, idx, **kw: forecast_gas(fit, G[idx], 0.3 * fit["Pr"], times,
+                                                         gravity=0.65, temperature_F=200, **kw)),
+    }
+
+    print(f"wells: {args.wells}, time steps: {len(times)}")
+    for name, (fit, run) in cases.items():
+        everything = slice(None)
+        t0 = time.perf_counter()
+        profile = decline_profile(run(fit, everything))
+        t_batch = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for i in range(min(args.loop_wells, args.wells)):
+            idx = slice(i, i + 1)
+            decline_profile(run(_subset(fit, idx), idx))
+        t_loop = (time.perf_counter() - t0) * args.wells / min(args.loop_wells, args.wells)
+
+        idx = slice(0, min(args.curve_wells, args.wells))
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        curve_values = 0
+        for chunk in run(_subset(fit, idx), idx, num_points=args.num_points, max_elements=5_000_000):
+            curve_values += sum(v.size for v in chunk["curves"].values())
+        t_curves = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{name}: decline profile {t_batch:7.2f} s  (well-by-well {t_loop:8.1f} s, "
+              f"{t_loop / t_batch:.0f}x)  field rate day 0 -> end: "
+              f"{profile['field_rate'][0]:,.0f} -> {profile['field_rate'][-1]:,.0f}")
+        print(f"{name}: streamed IPR curves {t_curves:7.2f} s for {curve_values:,} rates "
+              f"({idx.stop} wells), peak memory {peak / 2**20:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
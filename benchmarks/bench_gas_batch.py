@@ -0,0 +1,56 @@
+"""Throughput of the vectorized gas batch fit vs looping the single-well fitters.
+
+Run from the repo root:  python -m benchmarks.bench_gas_batch --wells 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ipr import gas
+from ipr.gas_batch import fit_gas_wells
+from ipr.synthetic import gas_well_tests
+
+
+def loop_fit(data):
+    aof = []
+    for _, well in data.groupby("Well ID", sort=True):
+        well = well.drop(columns=["Well ID"])
+        aof.append((gas.simplified_backpressure(well)[2],
+                    gas.lit_pressure_squared(well)[2],
+                    gas.lit_pressure_approx(well)[2],
+                    gas.lit_pseudopressure(well)[2]))
+    return np.array(aof)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=10000)
+    parser.add_argument("--points", type=int, default=5)
+    parser.add_argument("--loop-wells", type=int, default=None,
+                        help="wells to time in the per-well loop (default: all)")
+    args = parser.parse_args()
+
+    data = gas_well_tests(args.wells, args.points)
+    t0 = time.perf_counter()
+    fit = fit_gas_wells(data)
+    t_batch = time.perf_counter() - t0
+
+    loop_wells = args.loop_wells or args.wells
+    subset = data[data["Well ID"].isin(fit["well_id"][:loop_wells])]
+    t0 = time.perf_counter()
+    loop_aof = loop_fit(subset)
+    t_loop = time.perf_counter() - t0
+
+    batch_aof = np.column_stack([fit[k][:loop_wells] for k in ("AOF_bp", "AOF_lit", "AOF_litp", "AOF_psi")])
+    max_rel = np.nanmax(np.abs(batch_aof - loop_aof) / np.abs(loop_aof))
+
+    print(f"wells: {args.wells}, points/well: {args.points}")
+    print(f"batch : {t_batch:8.3f} s  {args.wells / t_batch:12,.0f} wells/s")
+    print(f"loop  : {t_loop:8.3f} s  {loop_wells / t_loop:12,.0f} wells/s  ({loop_wells} wells)")
+    print(f"speedup: {(t_loop / loop_wells) / (t_batch / args.wells):.0f}x per well")
+    print(f"max relative AOF difference vs loop: {max_rel:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Interactive rerun latency of the gas page graph vs recomputing everything.
+
+Times a cold evaluation, a rerun with nothing changed, and reruns after one
+input changes (curve points, ψ source, bootstrap settings), against a full
+compare_gas_methods + chart spec on every rerun as the page did before.
+Each row is the median of --repeats runs; the changing reruns alternate
+between two values of their input so every run recomputes.
+
+Run from the repo root:  python -m benchmarks.bench_graph --num-points 20000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from ipr.gas import compare_gas_methods
+from ipr.graph import gas_page_graph
+from ipr.plots import gas_comparison_chart
+from ipr.pseudo import pseudo_pressure_table
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+# Median of fn(i) over repeats runs, and the nodes recomputed by the last one
+def median_time(fn, repeats, graph=None):
+    seconds = sorted(timed(lambda: fn(i)) for i in range(repeats))
+    return seconds[len(seconds) // 2], len(graph.recomputed) if graph is not None else "all"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num-points", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=9)
+    args = parser.parse_args()
+    data = pd.read_csv("gas_well_data.csv")
+    psi_fn = pseudo_pressure_table(0.65, 200.0)
+    n = args.num_points
+    compare_gas_methods(data, 20)                  # imports
+
+    g = gas_page_graph()
+
+    def rerun(**inputs):
+        g.begin().update(**{"data": data, "num_points": n, "psi_fn": None, "bootstrap": None, **inputs})
+        g.get("tables")
+        g.get("chart")
+
+    def full():
+        results, _, _ = compare_gas_methods(data, n)
+        gas_comparison_chart(results)
+
+    full()
+    rows = [("full recompute (before)", *median_time(lambda i: full(), args.repeats)),
+            ("graph, cold", timed(rerun), len(g.recomputed)),
+            ("graph, nothing changed", *median_time(lambda i: rerun(), args.repeats, g)),
+            ("graph, curve points changed",
+             *median_time(lambda i: rerun(num_points=n + 1 + i % 2), args.repeats, g)),
+            ("graph, ψ from gas properties",
+             *median_time(lambda i: rerun(num_points=n + 1, psi_fn=psi_fn if i % 2 == 0 else None),
+                          args.repeats, g))]
+    for label, seconds, nodes in rows:
+        print(f"{label:32s} {seconds * 1e3:9.2f} ms   nodes recomputed: {nodes}")
+
+
+if __name__ == "__main__":
+    main()
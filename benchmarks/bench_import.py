@@ -0,0 +1,40 @@
+"""Cold import time of the ipr core vs the dependency stack of the Streamlit pages.
+
+Each import runs in a fresh interpreter; the median of --repeat runs is reported.
+Run from the repo root:  python -m benchmarks.bench_import
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "ipr (core)": "import ipr",
+    "ipr.gas_batch": "import ipr.gas_batch",
+    "gas page stack (streamlit, pandas, matplotlib, scipy.stats)":
+        "import streamlit, numpy, pandas, matplotlib.pyplot, scipy.stats",
+    "oil page stack (streamlit, pandas, matplotlib, scipy.optimize)":
+        "import streamlit, numpy, pandas, matplotlib.pyplot, scipy.optimize",
+}
+
+SNIPPET = "import time; t = time.perf_counter(); {stmt}; print(time.perf_counter() - t)"
+
+
+def time_import(stmt):
+    out = subprocess.run([sys.executable, "-c", SNIPPET.format(stmt=stmt)],
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, stmt in TARGETS.items():
+        times = [time_import(stmt) for _ in range(args.repeat)]
+        print(f"{name:65s} {statistics.median(times) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
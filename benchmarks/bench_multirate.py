@@ -0,0 +1,60 @@
+"""Field-wide multi-rate Fetkovich/Vogel refit: batched Levenberg-Marquardt vs
+scipy.optimize.least_squares called once per well.
+
+Run from the repo root:  python -m benchmarks.bench_multirate --wells 100000 --points 6
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from ipr.multirate import fit_multirate_wells
+from ipr.synthetic import oil_multirate_tests
+
+
+# One generic fit per well, started from the same log-linear guess
+def loop_fit(data):
+    out = []
+    for _, well in data.groupby("Well ID", sort=True):
+        Pws = well.iloc[:, 1].max()
+        x = Pws**2 - well.iloc[:, 2].to_numpy()**2
+        q = well.iloc[:, 3].to_numpy()
+        n0, lnC0 = np.polyfit(np.log(x), np.log(q), 1)
+        res = least_squares(lambda th: np.exp(th[0]) * x**th[1] - q, [lnC0, n0])
+        out.append((np.exp(res.x[0]), res.x[1], np.sum(res.fun**2)))
+    return np.array(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=100_000)
+    parser.add_argument("--points", type=int, default=6)
+    parser.add_argument("--loop-wells", type=int, default=2000,
+                        help="wells to time with the per-well optimizer")
+    args = parser.parse_args()
+
+    data = oil_multirate_tests(args.wells, args.points)
+    t0 = time.perf_counter()
+    fit = fit_multirate_wells(data, generalized_vogel=True)
+    t_batch = time.perf_counter() - t0
+
+    loop_wells = min(args.loop_wells, args.wells)
+    subset = data[data["Well ID"].isin(fit["well_id"][:loop_wells])]
+    t0 = time.perf_counter()
+    ref = loop_fit(subset)
+    t_loop = time.perf_counter() - t0
+
+    sse_batch = (fit["rmse_fetkovich"][:loop_wells]**2) * fit["n_points"][:loop_wells]
+    excess = np.max((sse_batch - ref[:, 2]) / ref[:, 2])
+
+    print(f"wells: {args.wells}, points/well: {args.points}")
+    print(f"batch : {t_batch:8.3f} s  {args.wells / t_batch:12,.0f} wells/s  "
+          f"(LM iterations mean {fit['iterations'].mean():.1f}, max {fit['iterations'].max()})")
+    print(f"loop  : {t_loop:8.3f} s  {loop_wells / t_loop:12,.0f} wells/s  ({loop_wells} wells)")
+    print(f"speedup: {(t_loop / loop_wells) / (t_batch / args.wells):.0f}x per well")
+    print(f"max relative SSE excess of batch over per-well optimizer: {excess:.1e}")
+
+
+if __name__ == "__main__":
+    main()
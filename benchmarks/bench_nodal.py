@@ -0,0 +1,57 @@
+"""Operating-point throughput for well x scenario grids (default 1000 x 100 = 100k).
+
+Run from the repo root:  python -m benchmarks.bench_nodal --wells 1000 --scenarios 100
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ipr import nodal
+from ipr.gas_batch import fit_gas_wells
+from ipr.oil import Calc_J
+from ipr.synthetic import gas_well_tests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=1000)
+    parser.add_argument("--scenarios", type=int, default=100)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    W, S = args.wells, args.scenarios
+
+    # oil wells (bar, m3/d) and tubing scenarios
+    Pws = rng.uniform(150, 350, W)
+    Pb = Pws * rng.uniform(0.4, 0.9, W)
+    Qmax = rng.uniform(200, 2000, W)
+    J = Calc_J(Qmax * 0.3, Pws, Pb, Pb * 0.8)
+    n = rng.uniform(0.6, 1.0, W)
+    c = Qmax / (Pws**2)**n
+    oil_out = nodal.quadratic_outflow(rng.uniform(10, 40, S), rng.uniform(60, 120, S),
+                                      rng.uniform(-0.02, 0.02, S), rng.uniform(1e-5, 1e-4, S))
+    # gas wells (psia, Mscf/d) and tubing scenarios
+    fit = fit_gas_wells(gas_well_tests(W, 5))
+    gas_out = nodal.quadratic_outflow(rng.uniform(100, 500, S), rng.uniform(50, 300, S),
+                                      0.0, rng.uniform(1e-6, 1e-5, S))
+
+    cases = {
+        "vogel": (nodal.vogel_ipr(Pws, Qmax), oil_out, Pws),
+        "composite_vogel": (nodal.composite_vogel_ipr(J, Pws, Pb), oil_out, Pws),
+        "fetkovich": (nodal.fetkovich_ipr(n, c, Pws), oil_out, Pws),
+    }
+    for method in ("backpressure", "lit_pressure_squared", "lit_pressure_approx", "lit_pseudopressure"):
+        cases[method] = (nodal.gas_ipr(fit, method), gas_out, fit["Pr"])
+
+    print(f"{W} wells x {S} scenarios = {W * S:,} combinations\n")
+    print(f"{'model':22s} {'seconds':>8s} {'combos/s':>12s} {'iters':>6s} {'flowing':>8s}")
+    for name, (ipr, outflow, p_res) in cases.items():
+        t0 = time.perf_counter()
+        res = nodal.operating_points(ipr, outflow, nodal.well_axis(p_res))
+        dt = time.perf_counter() - t0
+        print(f"{name:22s} {dt:8.3f} {W * S / dt:12,.0f} {res['iterations']:6d} "
+              f"{res['flowing'].mean():8.1%}")
+
+
+if __name__ == "__main__":
+    main()
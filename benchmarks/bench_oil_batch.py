@@ -0,0 +1,57 @@
+"""Throughput of the vectorized oil batch engine vs looping the page's per-well functions.
+
+Run from the repo root:  python -m benchmarks.bench_oil_batch --wells 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ipr.oil import saturated_ipr, undersaturated_ipr
+from ipr.oil_batch import fit_oil_wells, oil_curves
+from ipr.synthetic import oil_well_tests
+
+
+def loop_fit(data, num_points):
+    aof = []
+    for _, Pb, Pws, Pwf, Qwf, Pwf1, Qwf1 in data.itertuples(index=False):
+        if Pws < Pb:
+            out = saturated_ipr(Pws, Pwf, Qwf, Pwf1, Qwf1, num_points)
+        else:
+            out = undersaturated_ipr(Pws, Pb, Pwf, Qwf, num_points)
+        aof.append((out["AOF_vogel"], out["AOF_fetkovich"]))
+    return np.array(aof)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=100_000)
+    parser.add_argument("--points", type=int, default=10, help="curve points per segment")
+    parser.add_argument("--loop-wells", type=int, default=5000,
+                        help="wells to time in the per-well loop")
+    args = parser.parse_args()
+
+    data = oil_well_tests(args.wells)
+    t0 = time.perf_counter()
+    fit = fit_oil_wells(data)
+    pwf, curves = oil_curves(fit, args.points)
+    t_batch = time.perf_counter() - t0
+
+    loop_wells = min(args.loop_wells, args.wells)
+    t0 = time.perf_counter()
+    loop_aof = loop_fit(data.iloc[:loop_wells], args.points)
+    t_loop = time.perf_counter() - t0
+
+    batch_aof = np.column_stack([fit["AOF_vogel"][:loop_wells], fit["AOF_fetkovich"][:loop_wells]])
+    max_rel = np.nanmax(np.abs(batch_aof - loop_aof) / np.abs(loop_aof))
+
+    print(f"wells: {args.wells} (regimes {np.bincount(fit['regime'], minlength=3).tolist()}), "
+          f"curve points: {pwf.shape[1]}")
+    print(f"batch : {t_batch:8.3f} s  {args.wells / t_batch:12,.0f} wells/s  (fit + all curves)")
+    print(f"loop  : {t_loop:8.3f} s  {loop_wells / t_loop:12,.0f} wells/s  ({loop_wells} wells)")
+    print(f"speedup: {(t_loop / loop_wells) / (t_batch / args.wells):.0f}x per well")
+    print(f"max relative AOF difference vs loop: {max_rel:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Online gas refits on a simulated surveillance stream: O(1) running statistics
+vs refitting each well's history whenever a point arrives.
+
+Run from the repo root:  python -m benchmarks.bench_online --wells 5000 --points 200000 --window 50
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ipr.gas_batch import FIT_KEYS, fit_gas_arrays
+from ipr.online import OnlineGasField
+
+
+# A shut-in reading per well, then flowing points for random wells in arrival order
+def simulated_stream(n_wells, n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    Pr = rng.uniform(1500.0, 5000.0, n_wells)
+    aof = rng.uniform(2000.0, 20000.0, n_wells)
+    turb = rng.uniform(0.2, 0.8, n_wells)
+    b = turb * Pr**2 / aof**2
+    a = (1 - turb) * Pr**2 / aof
+    k = rng.uniform(75.0, 90.0, n_wells)
+
+    well = rng.integers(0, n_wells, n_points)
+    pwf = Pr[well] * rng.uniform(0.3, 0.95, n_points)
+    dp2 = Pr[well]**2 - pwf**2
+    qg = (-a[well] + np.sqrt(a[well]**2 + 4 * b[well] * dp2)) / (2 * b[well])
+    qg *= 1 + 0.02 * rng.standard_normal(n_points)
+    ids = [f"W{i:05d}" for i in range(n_wells)]
+    shut_in = [(ids[i], Pr[i], k[i] * Pr[i]**2, 0.0) for i in range(n_wells)]
+    flowing = [(ids[w], p, k[w] * p**2, q) for w, p, q in zip(well.tolist(), pwf.tolist(), qg.tolist())]
+    return shut_in + flowing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=5000)
+    parser.add_argument("--points", type=int, default=200_000)
+    parser.add_argument("--window", type=int, default=None, help="sliding window per well (default: all)")
+    parser.add_argument("--refit-points", type=int, default=5000,
+                        help="stream points to time with full refits")
+    args = parser.parse_args()
+
+    stream = simulated_stream(args.wells, args.points)
+    field = OnlineGasField(args.window)
+    t0 = time.perf_counter()
+    for point in stream:
+        field.add(*point)
+    t_online = time.perf_counter() - t0
+
+    # baseline: refit the well's held points with the batch fitter on every arrival,
+    # timed over the last refit_points of the stream (wells have their full history)
+    n_refit = min(args.refit_points, len(stream))
+    held = {}
+    t_refit = 0.0
+    for i, point in enumerate(stream):
+        pts = held.setdefault(point[0], [])
+        pts.append(point)
+        if args.window is not None:
+            del pts[:-args.window]
+        if i >= len(stream) - n_refit:
+            t0 = time.perf_counter()
+            p = np.array([q[1:] for q in pts])
+            with np.errstate(over="ignore", invalid="ignore"):
+                fit_gas_arrays(np.zeros(len(p), dtype=int), p[:, 0], p[:, 1], p[:, 2])
+            t_refit += time.perf_counter() - t0
+
+    # the online fits equal a batch fit over the points each well still holds;
+    # tiny windows give extreme fits that overflow to inf, compared on finite values only
+    pts = [p for well in held.values() for p in well]
+    with np.errstate(over="ignore", invalid="ignore"):
+        batch = fit_gas_arrays(*(np.array(col) for col in zip(*pts)))
+        online = field.fits()
+        err = 0.0
+        for k in FIT_KEYS:
+            ok = np.isfinite(online[k]) & np.isfinite(batch[k]) & (batch[k] != 0)
+            if ok.any():
+                err = max(err, np.max(np.abs(online[k][ok] - batch[k][ok]) / np.abs(batch[k][ok])))
+
+    rebuilds = sum(w.rebuilds for w in field.wells.values())
+    print(f"wells: {args.wells}, stream points: {len(stream)}, window: {args.window}")
+    print(f"online : {t_online:8.3f} s  {len(stream) / t_online:12,.0f} points/s  "
+          f"({t_online / len(stream) * 1e6:.1f} µs/update, {rebuilds} rebuilds)")
+    print(f"refit  : {t_refit:8.3f} s  {n_refit / t_refit:12,.0f} points/s  ({n_refit} points)")
+    print(f"speedup: {(t_refit / n_refit) / (t_online / len(stream)):.0f}x per point")
+    print(f"max relative difference vs batch fit of held points: {err:.1e}")
+
+
+if __name__ == "__main__":
+    main()
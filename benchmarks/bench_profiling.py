@@ -0,0 +1,66 @@
+"""Overhead of the stage instrumentation (ipr.profiling) on the page hot path.
+
+Times compare_gas_methods on the sample data with profiling off, on (timers and
+RSS) and on with tracemalloc memory counters, plus the raw cost of a disabled
+stage() / profiled call.
+
+Run from the repo root:  python -m benchmarks.bench_profiling --repeat 200
+"""
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from ipr import profiling
+from ipr.gas import compare_gas_methods
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+    data = pd.read_csv("gas_well_data.csv")
+    compare_gas_methods(data)                      # imports
+
+    def run(enabled, memory=False):
+        profiling.MEMORY = memory
+        with profiling.page_run("bench", enabled):
+            compare_gas_methods(data)
+
+    off = best(lambda: run(False), args.repeat)
+    on = best(lambda: run(True), args.repeat)
+    memory = best(lambda: run(True, True), max(args.repeat // 10, 3))
+    profiling.MEMORY = False
+    tracemalloc.stop()
+
+    noop = profiling.profiled("noop")(lambda: None)
+    t0 = time.perf_counter()
+    for _ in range(args.calls):
+        with profiling.stage("x"):
+            pass
+    t_stage = (time.perf_counter() - t0) / args.calls
+    t0 = time.perf_counter()
+    for _ in range(args.calls):
+        noop()
+    t_wrapper = (time.perf_counter() - t0) / args.calls
+
+    stages = len(profiling.totals())
+    print(f"compare_gas_methods, profiling off:    {off * 1e3:.3f} ms")
+    print(f"  timers + RSS ({stages} stages):      {on * 1e3:.3f} ms  (+{(on - off) / off:.0%})")
+    print(f"  with tracemalloc:                   {memory * 1e3:.3f} ms  (+{(memory - off) / off:.0%})")
+    print(f"disabled stage(): {t_stage * 1e9:.0f} ns per block, profiled wrapper: {t_wrapper * 1e9:.0f} ns per call")
+
+
+if __name__ == "__main__":
+    main()
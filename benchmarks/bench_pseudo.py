@@ -0,0 +1,60 @@
+"""Real-gas pseudo-pressure: cached lookup table vs direct numerical integration.
+
+Reports the table build time, its accuracy against scipy quad, and throughput of
+converting a field of pressures with the table.
+
+Run from the repo root:  python -m benchmarks.bench_pseudo --pressures 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.integrate import quad
+
+from ipr import pseudo
+
+
+def integrand(p, temperature_F, gravity):
+    Z = pseudo.z_factor(p, temperature_F, gravity)
+    return 2 * p / (pseudo.gas_viscosity(p, temperature_F, gravity, Z) * Z)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pressures", type=int, default=1_000_000)
+    parser.add_argument("--gravity", type=float, default=0.7)
+    parser.add_argument("--temperature", type=float, default=200.0)
+    parser.add_argument("--quad-points", type=int, default=200)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    t0 = time.perf_counter()
+    table = pseudo.PseudoPressureTable(args.gravity, args.temperature)
+    t_build = time.perf_counter() - t0
+
+    check = np.sort(rng.uniform(100, 10_000, args.quad_points))
+    t0 = time.perf_counter()
+    ref = np.array([quad(integrand, 0, p, args=(args.temperature, args.gravity))[0] for p in check])
+    t_quad = (time.perf_counter() - t0) / len(check)
+    err = np.max(np.abs(table.psi(check) - ref) / ref)
+
+    p = rng.uniform(100, 10_000, args.pressures)
+    t0 = time.perf_counter()
+    table.psi(p)
+    t_table = time.perf_counter() - t0
+
+    gravity = rng.choice([0.6, 0.65, 0.7, 0.8], args.pressures)
+    pseudo.pseudo_pressure(p[:10], gravity[:10], args.temperature)      # build the tables
+    t0 = time.perf_counter()
+    pseudo.pseudo_pressure(p, gravity, args.temperature)
+    t_mixed = time.perf_counter() - t0
+
+    print(f"table build ({len(table.p)} nodes): {t_build * 1e3:.1f} ms")
+    print(f"quad per pressure:        {t_quad * 1e3:.3f} ms   max rel error of table: {err:.1e}")
+    print(f"table, {args.pressures:,} pressures: {t_table * 1e3:.1f} ms "
+          f"({t_table / args.pressures * 1e9:.0f} ns each, {t_quad * args.pressures / t_table:,.0f}x vs quad)")
+    print(f"4 gases mixed:            {t_mixed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Results store: bulk upsert throughput and history query latency vs
+refitting the same wells from the raw well-test CSV.
+
+Run from the repo root:  python -m benchmarks.bench_store --wells 20000 --dates 12 --query-wells 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ipr.gas_batch import fit_gas_wells, gas_curves
+from ipr.store import ResultStore
+from ipr.synthetic import gas_well_tests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=20_000)
+    parser.add_argument("--dates", type=int, default=12, help="monthly test dates per well")
+    parser.add_argument("--query-wells", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    tests = gas_well_tests(args.wells)
+    dates = np.datetime64("2025-01-01", "M") + np.arange(args.dates)
+    rng = np.random.default_rng(0)
+    query = rng.choice(np.unique(tests["Well ID"]), args.query_wells, replace=False)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # raw history: the same tests re-rated each month with a declining rate
+        raw_path = os.path.join(tmp, "tests.csv")
+        raw = pd.concat([tests.assign(**{"Test Date": str(d) + "-01",
+                                         tests.columns[3]: tests.iloc[:, 3] * (1 - 0.01 * k)})
+                         for k, d in enumerate(dates)])
+        raw.to_csv(raw_path, index=False)
+
+        store = ResultStore(os.path.join(tmp, "results.db"))
+        t_fit = t_curve = 0.0
+        fits = {}
+        for d, month in raw.groupby("Test Date", sort=True):
+            fit = fit_gas_wells(month.drop(columns="Test Date"))
+            fits[d] = fit
+            t0 = time.perf_counter()
+            store.upsert_fits(fit, d)
+            t_fit += time.perf_counter() - t0
+            pwf, rates = gas_curves(fit)
+            t0 = time.perf_counter()
+            store.upsert_curves(fit["well_id"], d, pwf, rates)
+            t_curve += time.perf_counter() - t0
+        n_fits, n_curves = store.count("fits"), store.count("curves")
+
+        # upsert of an existing month (every row conflicts)
+        t0 = time.perf_counter()
+        store.upsert_fits(fits[d], d)
+        t_update = time.perf_counter() - t0
+
+        times = []
+        for _ in range(args.repeats):
+            t0 = time.perf_counter()
+            trend = store.trend(query, "AOF_psi")
+            times.append(time.perf_counter() - t0)
+        t_query = np.median(times)
+        t0 = time.perf_counter()
+        for well in query[:50]:
+            store.curves(well)
+        t_curves_q = (time.perf_counter() - t0) / 50
+        store.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.startswith("results"))
+        store.close()
+
+        # baseline: read the raw CSV and refit the queried wells for every date
+        t0 = time.perf_counter()
+        df = pd.read_csv(raw_path)
+        df = df[df["Well ID"].isin(query)]
+        refit = {d: fit_gas_wells(month.drop(columns="Test Date"))["AOF_psi"]
+                 for d, month in df.groupby("Test Date", sort=True)}
+        t_refit = time.perf_counter() - t0
+
+    same = np.allclose(trend.to_numpy().T, np.column_stack(list(refit.values())))
+    print(f"wells: {args.wells}, test dates: {args.dates} -> {n_fits:,} fit rows, {n_curves:,} curve rows, "
+          f"{size / 2**20:.1f} MiB")
+    print(f"bulk upsert fits  : {n_fits / t_fit:12,.0f} rows/s   (re-upsert of one date "
+          f"{args.wells / t_update:,.0f} rows/s)")
+    print(f"bulk upsert curves: {n_curves / t_curve:12,.0f} wells/s (4 methods x 20 points each)")
+    print(f"AOF trend, {args.query_wells} wells x {args.dates} dates: {t_query * 1e3:8.1f} ms "
+          f"(refit from CSV {t_refit * 1e3:,.0f} ms, {t_refit / t_query:.0f}x), same AOFs: {same}")
+    print(f"curves of one well, all dates/methods: {t_curves_q * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
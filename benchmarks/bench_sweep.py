@@ -0,0 +1,48 @@
+"""Oil sensitivity sweep throughput and memory on a large grid.
+
+Sweeps Pb × Pws × Qwf (default 100 × 100 × 1000 = 10⁷ combinations) with a
+heat map over Pb × Pws, serially and on a process pool, and reports
+combinations per second and the peak resident memory (the Cartesian product
+itself would need 10⁷ × 8 inputs × 8 bytes).
+
+Run from the repo root:  python -m benchmarks.bench_sweep --pb 100 --pws 100 --rates 1000 --workers 2
+"""
+import argparse
+import resource
+import time
+
+import numpy as np
+
+from ipr.sweep import oil_sweep, tornado_table
+
+
+def peak_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pb", type=int, default=100)
+    parser.add_argument("--pws", type=int, default=100)
+    parser.add_argument("--rates", type=int, default=1000)
+    parser.add_argument("--max-elements", type=int, default=20_000_000)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    axes = {"Pb": np.linspace(100, 300, args.pb), "Pws": np.linspace(150, 350, args.pws),
+            "Qwf": np.linspace(50, 500, args.rates)}
+    fixed = {"Pwf": 120.0, "target": 60.0}
+    n = args.pb * args.pws * args.rates
+    oil_sweep({k: v[:2] for k, v in axes.items()}, fixed)           # warm-up
+
+    for workers in (0, args.workers):
+        t0 = time.perf_counter()
+        result = oil_sweep(axes, fixed, heat=("Pb", "Pws"), max_elements=args.max_elements, workers=workers)
+        seconds = time.perf_counter() - t0
+        print(f"workers={workers}: {n:,} combinations in {seconds:.2f} s ({n / seconds / 1e6:.2f} M/s), "
+              f"peak RSS {peak_mib():.0f} MiB")
+    print(f"(full product of inputs would be {n * 8 * 8 / 2**20:,.0f} MiB)")
+    print(tornado_table(result, "Q_vogel").round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Bootstrap / Monte Carlo IPR uncertainty: one batched pass over all
+replicates vs refitting the field once per replicate.
+
+Run from the repo root:  python -m benchmarks.bench_uncertainty --wells 1000 --replicates 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ipr.gas_batch import fit_gas_arrays, gas_curves, group_wells
+from ipr.oil_batch import fit_oil_arrays, oil_curves, oil_grid
+from ipr.synthetic import gas_well_tests, oil_well_tests
+from ipr.uncertainty import GAS_AOF_KEYS, OIL_AOF_KEYS, bootstrap_gas, monte_carlo_oil, quantiles
+
+CURVE_REPLICATES = 1000
+
+
+# Same output as the batched functions: AOF levels of every method and curve
+# envelopes from the first CURVE_REPLICATES replicates
+def _levels(fits, curves, keys):
+    aof = {m: quantiles(np.array([f[k] for f in fits]), axis=0).T for m, k in keys.items()}
+    env = {m: quantiles(np.array([c[m] for c in curves]), axis=0) for m in keys}
+    return aof, env
+
+
+# Baseline gas: resample each well's flowing points and call the batch fitter per replicate
+def loop_gas(ids, pwf, psi, qg, n_replicates, seed=0):
+    rng = np.random.default_rng(seed)
+    _, codes = group_wells(ids)
+    shut_in = np.flatnonzero(qg <= 0)
+    flowing = np.flatnonzero(qg > 0)
+    flowing = flowing[np.argsort(codes[flowing], kind="stable")]
+    counts = np.bincount(codes[flowing])
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    c = codes[flowing]
+    fits, curves = [], []
+    for r in range(n_replicates):
+        rows = np.concatenate([shut_in, flowing[starts[c] + rng.integers(0, counts[c])]])
+        fits.append(fit_gas_arrays(codes[rows], pwf[rows], psi[rows], qg[rows]))
+        if r < CURVE_REPLICATES:
+            curves.append(gas_curves(fits[-1])[1])
+    return _levels(fits, curves, GAS_AOF_KEYS)
+
+
+# Baseline oil: one batch oil fit per replicate
+def loop_oil(inputs, sd, rate_cv, n_replicates, seed=0):
+    rng = np.random.default_rng(seed)
+    grid = oil_grid(fit_oil_arrays(**inputs))
+    fits, curves = [], []
+    for r in range(n_replicates):
+        sample = {}
+        for name, v in inputs.items():
+            noise = rng.standard_normal(len(v))
+            sample[name] = v * (1 + rate_cv * noise) if name.startswith("Q") else v + sd * noise
+        fits.append(fit_oil_arrays(**sample))
+        if r < CURVE_REPLICATES:
+            curves.append(oil_curves(fits[-1], pwf=grid)[1])
+    return _levels(fits, curves, OIL_AOF_KEYS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wells", type=int, default=1000)
+    parser.add_argument("--replicates", type=int, default=10_000)
+    args = parser.parse_args()
+    R = args.replicates
+
+    gas = gas_well_tests(args.wells)
+    ids, pwf, psi, qg = (gas.iloc[:, i].to_numpy() for i in range(4))
+    pwf, psi, qg = pwf.astype(float), psi.astype(float), qg.astype(float)
+    t0 = time.perf_counter()
+    res = bootstrap_gas(ids, pwf, psi, qg, R)
+    t_gas = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    loop_gas(ids, pwf, psi, qg, R)
+    t_gas_loop = time.perf_counter() - t0
+    spread = res["aof"]["lit_pseudopressure"]
+    width = np.nanmedian((spread[:, 2] - spread[:, 0]) / spread[:, 1])
+
+    oil = oil_well_tests(args.wells)
+    inputs = {k: oil[c].to_numpy(float) for k, c in
+              zip(("Pb", "Pws", "Pwf", "Qwf", "Pwf1", "Qwf1"), oil.columns[1:])}
+    sd = {"Pb": 5.0, "Pws": 5.0, "Pwf": 1.0, "Pwf1": 1.0}
+    t0 = time.perf_counter()
+    monte_carlo_oil(**inputs, sd=sd, rate_cv=0.05, n_replicates=R)
+    t_oil = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    loop_oil(inputs, 5.0, 0.05, R)
+    t_oil_loop = time.perf_counter() - t0
+
+    print(f"wells: {args.wells}, replicates: {R}, curve envelopes from {min(R, CURVE_REPLICATES)}")
+    print(f"gas bootstrap : {t_gas:8.2f} s   per-replicate refits: {t_gas_loop:8.2f} s   "
+          f"speedup {t_gas_loop / t_gas:.1f}x   median P10-P90 width {width:.1%} of P50")
+    print(f"oil Monte Carlo: {t_oil:8.2f} s   per-replicate refits: {t_oil_loop:8.2f} s   "
+          f"speedup {t_oil_loop / t_oil:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Concurrent-session load test of the Streamlit app, entirely on localhost.
+
+Starts `streamlit run Homepage.py` headless in a subprocess (unless --url is
+given) and drives it with simulated browser sessions. Each session is a
+websocket client speaking Streamlit's protobuf protocol: it opens the gas or
+oil page, sets widgets the way an engineer would (sample data, curve points,
+ψ from gas gravity; the oil test values one field at a time) and downloads the
+rendered chart images, timing every rerun. A new server is started for each
+concurrency level and the report gives, per level:
+
+- rerun latency percentiles per page and step, and per whole session
+- server CPU time and utilisation (resource.getrusage of the exited server)
+- server peak RSS (resource, logged by the server itself through IPR_PROFILE_LOG)
+- server-side page run times and pyplot figures left open after each run (the
+  pages render without pyplot, so any open figure, and any growth, is a leak)
+
+Run from the repo root:  python -m benchmarks.load_app --sessions 1,8,32 --loops 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+from tornado.websocket import WebSocketClosedError, websocket_connect
+
+PAGES = {"gas": "Gas_Reservoir", "oil": "Oil_Reservoir"}
+
+
+# One simulated browser tab: a websocket session with its widget states
+class Session:
+    def __init__(self, base, page_hashes, timeout, fetch_media):
+        self.base = base
+        self.page_hashes = page_hashes
+        self.timeout = timeout
+        self.fetch_media = fetch_media
+        self.ws = None
+        self.widgets = {}       # label -> (kind, element proto) of the last run
+        self.states = {}        # widget id -> WidgetState sent with every rerun
+        self.cache = {}         # cached ForwardMsgs by hash (the server sends refs to them)
+        self.errors = []
+        self.page = ""
+
+    async def open(self, page):
+        self.ws = await websocket_connect(self.base.replace("http", "ws", 1) + "/_stcore/stream",
+                                          subprotocols=["streamlit"])
+        self.page = self.page_hashes.get(page, "")
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+            self.ws = None
+
+    async def _read_until_finished(self):
+        elements = []
+        while True:
+            raw = await self.ws.read_message()
+            if raw is None:
+                raise ConnectionError("server closed the session")
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "ref_hash":
+                msg, kind = self.cache[msg.ref_hash], self.cache[msg.ref_hash].WhichOneof("type")
+            elif msg.metadata.cacheable:
+                self.cache[msg.hash] = msg
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                elements.append(msg.delta.new_element)
+            elif kind == "script_finished":
+                return elements
+
+    # Rerun the page with the current widget states (plus one-shot triggers);
+    # returns the seconds until the script finished and its images were fetched
+    async def rerun(self, triggers=()):
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page
+        msg.rerun_script.widget_states.widgets.extend(list(self.states.values()) + list(triggers))
+        t0 = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        elements = await asyncio.wait_for(self._read_until_finished(), self.timeout)
+        urls = []
+        self.widgets = {}
+        for element in elements:
+            kind = element.WhichOneof("type")
+            proto = getattr(element, kind)
+            if kind == "exception":
+                self.errors.append(proto.message)
+            elif kind == "imgs":
+                urls += [img.url for img in proto.imgs if img.url.startswith("/")]
+            elif getattr(proto, "id", "") and getattr(proto, "label", ""):
+                self.widgets[proto.label] = (kind, proto)
+        if self.fetch_media and urls:
+            client = AsyncHTTPClient()
+            await asyncio.gather(*(client.fetch(self.base + url, request_timeout=self.timeout) for url in urls))
+        return time.perf_counter() - t0
+
+    # Set a widget by label, as the browser does when the user changes it
+    def set(self, label, value):
+        if label not in self.widgets:
+            raise KeyError(f"widget not on the page: {label!r}")
+        kind, proto = self.widgets[label]
+        state = WidgetState(id=proto.id)
+        if kind == "checkbox":
+            state.bool_value = bool(value)
+        elif kind in ("radio", "selectbox"):
+            state.int_value = list(proto.options).index(value)
+        elif kind in ("text_input", "text_area"):
+            state.string_value = str(value)
+        elif kind == "number_input" and proto.data_type == NumberInput.INT:
+            state.int_value = int(value)
+        elif kind == "number_input":
+            state.double_value = float(value)
+        else:
+            raise ValueError(f"unsupported widget type: {kind}")
+        self.states[proto.id] = state
+
+
+# Gas page: open, use the sample data, change the curve points, then compute ψ from gas gravity
+async def gas_scenario(s, rng, think):
+    steps = [("open", None)]
+    steps.append(("sample data", lambda: s.set("Choose Data Source:", "Use Sample Data")))
+    steps.append(("curve points", lambda: s.set("Curve points:", int(rng.integers(2, 40)) * 5)))
+    steps.append(("ψ from gravity", lambda: s.set("Compute ψ from gas gravity and temperature", True)))
+    steps.append(("gas gravity", lambda: s.set("Gas gravity (air = 1):", round(rng.uniform(0.6, 0.9), 2))))
+    return await _play(s, steps, think, rng)
+
+
+# Oil page: open, type the test values one field at a time, then change the curve points
+async def oil_scenario(s, rng, think):
+    Pws = float(rng.uniform(150, 350))
+    values = {"Enter Bubble Point Pressure:": round(Pws * rng.uniform(0.5, 1.3), 1),
+              "Enter Stabilized Reservoir Pressure:": round(Pws, 1),
+              "Enter Flowing Pressure 1:": round(Pws * rng.uniform(0.4, 0.9), 1),
+              "Enter Flow rate at above flowing pressure 1:": round(rng.uniform(50, 500), 1)}
+    steps = [("open", None)]
+    steps += [(label.split(":")[0].replace("Enter ", ""), lambda label=label, v=v: s.set(label, v))
+              for label, v in values.items()]
+    steps.append(("curve points", lambda: s.set("Curve points per segment:", int(rng.integers(5, 50)))))
+    return await _play(s, steps, think, rng)
+
+
+async def _play(s, steps, think, rng):
+    timings = []
+    for name, action in steps:
+        if action is not None:
+            action()
+        timings.append((name, await s.rerun()))
+        if think:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think)
+    return timings
+
+
+SCENARIOS = {"gas": gas_scenario, "oil": oil_scenario}
+
+
+# One simulated user: `loops` fresh sessions on their page, all timings recorded
+async def _user(k, args, base, page_hashes, pages, records, errors):
+    rng = np.random.default_rng(args.seed + k)
+    page = pages[k % len(pages)]
+    for _ in range(args.loops):
+        s = Session(base, page_hashes, args.timeout, not args.no_media)
+        t0 = time.perf_counter()
+        try:
+            await s.open(PAGES[page])
+            steps = await SCENARIOS[page](s, rng, args.think)
+        except (OSError, HTTPClientError, WebSocketClosedError, KeyError, ValueError, asyncio.TimeoutError) as exc:
+            errors.append(f"{page}: {type(exc).__name__}: {exc}")
+            continue
+        finally:
+            s.close()
+        errors += [f"{page}: {message}" for message in s.errors]
+        records += [(page, name, seconds) for name, seconds in steps]
+        records.append((page, "session", time.perf_counter() - t0))
+
+
+# Page script hashes by page name, from the new_session message of a throwaway session
+async def discover_pages(base):
+    ws = await websocket_connect(base.replace("http", "ws", 1) + "/_stcore/stream", subprotocols=["streamlit"])
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    await ws.write_message(msg.SerializeToString(), binary=True)
+    try:
+        while True:
+            raw = await ws.read_message()
+            if raw is None:
+                raise ConnectionError("server closed the session")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            if fwd.WhichOneof("type") == "new_session":
+                return {p.page_name: p.page_script_hash for p in fwd.new_session.app_pages}
+    finally:
+        ws.close()
+
+
+async def drive(base, args, sessions, pages):
+    page_hashes = await discover_pages(base)
+    records, errors = [], []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_user(k, args, base, page_hashes, pages, records, errors) for k in range(sessions)))
+    return {"seconds": time.perf_counter() - t0, "records": records, "errors": errors}
+
+
+async def _wait_for(base, timeout=60.0):
+    client = AsyncHTTPClient()
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            await client.fetch(base + "/_stcore/health", request_timeout=2)
+            return
+        except (OSError, HTTPClientError):     # refused until the server listens, 503 while starting
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+# Start a fresh server, run one concurrency level against it, stop it and
+# collect its CPU time (getrusage of the exited child) and profile log
+def run_against_local(args, sessions, pages):
+    log = tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False)
+    log.close()
+    env = dict(os.environ, PYTHONPATH=os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    if not args.no_profile:
+        env.update(IPR_PROFILE="1", IPR_PROFILE_LOG=log.name)
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    server = subprocess.Popen([sys.executable, "-m", "streamlit", "run", "Homepage.py",
+                               "--server.headless", "true", "--server.port", str(args.port),
+                               "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(_wait_for(base))
+        result = asyncio.run(drive(base, args, sessions, pages))
+    finally:
+        server.terminate()
+        server.wait()
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    result["server"] = {"cpu_seconds": cpu, "cpu_utilisation": cpu / result["seconds"],
+                        **server_log(log.name)}
+    # ru_maxrss of children is the largest of every child so far; only a fallback
+    if result["server"].get("peak_rss_bytes") is None:
+        result["server"]["peak_rss_bytes"] = after.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    os.unlink(log.name)
+    return result
+
+
+# Page run times, peak RSS and open pyplot figures from the server's IPR_PROFILE_LOG
+def server_log(path):
+    with open(path, encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    if not runs:
+        return {"peak_rss_bytes": None}
+    figures = [r.get("open_figures", 0) for r in runs]
+    out = {"page_runs": len(runs), "peak_rss_bytes": max(r["peak_rss_bytes"] or 0 for r in runs) or None,
+           "open_figures_first": figures[0], "open_figures_last": figures[-1], "open_figures_max": max(figures),
+           "pages": {}}
+    for page in sorted({r["page"] for r in runs}):
+        ms = np.array([r["seconds"] for r in runs if r["page"] == page]) * 1e3
+        out["pages"][page] = {"runs": len(ms), "p50_ms": float(np.percentile(ms, 50)),
+                              "p99_ms": float(np.percentile(ms, 99))}
+    return out
+
+
+def summarize(records):
+    rows = {}
+    for page, step, seconds in records:
+        rows.setdefault((page, step), []).append(seconds * 1e3)
+    out = []
+    for (page, step), ms in rows.items():
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        out.append({"page": page, "step": step, "n": len(ms), "p50_ms": float(p50), "p90_ms": float(p90),
+                    "p99_ms": float(p99), "max_ms": float(max(ms))})
+    return out
+
+
+def report(sessions, result):
+    reruns = result["reruns"]
+    print(f"\n{sessions} concurrent sessions: {reruns} reruns in {result['seconds']:.1f} s "
+          f"({reruns / result['seconds']:.1f}/s), {len(result['errors'])} errors")
+    for row in result["latency"]:
+        print(f"    {row['page']:<4} {row['step']:<38} n {row['n']:>4}   p50 {row['p50_ms']:8.1f} ms   "
+              f"p90 {row['p90_ms']:8.1f} ms   p99 {row['p99_ms']:8.1f} ms")
+    for message in sorted(set(result["errors"]))[:5]:
+        print(f"    error: {message[:160]}")
+    server = result.get("server")
+    if not server:
+        return
+    print(f"    server CPU {server['cpu_seconds']:.1f} s ({server['cpu_utilisation']:.0%} of one core)")
+    if server["peak_rss_bytes"]:
+        print(f"    server peak RSS {server['peak_rss_bytes'] / 2**20:.0f} MiB")
+    for page, row in server.get("pages", {}).items():
+        print(f"    server {page:<14} {row['runs']:>4} runs   p50 {row['p50_ms']:8.1f} ms   p99 {row['p99_ms']:8.1f} ms")
+    if "open_figures_max" in server:
+        leak = server["open_figures_max"] > 0
+        print(f"    pyplot figures open after page runs: first {server['open_figures_first']}, "
+              f"last {server['open_figures_last']}, max {server['open_figures_max']}"
+              + ("  <-- figure leak" if leak else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="existing app, e.g. http://127.0.0.1:8501 (client metrics only)")
+    parser.add_argument("--port", type=int, default=8598, help="port for the local server")
+    parser.add_argument("--sessions", default="1,8,32", help="concurrency levels, comma separated")
+    parser.add_argument("--loops", type=int, default=2, help="fresh sessions opened by each simulated user")
+    parser.add_argument("--pages", default="gas,oil", help="pages the users are spread over")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between interactions")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds allowed per rerun")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-media", action="store_true", help="do not download rendered images")
+    parser.add_argument("--no-profile", action="store_true",
+                        help="run the server without IPR_PROFILE (no page times, peak RSS or figure check)")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    args = parser.parse_args()
+    pages = args.pages.split(",")
+    print(f"pages: {args.pages}, loops per user: {args.loops}, think time: {args.think:g} s")
+
+    results = []
+    for sessions in (int(n) for n in args.sessions.split(",")):
+        if args.url:
+            result = asyncio.run(drive(args.url.rstrip("/"), args, sessions, pages))
+        else:
+            result = run_against_local(args, sessions, pages)
+        result["sessions"] = sessions
+        result["reruns"] = sum(1 for _, step, _ in result["records"] if step != "session")
+        result["latency"] = summarize(result.pop("records"))
+        report(sessions, result)
+        results.append(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
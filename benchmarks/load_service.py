@@ -0,0 +1,155 @@
+"""Load generator for the IPR service (ipr.service), entirely on localhost.
+
+Starts the service in a subprocess (unless --url is given), drives it with
+concurrent keep-alive clients for a fixed duration and reports client-side
+p50/p99 latency and throughput next to the server's /metrics. By default it
+runs twice: without batching (max batch 1) and with micro-batching.
+
+Run from the repo root:  python -m benchmarks.load_service --clients 64 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from ipr.synthetic import gas_well_tests
+
+
+def _request(path, body=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    method = "POST" if body is not None else "GET"
+    return (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n").encode() + payload
+
+
+async def _response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return status, json.loads(await reader.readexactly(length))
+
+
+# A pool of prepared request bodies: gas fits of synthetic wells, oil fits and Vogel curves
+def request_pool(kinds, n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    pool = []
+    if "gas" in kinds:
+        tests = gas_well_tests(n, seed=seed)
+        for _, well in tests.groupby("Well ID", sort=False):
+            pool.append(_request("/gas/fit", {"pwf": well.iloc[:, 1].tolist(), "psi": well.iloc[:, 2].tolist(),
+                                              "qg": well.iloc[:, 3].tolist()}))
+    if "oil_fit" in kinds:
+        for Pb, Pws in zip(rng.uniform(100, 300, n), rng.uniform(150, 400, n)):
+            pool.append(_request("/oil/fit", {"Pb": Pb, "Pws": Pws, "Pwf": 0.6 * Pws, "Qwf": 500.0,
+                                              "Pwf1": 0.4 * Pws, "Qwf1": 700.0}))
+    if "oil_curve" in kinds:
+        for Pws, Qmax in zip(rng.uniform(150, 400, n), rng.uniform(200, 5000, n)):
+            pool.append(_request("/oil/curve", {"method": "vogel", "Pws": Pws, "Qmax": Qmax,
+                                                "pwf": np.linspace(Pws, 0, 20).tolist()}))
+    rng.shuffle(pool)
+    return pool
+
+
+async def _client(host, port, pool, offset, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            writer.write(pool[i % len(pool)])
+            await writer.drain()
+            status, _ = await _response(reader)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def drive(host, port, pool, clients, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, pool, k * 997, deadline, latencies, errors)
+                           for k in range(clients)))
+    elapsed = time.perf_counter() - t0
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(_request("/metrics"))
+    _, metrics = await _response(reader)
+    writer.close()
+    ms = np.array(latencies) * 1e3
+    return {"requests": len(ms), "errors": len(errors), "rps": len(ms) / elapsed,
+            "p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99)),
+            "server": metrics}
+
+
+async def _wait_for(host, port, timeout=20.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def run_against_local(args, pool, window_ms, max_batch):
+    env = dict(os.environ, PYTHONPATH=os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    server = subprocess.Popen([sys.executable, "-m", "ipr.service", "--port", str(args.port),
+                               "--window-ms", str(window_ms), "--max-batch", str(max_batch)],
+                              stdout=subprocess.DEVNULL, env=env)
+    try:
+        asyncio.run(_wait_for("127.0.0.1", args.port))
+        return asyncio.run(drive("127.0.0.1", args.port, pool, args.clients, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(label, result):
+    print(f"{label:<28} {result['rps']:9,.0f} req/s   p50 {result['p50_ms']:7.2f} ms   "
+          f"p99 {result['p99_ms']:7.2f} ms   errors {result['errors']}")
+    for endpoint, row in result["server"]["endpoints"].items():
+        batches = f", mean batch {row['mean_batch']:.1f}" if "mean_batch" in row else ""
+        print(f"    server {endpoint:<11} p50 {row['p50_ms']:6.2f} ms  p99 {row['p99_ms']:6.2f} ms{batches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="existing service, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--port", type=int, default=8799, help="port for the local service")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--kinds", default="gas,oil_fit,oil_curve",
+                        help="request mix: any of gas, oil_fit, oil_curve")
+    args = parser.parse_args()
+    pool = request_pool(args.kinds.split(","))
+    print(f"clients: {args.clients}, duration: {args.duration:.0f} s, mix: {args.kinds}")
+
+    if args.url:
+        host, port = args.url.split("//")[-1].rstrip("/").split(":")
+        report(args.url, asyncio.run(drive(host, int(port), pool, args.clients, args.duration)))
+        return
+    report("unbatched (max batch 1)", run_against_local(args, pool, 0.0, 1))
+    report(f"batched ({args.window_ms:g} ms, {args.max_batch})",
+           run_against_local(args, pool, args.window_ms, args.max_batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""Benchmark suite: every computation path of the gas and oil pages, the batch
+engines and the page renders, on synthetic fields of configurable size.
+
+Results are written as JSON (with the commit, versions and machine) so runs can
+be compared across commits; `compare` flags cases slower than a threshold and
+exits non-zero, for use in CI.
+
+Run from the repo root:
+    python -m benchmarks.suite run --wells 1,1000,100000 -o bench.json
+    python -m benchmarks.suite run --wells 1,1000 --baseline bench.json --threshold 0.15
+    python -m benchmarks.suite compare old.json new.json --threshold 0.15
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+SAMPLE = "gas_well_data.csv"
+
+
+# Best-of timing after one warm-up call (imports, caches): repeat until min_time
+# has been spent (at least once, at most max_repeat). reset, if given, runs
+# untimed before every call (e.g. to empty caches for a cold timing).
+def timed(fn, min_time=0.3, max_repeat=1000, reset=None):
+    fn()
+    times = []
+    while not times or (sum(times) < min_time and len(times) < max_repeat):
+        if reset is not None:
+            reset()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), len(times)
+
+
+# Empty the process-wide result cache and the chart renderer's cache so a page
+# render recomputes everything. A cache with a disk tier (IPR_CACHE_DIR) is
+# swapped for a memory-only one rather than cleared, to keep the files.
+def _cold_caches():
+    from ipr import cache, plots
+
+    with cache._default_lock:
+        old = cache._default
+        if old is not None and old.disk_dir is None:
+            old.clear()
+        elif old is not None:
+            cache._default = cache.ResultCache(old.max_entries, old.max_bytes)
+    plots.default_renderer().cache.clear()
+
+
+class Field:
+    """Synthetic gas and oil tests for one field size, generated on first use."""
+
+    def __init__(self, n_wells, seed=0, noise=0.02, mix=None):
+        self.n_wells, self.seed, self.noise, self.mix = n_wells, seed, noise, mix
+        self._cache = {}
+
+    def _get(self, key, make):
+        if key not in self._cache:
+            self._cache[key] = make()
+        return self._cache[key]
+
+    @property
+    def gas(self):
+        from ipr.synthetic import gas_well_tests
+        return self._get("gas", lambda: gas_well_tests(self.n_wells, noise=self.noise, seed=self.seed,
+                                                       pressure_noise=2.0))
+
+    @property
+    def oil(self):
+        from ipr.synthetic import oil_well_tests
+        return self._get("oil", lambda: oil_well_tests(self.n_wells, self.noise, self.seed, self.mix))
+
+    @property
+    def multirate(self):
+        from ipr.synthetic import oil_multirate_tests
+        return self._get("multirate", lambda: oil_multirate_tests(self.n_wells, seed=self.seed))
+
+    @property
+    def gas_fit(self):
+        from ipr.gas_batch import fit_gas_wells
+        return self._get("gas_fit", lambda: fit_gas_wells(self.gas))
+
+    @property
+    def oil_fit(self):
+        from ipr.oil_batch import fit_oil_wells
+        return self._get("oil_fit", lambda: fit_oil_wells(self.oil))
+
+    # The first n wells, one DataFrame each, in the page's single-well layout
+    def gas_wells(self, n):
+        wells = self.gas.groupby("Well ID", sort=False)
+        return [w.drop(columns="Well ID").reset_index(drop=True) for _, w in list(wells)[:n]]
+
+
+# Page paths run well by well (as the pages do) on at most PAGE_WELLS wells and
+# report the per-well time; batch paths run on the whole field.
+PAGE_WELLS = 200
+
+
+def _page_gas(field, psi=False):
+    from ipr.gas import compare_gas_methods
+    from ipr.pseudo import pseudo_pressure_table
+
+    wells = field.gas_wells(PAGE_WELLS)
+    psi_fn = pseudo_pressure_table(0.65, 200.0) if psi else None
+    return lambda: [compare_gas_methods(w, 20, psi_fn) for w in wells], len(wells)
+
+
+def _page_oil(field, saturated):
+    from ipr.oil import saturated_ipr, undersaturated_ipr
+    from ipr.synthetic import oil_well_tests
+
+    mix = (1, 0, 0) if saturated else (0, 1, 1)
+    tests = oil_well_tests(min(field.n_wells, PAGE_WELLS), field.noise, field.seed, mix)
+    rows = list(tests.iloc[:, 1:].itertuples(index=False, name=None))
+    if saturated:
+        return lambda: [saturated_ipr(Pws, Pwf, Qwf, Pwf1, Qwf1) for Pb, Pws, Pwf, Qwf, Pwf1, Qwf1 in rows], len(rows)
+    return lambda: [undersaturated_ipr(Pws, Pb, Pwf, Qwf) for Pb, Pws, Pwf, Qwf, _, _ in rows], len(rows)
+
+
+def _render(chart):
+    from ipr.plots import render_bytes
+
+    return lambda: render_bytes(chart), 1
+
+
+def _gas_chart(field):
+    from ipr.gas import compare_gas_methods
+    from ipr.plots import gas_comparison_chart
+
+    return _render(gas_comparison_chart(compare_gas_methods(field.gas_wells(1)[0])[0]))
+
+
+def _oil_chart(field):
+    from ipr.oil import saturated_ipr
+    from ipr.plots import oil_saturated_chart
+
+    res = saturated_ipr(2500.0, 2000.0, 500.0, 1500.0, 800.0)
+    return _render(oil_saturated_chart(res["table"], 2500.0))
+
+
+def _bootstrap(field):
+    from ipr.uncertainty import bootstrap_gas
+
+    g = field.gas
+    cols = [g.iloc[:, i].to_numpy() for i in range(4)]
+    return lambda: bootstrap_gas(cols[0], *(c.astype(float) for c in cols[1:]), n_replicates=1000), field.n_wells
+
+
+def _monte_carlo(field):
+    from ipr.uncertainty import monte_carlo_oil
+
+    o = field.oil
+    inputs = [o.iloc[:, i].to_numpy(float) for i in range(1, 7)]
+    return lambda: monte_carlo_oil(*inputs, sd={"Pws": 5.0, "Pb": 5.0}, rate_cv=0.05), field.n_wells
+
+
+def _batch(fn_name):
+    def setup(field):
+        from ipr import gas_batch, multirate, oil_batch
+
+        n = field.n_wells
+        return {
+            "gas_batch.fit_gas_wells": lambda: (lambda: gas_batch.fit_gas_wells(field.gas), n),
+            "gas_batch.gas_curves": lambda: (lambda: gas_batch.gas_curves(field.gas_fit, 20), n),
+            "oil_batch.fit_oil_wells": lambda: (lambda: oil_batch.fit_oil_wells(field.oil), n),
+            "oil_batch.oil_curves": lambda: (lambda: oil_batch.oil_curves(field.oil_fit, 10), n),
+            "multirate.fit_multirate_wells": lambda: (lambda: multirate.fit_multirate_wells(field.multirate), n),
+        }[fn_name]()
+    return setup
+
+
+def _pseudo(field):
+    from ipr.pseudo import pseudo_pressure
+
+    p = field.gas.iloc[:, 1].to_numpy(float)
+    return lambda: pseudo_pressure(p, 0.65, 200.0), field.n_wells
+
+
+def _forecast(field):
+    from ipr.forecast import decline_profile, forecast_gas
+
+    fit = field.gas_fit
+    G = np.full(field.n_wells, 2e7)
+    times = np.arange(0.0, 365.0, 7.0)
+    return lambda: decline_profile(forecast_gas(fit, G, 0.3 * fit["Pr"], times), per_well=False), field.n_wells
+
+
+# App pages through streamlit's test runner (skipped when streamlit is missing).
+# st.page_link needs the multipage runtime, so it is stubbed out of the page source.
+# Timed cold: the result and chart caches persist across runs, so they are emptied
+# before each one (otherwise every repeat after the warm-up is a cache hit).
+def _page_render(page, inputs):
+    def setup(field):
+        from streamlit.testing.v1 import AppTest
+
+        with open(page, encoding="utf-8") as f:
+            source = f.read().replace("st.page_link(", "(lambda *args, **kwargs: None)(")
+
+        def run():
+            at = AppTest.from_string(source, default_timeout=120).run()
+            inputs(at)
+            if at.exception:
+                raise RuntimeError(f"{page}: {at.exception[0].message}")
+        return run, 1, _cold_caches
+    return setup
+
+
+def _gas_page_inputs(at):
+    at.radio[0].set_value("Use Sample Data").run()
+
+
+def _oil_page_inputs(at):
+    at.text_input[0].set_value("3000")
+    at.text_input[1].set_value("2500")
+    at.run()
+    at.text_input(key="Pwf").set_value("2000")
+    at.text_input(key="Qwf").set_value("500")
+    at.run()
+    at.text_input(key="Pwf1").set_value("1500")
+    at.text_input(key="Qwf1").set_value("800")
+    at.run()
+
+
+# name -> (group, setup(field) -> (fn, wells timed[, reset]), largest field it runs on);
+# cases with a reset are timed cold (caches emptied by reset), the rest warm;
+# "once" cases do not depend on the field and run on the first size only
+CASES = {
+    "gas.compare_gas_methods": ("gas page", _page_gas, None),
+    "gas.compare_gas_methods+psi_table": ("gas page", lambda f: _page_gas(f, psi=True), None),
+    "plots.gas_comparison_chart": ("gas page", _gas_chart, "once"),
+    "uncertainty.bootstrap_gas": ("gas page", _bootstrap, 10_000),
+    "oil.saturated_ipr": ("oil page", lambda f: _page_oil(f, True), None),
+    "oil.undersaturated_ipr": ("oil page", lambda f: _page_oil(f, False), None),
+    "plots.oil_saturated_chart": ("oil page", _oil_chart, "once"),
+    "uncertainty.monte_carlo_oil": ("oil page", _monte_carlo, 10_000),
+    "page.gas_reservoir": ("render", _page_render("pages/1_Gas_Reservoir.py", _gas_page_inputs), "once"),
+    "page.oil_reservoir": ("render", _page_render("pages/2_Oil_Reservoir.py", _oil_page_inputs), "once"),
+    "gas_batch.fit_gas_wells": ("batch", _batch("gas_batch.fit_gas_wells"), None),
+    "gas_batch.gas_curves": ("batch", _batch("gas_batch.gas_curves"), None),
+    "oil_batch.fit_oil_wells": ("batch", _batch("oil_batch.fit_oil_wells"), None),
+    "oil_batch.oil_curves": ("batch", _batch("oil_batch.oil_curves"), None),
+    "multirate.fit_multirate_wells": ("batch", _batch("multirate.fit_multirate_wells"), None),
+    "pseudo.pseudo_pressure": ("batch", _pseudo, None),
+    "forecast.forecast_gas": ("batch", _forecast, 100_000),
+}
+
+
+def machine_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {"commit": commit, "dirty": dirty,
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def run_suite(well_counts, cases=None, min_time=0.2, mix=None, log=print):
+    selected = {k: v for k, v in CASES.items() if not cases or any(c in k for c in cases)}
+    results = []
+    for n_wells in well_counts:
+        field = Field(n_wells, mix=mix)
+        for name, (group, setup, max_wells) in selected.items():
+            if max_wells == "once" and n_wells != well_counts[0]:
+                continue
+            if isinstance(max_wells, int) and n_wells > max_wells:
+                continue
+            row = {"case": name, "group": group, "field_wells": n_wells}
+            try:
+                fn, timed_wells, *reset = setup(field)
+                seconds, repeats = timed(fn, min_time, reset=reset[0] if reset else None)
+                row.update(seconds=seconds, wells=timed_wells, repeats=repeats,
+                           us_per_well=seconds / max(timed_wells, 1) * 1e6,
+                           cache="cold" if reset else "warm")
+            except ImportError as exc:
+                row.update(skipped=f"{type(exc).__name__}: {exc}")
+            except Exception as exc:
+                row.update(error=f"{type(exc).__name__}: {exc}")
+            results.append(row)
+            if "seconds" in row:
+                log(f"{name:<36} {n_wells:>9,} wells  {row['seconds'] * 1e3:10.2f} ms  "
+                    f"({row['us_per_well']:9.2f} µs/well over {row['wells']:,}, {row['cache']})")
+            else:
+                log(f"{name:<36} {n_wells:>9,} wells  {'skipped' if 'skipped' in row else 'ERROR'}: "
+                    f"{row.get('skipped') or row.get('error')}")
+    return results
+
+
+# Cases present in both runs: new / old time ratio; regressions exceed 1 + threshold
+# and are at least min_delta seconds slower (below that it is timer noise).
+# Cold and warm timings of a case are not compared (older files are all warm).
+def compare(old, new, threshold=0.10, min_delta=1e-4):
+    old_rows = {(r["case"], r["field_wells"]): r for r in old["results"] if "seconds" in r}
+    rows = []
+    for r in new["results"]:
+        base = old_rows.get((r["case"], r["field_wells"]))
+        if base is None or "seconds" not in r or base.get("cache", "warm") != r.get("cache", "warm"):
+            continue
+        ratio = r["seconds"] / base["seconds"]
+        noise = abs(r["seconds"] - base["seconds"]) < min_delta
+        rows.append({"case": r["case"], "field_wells": r["field_wells"], "old_s": base["seconds"],
+                     "new_s": r["seconds"], "ratio": ratio,
+                     "status": "same" if noise else "slower" if ratio > 1 + threshold else
+                               "faster" if ratio < 1 / (1 + threshold) else "same"})
+    return rows
+
+
+def print_comparison(rows, old_meta, new_meta, threshold):
+    print(f"\n{old_meta.get('commit')} -> {new_meta.get('commit')} (threshold {threshold:.0%})")
+    for r in rows:
+        flag = {"slower": "  REGRESSION", "faster": "  faster", "same": ""}[r["status"]]
+        print(f"{r['case']:<36} {r['field_wells']:>9,} wells  {r['old_s'] * 1e3:10.2f} -> "
+              f"{r['new_s'] * 1e3:10.2f} ms  x{r['ratio']:.2f}{flag}")
+    n_bad = sum(r["status"] == "slower" for r in rows)
+    print(f"{len(rows)} cases compared, {n_bad} regressions")
+    return n_bad
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="run the suite and write JSON results")
+    run.add_argument("--wells", default="1,1000,100000",
+                     help="comma-separated field sizes, 1 to 1000000 (default: %(default)s)")
+    run.add_argument("--cases", default=None, help="comma-separated substrings of case names to run")
+    run.add_argument("--mix", default=None,
+                     help="oil regime shares saturated,above-Pb,below-Pb, e.g. 0.6,0.2,0.2")
+    run.add_argument("--min-time", type=float, default=0.3, help="seconds spent per case (best-of)")
+    run.add_argument("-o", "--output", default="bench_results.json")
+    run.add_argument("--baseline", default=None, help="compare against this results file")
+    run.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    cmp = sub.add_parser("compare", help="compare two results files")
+    cmp.add_argument("old")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        old, new = _load(args.old), _load(args.new)
+        return 1 if print_comparison(compare(old, new, args.threshold), old["meta"], new["meta"],
+                                     args.threshold) else 0
+
+    warnings.simplefilter("ignore", RuntimeWarning)     # NaN fits of noisy synthetic wells
+    well_counts = [int(w) for w in args.wells.split(",")]
+    if not all(1 <= w <= 1_000_000 for w in well_counts):
+        parser.error("field sizes must be between 1 and 1000000 wells")
+    mix = [float(x) for x in args.mix.split(",")] if args.mix else None
+    meta = machine_info()
+    print(f"commit {meta['commit']}{' (dirty)' if meta['dirty'] else ''}, numpy {meta['numpy']}, "
+          f"{meta['cpus']} CPUs")
+    results = run_suite(well_counts, args.cases.split(",") if args.cases else None, args.min_time, mix)
+    out = {"meta": dict(meta, wells=well_counts, mix=mix), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=1)
+    print(f"-> {args.output}")
+    if args.baseline:
+        base = _load(args.baseline)
+        return 1 if print_comparison(compare(base, out, args.threshold), base["meta"], meta,
+                                     args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
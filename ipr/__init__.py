@@ -0,0 +1,25 @@
+"""Computational core for the IPR web app (no Streamlit required).
+
+Only NumPy is imported eagerly; scipy, pandas and matplotlib are imported by
+the functions that need them.
+"""
+from ipr.gas import (
+    simplified_backpressure,
+    lit_pressure_squared,
+    lit_pressure_approx,
+    lit_pseudopressure,
+    compare_gas_methods,
+)
+from ipr.oil import (
+    return_Qmax,
+    curve_IPR_Vogel,
+    Productivity_Index,
+    curve_IPR_constJ,
+    undersaturated1,
+    Calc_J,
+    fetkovich,
+    curve_fetkovich,
+    curve_fetkovich_undersaturated,
+    saturated_ipr,
+    undersaturated_ipr,
+)
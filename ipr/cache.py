@@ -0,0 +1,253 @@
+"""Content-addressed cache for IPR computations and rendered plots.
+
+Keys are hashes of the function name and the *content* of its arguments
+(DataFrames, arrays, scalars), so the same test data gives the same key in
+every session. Results live in a bounded in-memory LRU tier and, optionally,
+in an on-disk tier of pickles that survives restarts and is shared by the
+processes of one server. Both tiers evict least-recently-used entries when
+they exceed their size limits.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import types
+from collections import OrderedDict
+
+import numpy as np
+
+MB = 1024 * 1024
+
+
+def _feed(h, obj):
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        h.update(repr((type(obj).__name__, obj)).encode())
+    elif isinstance(obj, np.generic):
+        _feed(h, obj.item())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr(("ndarray", obj.dtype.str, obj.shape)).encode())
+        if obj.dtype.hasobject:
+            _feed(h, obj.tolist())
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif type(obj).__module__.startswith("pandas"):
+        import pandas as pd
+
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            h.update(repr((type(obj).__name__, obj.shape)).encode())
+            if isinstance(obj, pd.DataFrame):
+                _feed(h, [str(c) for c in obj.columns])
+                _feed(h, [str(d) for d in obj.dtypes])
+            else:
+                _feed(h, (str(obj.name), str(obj.dtype)))
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        else:
+            h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for key in sorted(obj, key=repr):
+            _feed(h, key)
+            _feed(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(repr((type(obj).__name__, len(obj))).encode())
+        for item in obj:
+            _feed(h, item)
+    elif isinstance(obj, (types.FunctionType, types.MethodType, types.BuiltinFunctionType, type)):
+        h.update(f"{obj.__module__}.{obj.__qualname__}".encode())
+        # bound methods and closures also depend on the state they carry
+        owner = getattr(obj, "__self__", None)
+        if owner is not None and not isinstance(owner, types.ModuleType):
+            _feed(h, owner)
+        for cell in getattr(obj, "__closure__", None) or ():
+            _feed(h, cell.cell_contents)
+    elif callable(obj) and hasattr(obj, "__dict__"):
+        # callable objects (e.g. a pseudo-pressure table) are keyed by their state
+        h.update(f"{type(obj).__module__}.{type(obj).__qualname__}".encode())
+        _feed(h, vars(obj))
+    else:
+        h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+# Stable hex digest of the content of any mix of scalars, arrays, DataFrames and containers
+def content_hash(*parts):
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        _feed(h, part)
+    return h.hexdigest()
+
+
+# Approximate memory held by a cached value
+def sizeof(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if type(value).__module__.startswith("pandas") and hasattr(value, "memory_usage"):
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    def __init__(self, max_entries=256, max_bytes=256 * MB, disk_dir=None, disk_max_bytes=1024 * MB):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries = OrderedDict()     # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (self.disk_dir is not None and os.path.exists(self._path(key)))
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key + ".pkl")
+
+    def key(self, fn, *args, **kwargs):
+        return content_hash(fn, args, kwargs)
+
+    # Value for key, or default. Disk hits are promoted to the memory tier.
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+        if self.disk_dir is not None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    value = pickle.load(f)
+                os.utime(self._path(key))
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._put_memory(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._put_memory(key, value)
+        if self.disk_dir is not None:
+            self._put_disk(key, value)
+
+    def _put_memory(self, key, value):
+        size = sizeof(value)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def _put_disk(self, key, value):
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return
+        self._trim_disk()
+
+    # Drop least recently used files until the disk tier fits its budget
+    def _trim_disk(self):
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".pkl"):
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    # fn(*args, **kwargs), looked up by the content hash of fn and its arguments
+    def get_or_compute(self, fn, *args, **kwargs):
+        key = self.key(fn, *args, **kwargs)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = fn(*args, **kwargs)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk_dir is not None:
+            for entry in os.scandir(self.disk_dir):
+                if entry.name.endswith(".pkl"):
+                    os.remove(entry.path)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+# Process-wide cache shared by all sessions of the app. Configured with
+# IPR_CACHE_ENTRIES, IPR_CACHE_MB and IPR_CACHE_DIR (enables the disk tier).
+def default_cache():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ResultCache(
+                max_entries=int(os.environ.get("IPR_CACHE_ENTRIES", 256)),
+                max_bytes=int(os.environ.get("IPR_CACHE_MB", 256)) * MB,
+                disk_dir=os.environ.get("IPR_CACHE_DIR") or None,
+            )
+        return _default
+
+
+# Decorator form: calls go through cache (default_cache() when not given)
+def cached(cache=None):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return (cache or default_cache()).get_or_compute(fn, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,178 @@
+"""Parquet and Arrow IPC input/output for well tests and IPR results.
+
+Parquet is the compact on-disk format; Arrow IPC (.arrow / .feather) files are
+memory-mapped and read without copying, which suits repeated analyses of the
+same field dataset. Column projection is passed straight to pyarrow so unused
+columns are never read. pyarrow is imported on first use.
+"""
+import os
+
+import numpy as np
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def file_format(path):
+    suffix = os.path.splitext(str(getattr(path, "name", path)))[1].lower()
+    if suffix in PARQUET_SUFFIXES:
+        return "parquet"
+    if suffix in ARROW_SUFFIXES:
+        return "arrow"
+    if suffix == ".csv":
+        return "csv"
+    raise ValueError(f"unsupported file type: {suffix or path}")
+
+
+def is_columnar(path):
+    try:
+        return file_format(path) in ("parquet", "arrow")
+    except ValueError:
+        return False
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+# Read a Parquet or Arrow IPC file as a pyarrow Table. Local files are
+# memory-mapped; Arrow IPC columns then point straight into the mapping.
+def read_table(source, columns=None, memory_map=True):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _rewind(source)
+    fmt = file_format(source)
+    if fmt == "parquet":
+        return pq.read_table(source, columns=columns, memory_map=memory_map)
+    if fmt == "arrow":
+        if isinstance(source, (str, os.PathLike)) and memory_map:
+            source = pa.memory_map(str(source), "r")
+        table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns is not None else table
+    raise ValueError("read_table() reads Parquet or Arrow IPC files")
+
+
+def column_names(source):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _rewind(source)
+    if file_format(source) == "parquet":
+        names = pq.read_schema(source).names
+    else:
+        names = pa.ipc.open_file(source).schema.names
+    _rewind(source)
+    return names
+
+
+# Row count from the file metadata, without reading any column data
+def count_rows(source):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _rewind(source)
+    if file_format(source) == "parquet":
+        n = pq.ParquetFile(source).metadata.num_rows
+    else:
+        reader = pa.ipc.open_file(source)
+        n = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    _rewind(source)
+    return n
+
+
+def read_frame(source, columns=None, memory_map=True):
+    return read_table(source, columns, memory_map).to_pandas()
+
+
+# Stream record batches (bounded memory) from a Parquet or Arrow IPC file
+def iter_frames(source, columns=None, batch_size=100_000):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _rewind(source)
+    if file_format(source) == "parquet":
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        table = read_table(source, columns)
+        for batch in table.to_batches(max_chunksize=batch_size):
+            yield pa.Table.from_batches([batch]).to_pandas()
+
+
+# Write a DataFrame (or dict of equal-length arrays) as Parquet, Arrow IPC or CSV
+# depending on the file suffix
+def write_frame(data, path, compression="zstd"):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    fmt = file_format(path)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        pq.write_table(table, path, compression=compression)
+    else:
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def to_bytes(data, fmt="parquet", compression="zstd"):
+    import io
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    buf = io.BytesIO()
+    if fmt == "parquet":
+        pq.write_table(table, buf, compression=compression)
+    else:
+        with pa.ipc.new_file(buf, table.schema) as writer:
+            writer.write_table(table)
+    return buf.getvalue()
+
+
+# Incremental Parquet writer for results produced batch by batch
+class ParquetAppender:
+    def __init__(self, path, compression="zstd"):
+        self.path = path
+        self.compression = compression
+        self._writer = None
+        self._schema = None
+
+    def write(self, data):
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression=self.compression)
+        else:
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Flat per-well table from a batch fit dict (ipr.gas_batch.fit_gas_arrays)
+def fit_frame(fit):
+    import pandas as pd
+
+    return pd.DataFrame({k: np.asarray(v) for k, v in fit.items()})
@@ -0,0 +1,142 @@
+"""Commingled (multi-layer) IPR: the well's inflow as the sum of its layers.
+
+Every layer has its own model: for oil its Pb, Pws and the fitted Vogel /
+Fetkovich / constant-J parameters (a fit_oil_arrays() fit, one entry per
+layer), for gas its Pr, ψr and back-pressure / LIT coefficients (a
+fit_gas_arrays()-style dict). Layers are kept as flat arrays sorted by well
+with the start of each well's run, so the curves of all wells × layers × Pwf
+come from one evaluation of the existing per-method equations (oil_curves,
+gas_future_rates) on a (layers, points) grid followed by np.add.reduceat into
+(wells, points). Work and memory grow linearly with the number of layers;
+wells are processed in chunks bounded by max_elements.
+
+A layer whose pressure is below the flowing pressure does not produce. By
+default it is cut off (no backflow, e.g. with a check valve); with
+crossflow=True it takes fluid instead, at the negative of the rate it would
+give with the roles of its pressure and Pwf swapped (oil layers use their
+productivity index as injectivity).
+"""
+import numpy as np
+
+from ipr.forecast import GAS_METHODS, OIL_METHODS, gas_future_rates
+from ipr.gas_batch import group_wells
+from ipr.oil_batch import SATURATED, fit_oil_arrays, oil_curves
+
+
+# Layer set from per-layer arrays: well_ids (the well of each layer) and a fit
+# dict of per-layer arrays; kind is "oil" (needs Pws) or "gas" (needs Pr)
+def commingle(well_ids, fit, kind="oil"):
+    if kind not in ("oil", "gas"):
+        raise ValueError(f"unknown kind: {kind}")
+    ids, codes = group_wells(well_ids)
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    layers = {k: np.asarray(v)[order] for k, v in fit.items()
+              if np.ndim(v) == 1 and len(v) == len(order)}
+    pressure = layers["Pws" if kind == "oil" else "Pr"].astype(float)
+    return {
+        "kind": kind,
+        "well_ids": ids,
+        "well": codes.astype(np.int32),
+        "starts": starts,
+        "pressure": pressure,
+        "top": np.maximum.reduceat(pressure, starts),       # highest layer pressure per well
+        "layers": layers,
+    }
+
+
+# Oil layers from one test per layer (second test point for saturated layers only)
+def oil_layers(well_ids, Pb, Pws, Pwf, Qwf, Pwf1=np.nan, Qwf1=np.nan):
+    return commingle(well_ids, fit_oil_arrays(Pb, Pws, Pwf, Qwf, Pwf1, Qwf1), "oil")
+
+
+# Gas layers from per-layer coefficients (e.g. fit_gas_arrays on layer tests)
+def gas_layers(well_ids, fit):
+    return commingle(well_ids, fit, "gas")
+
+
+def _take(layers, sl):
+    return {k: v[sl] for k, v in layers.items()}
+
+
+# Rates of the given methods for a slice of layers on their pwf grid (layers,
+# points); oil_curves gives every oil method from one pass
+def _layer_rates(cs, sl, pwf, methods, crossflow, psi_fn):
+    L = _take(cs["layers"], sl)
+    P = cs["pressure"][sl][:, None]
+    above = pwf > P
+    out = {}
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if cs["kind"] == "oil":
+            rates = oil_curves(L, pwf=pwf)[1]
+            if crossflow:
+                J = np.where(L["regime"] == SATURATED, L["J"], L["J1"])[:, None]
+                back = J * (P - pwf)
+            for m in methods:
+                out[m] = np.where(above, back if crossflow else 0.0, rates[m])
+        else:
+            for m in methods:
+                q = gas_future_rates(L, P, pwf, m, psi_fn)
+                back = -gas_future_rates(L, pwf, P, m, psi_fn) if crossflow else 0.0
+                out[m] = np.where(above, back, q)
+    return out
+
+
+# Well ranges [w0, w1) whose layers fit in max_elements
+def _well_chunks(cs, per_layer, max_elements):
+    starts = cs["starts"]
+    ends = np.r_[starts[1:], len(cs["well"])]
+    step = max(1, int(max_elements // max(per_layer, 1)))
+    w0 = 0
+    while w0 < len(starts):
+        w1 = max(w0 + 1, int(np.searchsorted(ends, starts[w0] + step, side="right")))
+        yield w0, min(w1, len(starts))
+        w0 = w1
+
+
+# Commingled curves of every well: a pwf grid of shape (wells, points) (default
+# num_points from the highest layer pressure down to 0) and {method: total
+# rate} of the same shape
+def commingled_curves(cs, num_points=20, methods=None, crossflow=False, psi_fn=None, pwf=None,
+                      max_elements=20_000_000):
+    methods = methods or (OIL_METHODS if cs["kind"] == "oil" else GAS_METHODS)
+    if pwf is None:
+        pwf = cs["top"][:, None] * np.linspace(1.0, 0.0, num_points)
+    pwf = np.broadcast_to(np.asarray(pwf, dtype=float), (len(cs["well_ids"]), np.shape(pwf)[-1]))
+    out = {m: np.empty(pwf.shape) for m in methods}
+    starts = cs["starts"]
+    for w0, w1 in _well_chunks(cs, pwf.shape[1] * 24, max_elements):
+        sl = slice(starts[w0], starts[w1] if w1 < len(starts) else len(cs["well"]))
+        grid = pwf[cs["well"][sl]]
+        offsets = starts[w0:w1] - starts[w0]
+        for m, q in _layer_rates(cs, sl, grid, methods, crossflow, psi_fn).items():
+            out[m][w0:w1] = np.add.reduceat(q, offsets, axis=0)
+    return pwf, out
+
+
+# Commingled AOF (all layers open to Pwf = 0) per well and method
+def commingled_aof(cs, methods=None, psi_fn=None, max_elements=20_000_000):
+    _, rates = commingled_curves(cs, methods=methods, psi_fn=psi_fn, pwf=np.zeros((1, 1)),
+                                 max_elements=max_elements)
+    return {m: q[:, 0] for m, q in rates.items()}
+
+
+# Rate of every layer (in the layer set's sorted order) at its well's flowing pressure
+def layer_rates(cs, pwf, method="vogel", crossflow=False, psi_fn=None):
+    grid = np.broadcast_to(np.asarray(pwf, dtype=float), (len(cs["well_ids"]),))[cs["well"]][:, None]
+    return _layer_rates(cs, slice(None), grid, (method,), crossflow, psi_fn)[method][:, 0]
+
+
+# Static (zero-rate) pressure of each commingled well from its curve: the
+# highest layer pressure without crossflow, between the layer pressures with it
+def static_pressure(pwf, total):
+    produced = total >= 0
+    j = np.argmax(produced, axis=1)                 # first grid node (from the top) with q >= 0
+    rows = np.arange(len(pwf))
+    i = np.maximum(j - 1, 0)
+    q0, q1 = total[rows, i], total[rows, j]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where(j > 0, -q0 / (q1 - q0), 0.0)
+    out = pwf[rows, i] + (pwf[rows, j] - pwf[rows, i]) * frac
+    return np.where(produced.any(axis=1), out, np.nan)
@@ -0,0 +1,124 @@
+"""Vectorized IPR curve evaluation on dense or adaptively refined pressure grids.
+
+Every model below is a function of a NumPy array of flowing pressures built
+from the closed-form equations in ipr.oil and ipr.gas_batch; no per-point
+Python calls. `evaluate()` samples a model on a uniform grid of any size,
+`adaptive()` starts coarse and bisects only the intervals where the curve
+bends (near AOF, near Pr for Fetkovich/back-pressure exponents below one, and
+around the bubble point, which is always a grid node).
+"""
+import numpy as np
+
+from ipr.gas_batch import lit_rate
+from ipr.oil import curve_IPR_Vogel, curve_fetkovich, curve_fetkovich_undersaturated, undersaturated1
+
+
+# --- models: each returns q(pwf) for an array of pwf ---
+
+def vogel(Pws, Qmax):
+    return lambda pwf: curve_IPR_Vogel(pwf, Pws, Qmax)
+
+
+def constant_j(J, Pws):
+    return lambda pwf: J * (Pws - pwf)
+
+
+def fetkovich(n, c, Pws):
+    return lambda pwf: curve_fetkovich(n, c, np.minimum(pwf, Pws), Pws)
+
+
+# Straight line above Pb, Vogel below (undersaturated reservoir)
+def composite_vogel(J, Pws, Pb):
+    Qob = J * (Pws - Pb)
+    return lambda pwf: np.where(pwf >= Pb, J * (Pws - pwf), undersaturated1(Qob, J, Pb, pwf))
+
+
+def composite_fetkovich(J, Pws, Pb):
+    return lambda pwf: np.where(pwf >= Pb, J * (Pws - pwf),
+                                curve_fetkovich_undersaturated(J, Pws, Pb, pwf))
+
+
+def backpressure(C, n, Pr):
+    return lambda pwf: C * np.maximum(Pr**2 - pwf**2, 0.0)**n
+
+
+def lit_pressure_squared(a, b, Pr):
+    return lambda pwf: lit_rate(a, b, Pr**2 - pwf**2)
+
+
+def lit_pressure_approx(a1, b1, Pr):
+    return lambda pwf: lit_rate(a1, b1, Pr - pwf)
+
+
+# psi(pwf) defaults to the gas page's p^2 scaling; pass psi_fn for a real m(p)
+def lit_pseudopressure(a2, b2, Pr, psi_r, psi_fn=None):
+    if psi_fn is None:
+        return lambda pwf: lit_rate(a2, b2, psi_r * (1 - (pwf / Pr)**2))
+    return lambda pwf: lit_rate(a2, b2, psi_r - psi_fn(pwf))
+
+
+# All four gas models for well i of a batch fit (ipr.gas_batch.fit_gas_arrays)
+def gas_models(fit, i=0):
+    Pr = fit["Pr"][i]
+    return {
+        "backpressure": backpressure(fit["C"][i], fit["n"][i], Pr),
+        "lit_pressure_squared": lit_pressure_squared(fit["a"][i], fit["b"][i], Pr),
+        "lit_pressure_approx": lit_pressure_approx(fit["a1"][i], fit["b1"][i], Pr),
+        "lit_pseudopressure": lit_pseudopressure(fit["a2"][i], fit["b2"][i], Pr, fit["psi_r"][i]),
+    }
+
+
+# --- grids ---
+
+# Uniform grid from p_top down to p_bottom; p_top may be an array (one row per well)
+def pressure_grid(p_top, p_bottom=0.0, num_points=1000):
+    t = np.linspace(0.0, 1.0, num_points)
+    p_top = np.asarray(p_top, dtype=float)
+    p_bottom = np.asarray(p_bottom, dtype=float)
+    return p_top[..., None] + (p_bottom - p_top)[..., None] * t
+
+
+def evaluate(model, p_top, p_bottom=0.0, num_points=1000):
+    pwf = pressure_grid(p_top, p_bottom, num_points)
+    return pwf, model(pwf)
+
+
+# Adaptive sampling of q(pwf) between p_top and p_bottom. Intervals are bisected
+# while the midpoint deviates from the chord by more than tol * (rate range),
+# level by level, until nothing is left to split or max_points is reached.
+# Breakpoints (e.g. Pb) are always included. Returns pwf ordered from p_top to
+# p_bottom (descending in the usual p_top > p_bottom case) and q.
+def adaptive(model, p_top, p_bottom=0.0, tol=1e-4, n_init=33, max_points=10_000,
+             breakpoints=(), max_levels=20):
+    pwf = np.linspace(p_top, p_bottom, n_init)
+    extra = [b for b in breakpoints if min(p_top, p_bottom) < b < max(p_top, p_bottom)]
+    if extra:
+        pwf = np.unique(np.concatenate([pwf, extra]))
+        if p_top > p_bottom:
+            pwf = pwf[::-1]
+    q = model(pwf)
+    scale = np.nanmax(np.abs(q)) or 1.0
+
+    for _ in range(max_levels):
+        mid = 0.5 * (pwf[:-1] + pwf[1:])
+        q_mid = model(mid)
+        err = np.abs(q_mid - 0.5 * (q[:-1] + q[1:]))
+        split = np.flatnonzero(~(err <= tol * scale))   # NaN counts as "split"
+        split = split[np.isfinite(q_mid[split])]
+        if not len(split):
+            break
+        room = max_points - len(pwf)
+        if room <= 0:
+            break
+        if len(split) > room:
+            split = split[np.argsort(err[split])[::-1][:room]]
+            split.sort()
+        pwf = np.insert(pwf, split + 1, mid[split])
+        q = np.insert(q, split + 1, q_mid[split])
+    return pwf, q
+
+
+# Dense curves for many models on one shared grid: {name: q array}
+def evaluate_all(models, p_top, p_bottom=0.0, num_points=1000):
+    pwf = pressure_grid(p_top, p_bottom, num_points)
+    return pwf, {name: model(pwf) for name, model in models.items()}
@@ -0,0 +1,219 @@
+"""Depletion forecasts: future IPR curves and rate-vs-time profiles for every well.
+
+Each well produces against a fixed bottom-hole pressure while a tank material
+balance lowers its reservoir pressure:
+
+- gas: p/z = (Pi/Zi) (1 - Gp/G), Z from ipr.pseudo.z_factor when the gas
+  gravity and temperature are given (ideal gas otherwise)
+- oil: a linear tank, Pws = Pi - Np / (N ct), with the larger two-phase
+  compressibility ct_sat once Pws is below Pb
+
+The present-day fits are carried to a future reservoir pressure Pf with the
+usual scalings: gas C/n and the LIT a/b are kept, only Pr (and ψr) move; for
+oil, Vogel's Qmax goes with (Pf/P)³ (Eickemer), Fetkovich's C with Pf/P and
+the constant-J index with Pf/P below the bubble point. Undersaturated wells
+keep their straight line while Pf > Pb and turn into the saturated equations
+below it, continuous at Pb.
+
+Time steps are explicit (the rate of a step is taken at the pressure at its
+start) and vectorized over wells; results are yielded in time chunks sized by
+max_elements so a field × long-horizon forecast with curves stays bounded.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from ipr.gas_batch import lit_rate
+from ipr.oil_batch import SATURATED
+
+GAS_METHODS = ("backpressure", "lit_pressure_squared", "lit_pressure_approx", "lit_pseudopressure")
+OIL_METHODS = ("vogel", "fetkovich", "constant_j")
+
+
+# Per-well vector as a column that broadcasts against (wells, ...) arrays of ndim dimensions
+def _col(values, ndim):
+    return values.reshape(values.shape + (1,) * (ndim - 1))
+
+
+def _vogel_shape(x):
+    return 1 - 0.2 * x - 0.8 * x * x
+
+
+# Reference point of the saturated equations for every well: today's Pws for
+# saturated wells, the bubble point (with the composite curve's Qmax, C and n
+# there) for undersaturated ones
+def oil_reference(fit):
+    sat = fit["regime"] == SATURATED
+    J1 = np.where(sat, fit["J"], fit["J1"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "Pws": fit["Pws"], "Pb": fit["Pb"],
+            "P_ref": np.where(sat, fit["Pws"], fit["Pb"]),
+            "J": fit["J"], "J1": J1,
+            "Qmax_ref": np.where(sat, fit["Qmax"], fit["J"] * fit["Pb"] / 1.8),
+            "C_ref": np.where(sat, fit["c"], J1 / (2 * fit["Pb"])),
+            "n_ref": np.where(sat, fit["n"], 1.0),
+        }
+
+
+# Oil rate of one method at reservoir pressure Pws and flowing pressure pwf;
+# ref comes from oil_reference() and Pws / pwf broadcast as (wells, ...)
+def oil_future_rates(ref, Pws, pwf, method="vogel"):
+    Pws, pwf = np.broadcast_arrays(np.asarray(Pws, dtype=float), np.asarray(pwf, dtype=float))
+    c = {k: _col(v, Pws.ndim) for k, v in ref.items()}
+    pwf = np.minimum(pwf, Pws)
+    below = Pws <= c["P_ref"]
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        s = Pws / c["P_ref"]
+        if method == "vogel":
+            sat = c["Qmax_ref"] * s**3 * _vogel_shape(pwf / Pws)
+            above = (c["J"] * (Pws - np.maximum(pwf, c["Pb"]))
+                     + c["Qmax_ref"] * _vogel_shape(np.minimum(pwf, c["Pb"]) / c["Pb"]))
+        elif method == "fetkovich":
+            sat = c["C_ref"] * s * (Pws**2 - pwf**2)**c["n_ref"]
+            above = (c["J1"] * (Pws - np.maximum(pwf, c["Pb"]))
+                     + c["C_ref"] * (c["Pb"]**2 - np.minimum(pwf, c["Pb"])**2)**c["n_ref"])
+        elif method == "constant_j":
+            return c["J1"] * np.minimum(s, 1.0) * (Pws - pwf)
+        else:
+            raise ValueError(f"unknown oil method: {method}")
+    return np.where(below, sat, above)
+
+
+# Gas rate of one method at reservoir pressure Pr; fit from fit_gas_arrays.
+# psi_fn gives ψ(Pr) and ψ(pwf); without it ψ scales with p² from today's ψr/Pr².
+def gas_future_rates(fit, Pr, pwf, method="lit_pseudopressure", psi_fn=None):
+    Pr, pwf = np.broadcast_arrays(np.asarray(Pr, dtype=float), np.asarray(pwf, dtype=float))
+    c = {k: _col(np.asarray(fit[k], dtype=float), Pr.ndim) for k in
+         ("Pr", "psi_r", "C", "n", "a", "b", "a1", "b1", "a2", "b2")}
+    pwf = np.minimum(pwf, Pr)
+    dp2 = Pr**2 - pwf**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "backpressure":
+            return c["C"] * dp2**c["n"]
+        if method == "lit_pressure_squared":
+            return lit_rate(c["a"], c["b"], dp2)
+        if method == "lit_pressure_approx":
+            return lit_rate(c["a1"], c["b1"], Pr - pwf)
+        if method == "lit_pseudopressure":
+            if psi_fn is None:
+                dpsi = c["psi_r"] / c["Pr"]**2 * dp2
+            else:
+                dpsi = np.maximum(psi_fn(Pr) - psi_fn(pwf), 0.0)
+            return lit_rate(c["a2"], c["b2"], dpsi)
+    raise ValueError(f"unknown gas method: {method}")
+
+
+# Linear interpolation in a table sampled on a uniform grid starting at 0: an
+# index computation instead of np.interp's binary search per value
+def _lerp_uniform(x, step, table):
+    pos = np.clip(x / step, 0.0, len(table) - 1.0)
+    i = np.minimum(pos.astype(np.intp), len(table) - 2)
+    return table[i] + (table[i + 1] - table[i]) * (pos - i)
+
+
+# p/z on a uniform p grid and p on a uniform p/z grid for one gas (p/z made
+# monotonic so it can be inverted)
+@lru_cache(maxsize=32)
+def _p_over_z_table(gravity, temperature_F, p_max, num_points=4001):
+    from ipr.pseudo import z_factor
+
+    p = np.linspace(0.0, p_max, num_points)
+    pz = np.maximum.accumulate(p / z_factor(p, temperature_F, gravity))
+    pz_grid = np.linspace(0.0, pz[-1], num_points)
+    return p[1], pz, pz_grid[1], np.interp(pz_grid, pz, p)
+
+
+# Reservoir pressure of gas tanks after producing Gp (same units as G); z=1 without gas properties
+def gas_tank_pressure(Gp, Pi, G, gravity=None, temperature_F=None):
+    frac = np.clip(1 - np.asarray(Gp, dtype=float) / G, 0.0, 1.0)
+    if gravity is None:
+        return Pi * frac
+    p_step, pz, pz_step, p = _p_over_z_table(round(float(gravity), 6), round(float(temperature_F), 4),
+                                             round(float(np.max(Pi)) * 1.05, -1))
+    return _lerp_uniform(_lerp_uniform(Pi, p_step, pz) * frac, pz_step, p)
+
+
+# Reservoir pressure of linear oil tanks after producing Np (same units as N);
+# ct applies above Pb and ct_sat below it (1/pressure units)
+def oil_tank_pressure(Np, Pi, Pb, N, ct=1.5e-4, ct_sat=1.5e-3):
+    Np = np.asarray(Np, dtype=float)
+    to_pb = N * ct * np.maximum(Pi - Pb, 0.0)
+    above = Pi - Np / (N * ct)
+    below = np.minimum(Pi, Pb) - (Np - to_pb) / (N * ct_sat)
+    return np.maximum(np.where(Np <= to_pb, above, below), 0.0)
+
+
+# Shared time march. rate_fn(P, pwf) -> rates, pressure_fn(cum) -> P and
+# curves_fn(P, pwf_grid) -> {method: rates}; yields one dict per time chunk.
+def _march(rate_fn, pressure_fn, curves_fn, n_wells, pwf, times, q_limit, num_points, max_elements):
+    times = np.asarray(times, dtype=float)
+    dt = np.diff(times, append=times[-1] + (times[-1] - times[-2] if len(times) > 1 else 1.0))
+    pwf = np.broadcast_to(np.asarray(pwf, dtype=float), (n_wells,))
+    q_limit = None if q_limit is None else np.broadcast_to(np.asarray(q_limit, dtype=float), (n_wells,))
+    per_step = n_wells * (3 + 5 * (num_points or 0))
+    steps = int(max(1, min(len(times), max_elements // max(per_step, 1))))
+    t_grid = np.linspace(1.0, 0.0, num_points) if num_points else None
+
+    cum = np.zeros(n_wells)
+    for start in range(0, len(times), steps):
+        chunk = slice(start, min(start + steps, len(times)))
+        k = chunk.stop - chunk.start
+        P, q, Q = np.empty((n_wells, k)), np.empty((n_wells, k)), np.empty((n_wells, k))
+        for j in range(k):
+            P[:, j] = pressure_fn(cum)
+            rate = np.nan_to_num(rate_fn(P[:, j], pwf), nan=0.0)
+            rate = np.maximum(rate if q_limit is None else np.minimum(rate, q_limit), 0.0)
+            cum = cum + rate * dt[chunk.start + j]
+            q[:, j], Q[:, j] = rate, cum
+        out = {"time": times[chunk], "pressure": P, "rate": q, "cumulative": Q}
+        if num_points:
+            grid = P[..., None] * t_grid
+            out["pwf"] = grid
+            out["curves"] = curves_fn(P[..., None], grid)
+        yield out
+
+
+# Oil forecast for every well of a fit_oil_arrays() fit. N: oil in place per
+# well, pwf: operating bottom-hole pressure, times: step start times (rates are
+# per time unit, e.g. m³/d with times in days), q_limit: optional plateau rate.
+# Yields time chunks with pressure, rate and cumulative of shape (wells, steps);
+# with num_points, also the IPR curves of all methods on a (wells, steps,
+# num_points) grid from each step's Pws down to 0.
+def forecast_oil(fit, N, pwf, times, method="vogel", ct=1.5e-4, ct_sat=1.5e-3, q_limit=None,
+                 num_points=None, max_elements=20_000_000):
+    ref = oil_reference(fit)
+    Pi, Pb = fit["Pws"], fit["Pb"]
+    return _march(lambda P, p: oil_future_rates(ref, P, p, method),
+                  lambda cum: oil_tank_pressure(cum, Pi, Pb, N, ct, ct_sat),
+                  lambda P, grid: {m: oil_future_rates(ref, P, grid, m) for m in OIL_METHODS},
+                  len(Pi), pwf, times, q_limit, num_points, max_elements)
+
+
+# Gas forecast for every well of a fit_gas_arrays() fit. G: gas in place per
+# well (rate units × time units); gravity / temperature_F add Z to the p/z
+# material balance; psi_fn is used by the pseudo-pressure method (fit it on ψ
+# from the same psi_fn). Chunks as forecast_oil.
+def forecast_gas(fit, G, pwf, times, method="lit_pseudopressure", gravity=None, temperature_F=None,
+                 psi_fn=None, q_limit=None, num_points=None, max_elements=20_000_000):
+    Pi = fit["Pr"]
+    return _march(lambda P, p: gas_future_rates(fit, P, p, method, psi_fn),
+                  lambda cum: gas_tank_pressure(cum, Pi, G, gravity, temperature_F),
+                  lambda P, grid: {m: gas_future_rates(fit, P, grid, m, psi_fn) for m in GAS_METHODS},
+                  len(Pi), pwf, times, q_limit, num_points, max_elements)
+
+
+# Collect the decline profile from forecast chunks (curves are dropped as they
+# stream past). per_well=False keeps only the field totals.
+def decline_profile(chunks, per_well=True):
+    parts = {"time": [], "field_rate": [], "field_cumulative": []}
+    if per_well:
+        parts.update(pressure=[], rate=[], cumulative=[])
+    for chunk in chunks:
+        parts["time"].append(chunk["time"])
+        parts["field_rate"].append(chunk["rate"].sum(axis=0))
+        parts["field_cumulative"].append(chunk["cumulative"].sum(axis=0))
+        if per_well:
+            for key in ("pressure", "rate", "cumulative"):
+                parts[key].append(chunk[key])
+    return {key: np.concatenate(v, axis=-1) for key, v in parts.items()}
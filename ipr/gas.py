@@ -0,0 +1,239 @@
+"""Single-well gas IPR methods (back-pressure and LIT).
+
+Each fitter takes a DataFrame in the shape of gas_well_data.csv
+(p_wf, ψ_wf, Qg by position). scipy and pandas are imported on first use so
+this module stays cheap to import.
+"""
+import numpy as np
+
+from ipr.profiling import profiled, stage
+
+METHOD_LABELS = {
+    "backpressure": "Qg (Backpressure) (Mscf/day)",
+    "lit_pressure_squared": "Qg (LIT-Pressure²) (Mscf/day)",
+    "lit_pressure_approx": "Qg (LIT-Pressure Approx) (Mscf/day)",
+    "lit_pseudopressure": "Qg (Pseudo-pressure) (Mscf/day)",
+}
+
+
+@profiled("linregress")
+def _linregress(x, y):
+    from scipy.stats import linregress
+    slope, intercept, _, _, _ = linregress(x, y)
+    return slope, intercept
+
+
+# Each method is split into a fit (coefficients from the test points), a curve
+# on a num_points Pwf grid and its table, so callers that keep the fit (the
+# page's computation graph) can redraw the curve without refitting.
+
+def _method_table(method, pwf_range, Qg_pred, mp_range=None):
+    import pandas as pd
+
+    with stage("table"):
+        columns = {"Pwf (psia)": np.round(pwf_range, 2)}
+        if mp_range is not None:
+            columns["m(p)"] = np.round(mp_range, 2)
+        columns[METHOD_LABELS[method]] = np.round(Qg_pred, 2)
+        return pd.DataFrame(columns)
+
+
+# Rate of the LIT quadratic a·q + b·q² = Δ
+def _lit_curve(a, b, delta):
+    return (-a + np.sqrt(a**2 + 4*b*delta)) / (2*b)
+
+
+# 1. Simplified Backpressure
+@profiled("fit")
+def fit_backpressure(data):
+    Pwf = data.iloc[:, 0].values
+    Qg = data.iloc[:, 2].values
+    Pr = max(Pwf)
+
+    dp2 = (Pr**2 - Pwf**2)
+    mask = (Qg > 0) & (dp2 > 0)
+
+    log_dp2 = np.log(dp2[mask])
+    log_Qg = np.log(Qg[mask])
+    slope, intercept = _linregress(log_dp2, log_Qg)
+    n = slope
+    C = np.exp(intercept)
+    return Pr, C, n
+
+
+@profiled("curve")
+def backpressure_curve(Pr, C, n, num_points=20):
+    pwf_range = np.linspace(Pr, 0, num_points)
+    return pwf_range, C * (Pr**2 - pwf_range**2)**n
+
+
+@profiled("backpressure")
+def simplified_backpressure(data, num_points=20):
+    Pr, C, n = fit_backpressure(data)
+    pwf_range, Qg_pred = backpressure_curve(Pr, C, n, num_points)
+    AOF = Qg_pred[-1]
+    result_df = _method_table("backpressure", pwf_range, Qg_pred)
+    return pwf_range, Qg_pred, AOF, C, n, result_df
+
+
+# 2. LIT Pressure-Squared
+@profiled("fit")
+def fit_lit_pressure_squared(data):
+    Pwf = data.iloc[:, 0].values
+    Qg = data.iloc[:, 2].values
+    Pr = max(Pwf)
+
+    dp2 = (Pr**2 - Pwf**2)
+    mask = (Qg > 0) & (dp2 > 0)
+
+    X = Qg[mask]
+    Y = dp2[mask] / Qg[mask]
+    slope, intercept = _linregress(X, Y)
+    a, b = intercept, slope
+    return Pr, a, b
+
+
+@profiled("curve")
+def lit_pressure_squared_curve(Pr, a, b, num_points=20):
+    pwf_range = np.linspace(Pr, 0, num_points)
+    dp2_range = Pr**2 - pwf_range**2
+    return pwf_range, _lit_curve(a, b, dp2_range)
+
+
+@profiled("lit_pressure_squared")
+def lit_pressure_squared(data, num_points=20):
+    Pr, a, b = fit_lit_pressure_squared(data)
+    pwf_range, Qg_pred = lit_pressure_squared_curve(Pr, a, b, num_points)
+    AOF = Qg_pred[-1]
+    result_df = _method_table("lit_pressure_squared", pwf_range, Qg_pred)
+    return pwf_range, Qg_pred, AOF, a, b, result_df
+
+
+# 3. LIT Pressure-Approximation
+@profiled("fit")
+def fit_lit_pressure_approx(data):
+    Pwf = data.iloc[:, 0].values
+    Qg = data.iloc[:, 2].values
+    Pr = max(Pwf)
+
+    dP = (Pr - Pwf)
+    mask = (Qg > 0) & (dP > 0)
+
+    X = Qg[mask]
+    Y = dP[mask] / Qg[mask]
+    slope, intercept = _linregress(X, Y)
+    a1, b1 = intercept, slope
+    return Pr, a1, b1
+
+
+@profiled("curve")
+def lit_pressure_approx_curve(Pr, a1, b1, num_points=20):
+    pwf_range = np.linspace(Pr, 0, num_points)
+    dp_range = Pr - pwf_range
+    return pwf_range, _lit_curve(a1, b1, dp_range)
+
+
+@profiled("lit_pressure_approx")
+def lit_pressure_approx(data, num_points=20):
+    Pr, a1, b1 = fit_lit_pressure_approx(data)
+    pwf_range, Qg_pred = lit_pressure_approx_curve(Pr, a1, b1, num_points)
+    AOF = Qg_pred[-1]
+    result_df = _method_table("lit_pressure_approx", pwf_range, Qg_pred)
+    return pwf_range, Qg_pred, AOF, a1, b1, result_df
+
+
+# 4. LIT Pseudopressure Method
+# With psi_fn (e.g. an ipr.pseudo table) m(p) is computed from pressure instead of
+# taken from the ψ column, and the curve uses the real m(p) rather than a p² scaling.
+@profiled("fit")
+def fit_lit_pseudopressure(data, psi_fn=None):
+    Pwf = data.iloc[:, 0].values     # flowing pressure
+    Qg = data.iloc[:, 2].values      # gas rate
+    if psi_fn is None:
+        mp = data.iloc[:, 1].values  # pseudopressure m(p)
+    else:
+        mp = psi_fn(Pwf)
+    psi_r = np.max(mp)
+
+    dpsi = psi_r - mp
+    mask = (Qg > 0) & (dpsi > 0)
+
+    X = Qg[mask]
+    Y = dpsi[mask] / Qg[mask]
+    slope, intercept = _linregress(X, Y)
+    a2, b2 = intercept, slope
+    return np.max(Pwf), psi_r, a2, b2
+
+
+# Returns the Pwf grid, m(p) on it and the rates
+@profiled("curve")
+def lit_pseudopressure_curve(Pr, psi_r, a2, b2, num_points=20, psi_fn=None):
+    pwf_range = np.linspace(Pr, 0, num_points)
+    if psi_fn is None:
+        k = psi_r / (Pr ** 2)
+        mp_range = k * (pwf_range ** 2)
+    else:
+        mp_range = psi_fn(pwf_range)
+    dpsi_range = psi_r - mp_range
+    return pwf_range, mp_range, _lit_curve(a2, b2, dpsi_range)
+
+
+@profiled("lit_pseudopressure")
+def lit_pseudopressure(data, num_points=20, psi_fn=None):
+    Pr, psi_r, a2, b2 = fit_lit_pseudopressure(data, psi_fn)
+    pwf_range, mp_range, Qg_pred = lit_pseudopressure_curve(Pr, psi_r, a2, b2, num_points, psi_fn)
+    AOF = Qg_pred[-1]
+    result_df = _method_table("lit_pseudopressure", pwf_range, Qg_pred, mp_range)
+    return pwf_range, Qg_pred, AOF, a2, b2, result_df
+
+
+# Mean absolute % difference of each method against the pseudo-pressure curve
+# (the shut-in point, where the reference rate is 0, is skipped as in the page
+# table, also when a LIT fit with a < 0 gives a non-zero rate there)
+def error_percent(q, q_ref):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.abs((q - q_ref) / q_ref) * 100
+    pct = pct[np.isfinite(pct)]
+    return pct.mean() if pct.size else np.nan
+
+
+# Comparison table of the four curves and the error table against pseudo-pressure
+# (results: {method: tuple as returned by the method functions})
+@profiled("tables")
+def comparison_tables(results):
+    import pandas as pd
+
+    df_bp = results["backpressure"][5]
+    result_df = pd.concat(
+        [df_bp] + [results[m][5][METHOD_LABELS[m]] for m in list(METHOD_LABELS)[1:]],
+        axis=1)
+    result_df.reset_index(drop=True, inplace=True)
+    result_df.index = result_df.index + 1
+    result_df.index.name = "S.No."
+
+    # Error Table (compared with pseudo-pressure)
+    q_ref = results["lit_pseudopressure"][5][METHOD_LABELS["lit_pseudopressure"]].to_numpy()
+    error_df = pd.DataFrame({
+        "Method": ["Back-Pressure", "LIT Pressure²", "LIT Pressure Approx"],
+        "Error (%)": [
+            round(error_percent(results[m][5][METHOD_LABELS[m]].to_numpy(), q_ref))
+            for m in list(METHOD_LABELS)[:3]
+        ]
+    })
+    error_df.reset_index(drop=True, inplace=True)
+    error_df.index = error_df.index + 1
+    error_df.index.name = "S.No."
+    return result_df, error_df
+
+
+# Run all four methods on a num_points grid and build the comparison and error tables
+@profiled("compare_gas_methods")
+def compare_gas_methods(data, num_points=20, psi_fn=None):
+    results = {
+        "backpressure": simplified_backpressure(data, num_points),
+        "lit_pressure_squared": lit_pressure_squared(data, num_points),
+        "lit_pressure_approx": lit_pressure_approx(data, num_points),
+        "lit_pseudopressure": lit_pseudopressure(data, num_points, psi_fn),
+    }
+    result_df, error_df = comparison_tables(results)
+    return results, result_df, error_df
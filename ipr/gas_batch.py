@@ -0,0 +1,175 @@
+"""Vectorized multi-well fits for the four gas IPR methods.
+
+Same equations as the single-well fitters on the gas page, but every well in a
+long-format table is fitted in one pass with grouped closed-form least squares.
+"""
+import numpy as np
+
+FIT_KEYS = ["Pr", "psi_r", "n_points",
+            "C", "n", "AOF_bp",
+            "a", "b", "AOF_lit",
+            "a1", "b1", "AOF_litp",
+            "a2", "b2", "AOF_psi"]
+
+
+# Unique well ids (sorted) and the group code of every test point
+def group_wells(well_ids):
+    ids, codes = np.unique(np.asarray(well_ids), return_inverse=True)
+    return ids, codes.ravel()
+
+
+# Per-group maximum via one sort + reduceat
+def group_max(codes, values, n_groups):
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    out = np.full(n_groups, np.nan)
+    out[sorted_codes[starts]] = np.maximum.reduceat(values[order], starts)
+    return out
+
+
+# Grouped least squares y = intercept + slope * x over the masked points of each group.
+# Two-pass (centred) sums give the same slope/intercept as scipy's linregress per group;
+# groups with fewer than two points or no spread in x come back as NaN.
+def grouped_linregress(codes, x, y, mask, n_groups):
+    w = mask.astype(float)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+
+    N = np.bincount(codes, weights=w, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx = np.bincount(codes, weights=x, minlength=n_groups) / N
+        my = np.bincount(codes, weights=y, minlength=n_groups) / N
+        dx = (x - mx[codes]) * w
+        dy = (y - my[codes]) * w
+        Sxx = np.bincount(codes, weights=dx * dx, minlength=n_groups)
+        Sxy = np.bincount(codes, weights=dx * dy, minlength=n_groups)
+        slope = Sxy / Sxx
+        intercept = my - slope * mx
+
+    bad = (N < 2) | (Sxx <= 0)
+    slope[bad] = np.nan
+    intercept[bad] = np.nan
+    return slope, intercept, N
+
+
+# Positive root of b*Q^2 + a*Q - dp = 0 (the LIT deliverability equations)
+def lit_rate(a, b, dp):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (-a + np.sqrt(a**2 + 4 * b * dp)) / (2 * b)
+
+
+# Fit all four gas methods for every well at once.
+# well_ids, pwf, psi, qg are flat arrays with one entry per test point (long format).
+# Returns a dict of per-well arrays keyed by "well_id" and FIT_KEYS.
+def fit_gas_arrays(well_ids, pwf, psi, qg):
+    ids, codes = group_wells(well_ids)
+    fit = fit_gas_codes(codes, len(ids), pwf, psi, qg)
+    return {"well_id": ids, **fit}
+
+
+# Same fit for integer group codes 0..n_groups-1. Pr and psi_r default to the
+# largest Pwf / ψ of each group; pass them (one value per group) to hold them
+# fixed, e.g. when refitting resampled points.
+def fit_gas_codes(codes, n_groups, pwf, psi, qg, Pr=None, psi_r=None):
+    nw = n_groups
+    pwf = np.asarray(pwf, dtype=float)
+    psi = np.asarray(psi, dtype=float)
+    qg = np.asarray(qg, dtype=float)
+
+    Pr = group_max(codes, pwf, nw) if Pr is None else np.asarray(Pr, dtype=float)
+    psi_r = group_max(codes, psi, nw) if psi_r is None else np.asarray(psi_r, dtype=float)
+    Pr_pt = Pr[codes]
+    psi_pt = psi_r[codes]
+    flowing = qg > 0
+    safe_q = np.where(flowing, qg, 1.0)
+
+    # 1. Simplified Backpressure: log(Qg) = log(C) + n log(Pr^2 - Pwf^2)
+    dp2 = Pr_pt**2 - pwf**2
+    mask = flowing & (dp2 > 0)
+    n, logC, n_points = grouped_linregress(
+        codes, np.log(np.where(mask, dp2, 1.0)), np.log(safe_q), mask, nw)
+    C = np.exp(logC)
+
+    # 2. LIT Pressure-Squared: dp2/Qg = a + b Qg
+    b, a, _ = grouped_linregress(codes, qg, dp2 / safe_q, mask, nw)
+
+    # 3. LIT Pressure-Approximation: dP/Qg = a1 + b1 Qg
+    dP = Pr_pt - pwf
+    mask = flowing & (dP > 0)
+    b1, a1, _ = grouped_linregress(codes, qg, dP / safe_q, mask, nw)
+
+    # 4. LIT Pseudopressure: dpsi/Qg = a2 + b2 Qg
+    dpsi = psi_pt - psi
+    mask = flowing & (dpsi > 0)
+    b2, a2, _ = grouped_linregress(codes, qg, dpsi / safe_q, mask, nw)
+
+    return {
+        "Pr": Pr,
+        "psi_r": psi_r,
+        "n_points": n_points.astype(int),
+        "C": C,
+        "n": n,
+        "AOF_bp": C * (Pr**2)**n,
+        "a": a,
+        "b": b,
+        "AOF_lit": lit_rate(a, b, Pr**2),
+        "a1": a1,
+        "b1": b1,
+        "AOF_litp": lit_rate(a1, b1, Pr),
+        "a2": a2,
+        "b2": b2,
+        "AOF_psi": lit_rate(a2, b2, psi_r),
+    }
+
+
+# DataFrame front end: well id column plus the gas_well_data.csv columns
+# (p_wf, ψ_wf, Qg), read positionally like the single-well fitters do.
+def fit_gas_wells(data, well_col="Well ID"):
+    values = data.drop(columns=[well_col])
+    return fit_gas_arrays(data[well_col].to_numpy(),
+                          values.iloc[:, 0].to_numpy(),
+                          values.iloc[:, 1].to_numpy(),
+                          values.iloc[:, 2].to_numpy())
+
+
+# IPR curves for every fitted well on the page's grid (Pr -> 0, num_points).
+# Returns pwf with shape (wells, num_points) and a dict of rate arrays per method.
+# psi_fn (e.g. an ipr.pseudo table) replaces the p² scaling of the pseudo-pressure curve.
+# A pwf grid of the same shape can be given instead; rates above Pr are 0.
+def gas_curves(fit, num_points=20, psi_fn=None, pwf=None):
+    Pr = fit["Pr"][:, None]
+    if pwf is None:
+        pwf = Pr * np.linspace(1.0, 0.0, num_points)[None, :]
+    dp2 = np.maximum(Pr**2 - pwf**2, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bp = fit["C"][:, None] * dp2**fit["n"][:, None]
+    # pseudo-pressure curve uses the page's p^2 scaling: psi = psi_r * (pwf / Pr)^2
+    if psi_fn is None:
+        dpsi = fit["psi_r"][:, None] * (1 - (pwf / Pr)**2)
+    else:
+        dpsi = fit["psi_r"][:, None] - psi_fn(pwf)
+    rates = {
+        "backpressure": bp,
+        "lit_pressure_squared": lit_rate(fit["a"][:, None], fit["b"][:, None], dp2),
+        "lit_pressure_approx": lit_rate(fit["a1"][:, None], fit["b1"][:, None], np.maximum(Pr - pwf, 0.0)),
+        "lit_pseudopressure": lit_rate(fit["a2"][:, None], fit["b2"][:, None], np.maximum(dpsi, 0.0)),
+    }
+    return pwf, rates
+
+
+# Mean absolute % difference of each method's curve against the pseudo-pressure
+# curve (as in the page's error table), per well
+def gas_error_percent(fit, num_points=20, psi_fn=None):
+    _, rates = gas_curves(fit, num_points, psi_fn)
+    ref = rates["lit_pseudopressure"]
+    errors = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for method in ("backpressure", "lit_pressure_squared", "lit_pressure_approx"):
+            pct = np.abs((rates[method] - ref) / ref) * 100
+            pct[~np.isfinite(pct)] = np.nan
+            valid = ~np.isnan(pct)
+            errors[method] = np.where(valid.any(axis=1),
+                                      np.nansum(pct, axis=1) / np.maximum(valid.sum(axis=1), 1),
+                                      np.nan)
+    return errors
@@ -0,0 +1,194 @@
+"""Memoized computation graphs for the interactive pages.
+
+A page declares its work once as named nodes (inputs → validated data → fits →
+curves → tables → charts). Every Streamlit rerun sets the inputs again and
+asks for the nodes it displays; a node is recomputed only when the version of
+one of its dependencies changed since its last evaluation, so editing one
+value redoes just the nodes downstream of it. Inputs get a new version when
+their content hash changes; nodes marked cutoff=True keep their version when a
+recomputation gives the same result (e.g. the regime of an oil well), which
+stops the change from propagating further.
+
+Graphs live in the session (st.session_state), so memoized values are per
+user; the gas fits and the uncertainty nodes also go through the
+process-wide result cache, so identical data is fitted once for all sessions.
+Curves and tables are cheaper to recompute than to content-hash, so they stay
+in the session graph.
+"""
+import itertools
+
+from ipr.cache import content_hash
+from ipr.profiling import stage
+
+_versions = itertools.count(1)
+
+
+class Graph:
+    def __init__(self):
+        self.nodes = {}         # name -> (fn, deps, cutoff)
+        self.values = {}
+        self.versions = {}
+        self.keys = {}          # content hashes of inputs and cutoff nodes
+        self.stamps = {}        # node -> dependency versions at its last evaluation
+        self.recomputed = []    # nodes evaluated since begin()
+        self.counts = {}
+
+    def node(self, name, fn, *deps, cutoff=False):
+        self.nodes[name] = (fn, deps, cutoff)
+        return self
+
+    # Start of a rerun: clears the list of recomputed nodes
+    def begin(self):
+        self.recomputed = []
+        return self
+
+    # Set an input; downstream nodes are invalidated only if its content changed
+    def set(self, name, value):
+        key = content_hash(value)
+        if self.keys.get(name) != key or name not in self.values:
+            self.keys[name] = key
+            self.values[name] = value
+            self.versions[name] = next(_versions)
+        return self
+
+    def update(self, **inputs):
+        for name, value in inputs.items():
+            self.set(name, value)
+        return self
+
+    # Value of an input or node, evaluating stale dependencies first
+    def get(self, name):
+        if name not in self.nodes:
+            if name not in self.values:
+                raise KeyError(f"input not set: {name}")
+            return self.values[name]
+        fn, deps, cutoff = self.nodes[name]
+        args = [self.get(d) for d in deps]
+        stamp = tuple(self.versions[d] for d in deps)
+        if self.stamps.get(name) != stamp:
+            with stage(name):
+                value = fn(*args)
+            self.stamps[name] = stamp
+            self.recomputed.append(name)
+            self.counts[name] = self.counts.get(name, 0) + 1
+            key = content_hash(value) if cutoff else None
+            if not cutoff or key != self.keys.get(name) or name not in self.versions:
+                self.keys[name] = key
+                self.versions[name] = next(_versions)
+            self.values[name] = value
+        return self.values[name]
+
+
+GAS_METHODS = ("backpressure", "lit_pressure_squared", "lit_pressure_approx", "lit_pseudopressure")
+
+
+# Test points checked and reduced to the p_wf, ψ_wf and Qg columns as floats
+def gas_points(data):
+    if data.shape[1] < 3:
+        raise ValueError(f"expected p_wf, ψ_wf and Qg columns, found {list(data.columns)}")
+    points = data.iloc[:, :3].astype(float)
+    if len(points) < 2:
+        raise ValueError("at least two test points are needed")
+    return points
+
+
+# fn(*args) through the process-wide content-hash cache, shared by all sessions
+def _shared(fn, *args):
+    from ipr.cache import default_cache
+
+    return default_cache().get_or_compute(fn, *args)
+
+
+def _bootstrap(points, num_points, psi_fn, settings):
+    if settings is None:
+        return None
+    from ipr.cache import default_cache
+    from ipr.uncertainty import bootstrap_gas
+
+    replicates, Pr_sd = settings
+    return default_cache().get_or_compute(
+        bootstrap_gas, [0] * len(points), points.iloc[:, 0].to_numpy(), points.iloc[:, 1].to_numpy(),
+        points.iloc[:, 2].to_numpy(), replicates, num_points, Pr_sd, psi_fn)
+
+
+# Gas page: inputs data, num_points, psi_fn and bootstrap ((replicates, Pr sd) or None)
+def gas_page_graph():
+    from ipr import gas
+    from ipr.plots import gas_comparison_chart
+
+    g = Graph()
+    g.node("points", gas_points, "data")
+    g.node("fit.backpressure", lambda points: _shared(gas.fit_backpressure, points), "points")
+    g.node("fit.lit_pressure_squared", lambda points: _shared(gas.fit_lit_pressure_squared, points), "points")
+    g.node("fit.lit_pressure_approx", lambda points: _shared(gas.fit_lit_pressure_approx, points), "points")
+    g.node("fit.lit_pseudopressure", lambda points, psi_fn: _shared(gas.fit_lit_pseudopressure, points, psi_fn),
+           "points", "psi_fn")
+    g.node("curve.backpressure", lambda fit, n: gas.backpressure_curve(*fit, n),
+           "fit.backpressure", "num_points")
+    g.node("curve.lit_pressure_squared", lambda fit, n: gas.lit_pressure_squared_curve(*fit, n),
+           "fit.lit_pressure_squared", "num_points")
+    g.node("curve.lit_pressure_approx", lambda fit, n: gas.lit_pressure_approx_curve(*fit, n),
+           "fit.lit_pressure_approx", "num_points")
+    g.node("curve.lit_pseudopressure", lambda fit, n, psi_fn: gas.lit_pseudopressure_curve(*fit, n, psi_fn),
+           "fit.lit_pseudopressure", "num_points", "psi_fn")
+    # the (pwf, rate, AOF, coef, coef, table) tuples of the method functions
+    for m in GAS_METHODS[:3]:
+        g.node(f"method.{m}", lambda fit, curve, m=m: (*curve, curve[1][-1], *fit[1:],
+                                                        gas._method_table(m, *curve)),
+               f"fit.{m}", f"curve.{m}")
+    g.node("method.lit_pseudopressure",
+           lambda fit, curve: (curve[0], curve[2], curve[2][-1], *fit[2:],
+                               gas._method_table("lit_pseudopressure", curve[0], curve[2], curve[1])),
+           "fit.lit_pseudopressure", "curve.lit_pseudopressure")
+    g.node("results", lambda *r: dict(zip(GAS_METHODS, r)), *(f"method.{m}" for m in GAS_METHODS))
+    g.node("tables", gas.comparison_tables, "results")
+    g.node("uncertainty", _bootstrap, "points", "num_points", "psi_fn", "bootstrap", cutoff=True)
+    g.node("chart", gas_comparison_chart, "results", "uncertainty")
+    return g
+
+
+def _monte_carlo(Pb, Pws, Pwf, Qwf, second, num_points, settings):
+    if settings is None:
+        return None
+    from ipr.cache import default_cache
+    from ipr.uncertainty import monte_carlo_oil
+
+    return default_cache().get_or_compute(monte_carlo_oil, Pb, Pws, Pwf, Qwf, *second, settings["sd"],
+                                          settings["rate_cv"], settings["replicates"], num_points)
+
+
+# Vogel Qmax that scales the undersaturated chart
+def _undersaturated_qmax(res, Pwf, Pb):
+    return res["AOF_vogel"] if Pwf > Pb else max(res["AOF_vogel"], res["AOF_fetkovich"])
+
+
+def _styled_table(res):
+    return res["table"].style.set_table_styles(
+        [{'selector': 'td', 'props': [('text-align', 'center'), ('justify-content', 'center')]},
+         {'selector': 'th', 'props': [('text-align', 'center'), ('justify-content', 'center')]}]
+    ).set_properties(**{'text-align': 'center'})
+
+
+# Oil page: inputs Pb, Pws, Pwf, Qwf, Pwf1, Qwf1, num_points and monte_carlo
+# ({"sd", "rate_cv", "replicates"} or None). Only the branch of the well's
+# regime is evaluated; the second test point only reaches saturated wells.
+def oil_page_graph():
+    from ipr.oil import saturated_ipr, undersaturated_ipr
+    from ipr.plots import oil_saturated_chart, oil_undersaturated_chart
+
+    g = Graph()
+    g.node("saturated_regime", lambda Pb, Pws: bool(Pws < Pb), "Pb", "Pws", cutoff=True)
+    g.node("second", lambda sat, Pwf1, Qwf1: (Pwf1, Qwf1) if sat else (float("nan"), float("nan")),
+           "saturated_regime", "Pwf1", "Qwf1", cutoff=True)
+    g.node("saturated", saturated_ipr, "Pws", "Pwf", "Qwf", "Pwf1", "Qwf1", "num_points")
+    g.node("undersaturated", undersaturated_ipr, "Pws", "Pb", "Pwf", "Qwf", "num_points")
+    g.node("uncertainty", _monte_carlo, "Pb", "Pws", "Pwf", "Qwf", "second", "num_points", "monte_carlo",
+           cutoff=True)
+    g.node("saturated_chart", lambda res, Pws, unc: oil_saturated_chart(res["table"], Pws, unc),
+           "saturated", "Pws", "uncertainty")
+    g.node("qmax", _undersaturated_qmax, "undersaturated", "Pwf", "Pb", cutoff=True)
+    g.node("undersaturated_chart",
+           lambda res, Pws, Pb, Qmax, unc: oil_undersaturated_chart(res["table"], Pws, Pb, Qmax, unc),
+           "undersaturated", "Pws", "Pb", "qmax", "uncertainty")
+    g.node("styled_table", _styled_table, "undersaturated")
+    return g
@@ -0,0 +1,163 @@
+"""Multi-rate oil IPR fits: Fetkovich (C, n) and Vogel (Qmax, V) from any number of test points.
+
+Test points are in long format (one entry per point with a well code), like
+the gas batch fit, and every well is fitted in the same vectorized pass:
+
+- Fetkovich q = C (Pws² - Pwf²)^n is fitted by least squares on the rates.
+  The log-linear regression of log q on log(Pws² - Pwf²) gives the starting
+  point, then a per-well Levenberg-Marquardt iteration with the analytic
+  Jacobian refines all wells at once. The 2x2 normal equations of every well
+  are accumulated with bincount and solved in closed form, so an iteration
+  costs a few array passes regardless of the number of wells.
+- Vogel q = Qmax (1 - V p - (1 - V) p²), p = Pwf / Pws, is linear in
+  (Qmax, Qmax·V), so the least-squares fit is closed form: V fixed at 0.2
+  (classic Vogel) or fitted as well (generalized).
+"""
+import numpy as np
+
+from ipr.gas_batch import group_max, group_wells, grouped_linregress
+
+
+def _per_well(values, n_groups):
+    return np.broadcast_to(np.asarray(values, dtype=float), (n_groups,))
+
+
+def _rmse(codes, residual, w, n_groups):
+    N = np.bincount(codes, weights=w, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(np.bincount(codes, weights=w * residual**2, minlength=n_groups) / N)
+
+
+# Fetkovich C and n for every well. codes: well code of each point (0..n_groups-1);
+# pwf, q: test points; Pws: reservoir pressure per well (or one value for all).
+# Points with q <= 0 or Pwf >= Pws are ignored. Wells with two points reproduce
+# the exact two-point solution of ipr.oil.fetkovich; wells with fewer are NaN.
+def fit_fetkovich(codes, pwf, q, Pws, n_groups=None, max_iter=50, tol=1e-10):
+    codes = np.asarray(codes)
+    n_groups = int(codes.max()) + 1 if n_groups is None else n_groups
+    Pws = _per_well(Pws, n_groups)
+    pwf = np.asarray(pwf, dtype=float)
+    q = np.asarray(q, dtype=float)
+
+    dp2 = Pws[codes]**2 - pwf**2
+    mask = (q > 0) & (dp2 > 0)
+    w = mask.astype(float)
+    lx = np.log(np.where(mask, dp2, 1.0))
+    q = np.where(mask, q, 0.0)
+
+    # warm start: log q = log C + n log(Pws² - Pwf²)
+    n, lnC, N = grouped_linregress(codes, lx, np.log(np.where(mask, q, 1.0)), mask, n_groups)
+
+    def bins(weights):
+        return np.bincount(codes, weights=weights, minlength=n_groups)
+
+    def residuals(lnC, n):
+        with np.errstate(over="ignore", invalid="ignore"):
+            f = np.exp(lnC[codes] + n[codes] * lx) * w
+        return f, (q - f) * w
+
+    f, r = residuals(lnC, n)
+    sse = bins(r * r)
+    lam = np.full(n_groups, 1e-3)
+    active = np.isfinite(n) & (N > 2)       # two points: the warm start is already exact
+    iterations = np.zeros(n_groups, dtype=int)
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        # J = [df/dlnC, df/dn] = [f, f log x]; normal equations (JᵀJ + λ diag) δ = Jᵀr
+        fl = f * lx
+        A11, A12, A22 = bins(f * f), bins(f * fl), bins(fl * fl)
+        g1, g2 = bins(f * r), bins(fl * r)
+        B11, B22 = A11 * (1 + lam), A22 * (1 + lam)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            det = B11 * B22 - A12 * A12
+            d_lnC = (B22 * g1 - A12 * g2) / det
+            d_n = (B11 * g2 - A12 * g1) / det
+        step = active & np.isfinite(d_lnC) & np.isfinite(d_n)
+
+        lnC_new = np.where(step, lnC + d_lnC, lnC)
+        n_new = np.where(step, n + d_n, n)
+        f_new, r_new = residuals(lnC_new, n_new)
+        sse_new = bins(r_new * r_new)
+        accept = step & (sse_new <= sse)
+
+        lnC = np.where(accept, lnC_new, lnC)
+        n = np.where(accept, n_new, n)
+        iterations += active
+        keep = accept[codes]
+        f = np.where(keep, f_new, f)
+        r = np.where(keep, r_new, r)
+        small = (np.abs(d_lnC) <= tol * (1 + np.abs(lnC))) & (np.abs(d_n) <= tol * (1 + np.abs(n)))
+        flat = np.abs(sse - sse_new) <= tol * sse
+        sse = np.where(accept, sse_new, sse)
+        lam = np.where(accept, lam * 0.3, lam * 10)
+        active &= step & ~((accept & small) | flat) & (lam < 1e16)
+
+    return {
+        "n": n, "C": np.exp(lnC),
+        "n_points": N.astype(int),
+        "rmse": _rmse(codes, r, w, n_groups),
+        "iterations": iterations,
+    }
+
+
+# Vogel Qmax (and V if generalized) for every well; same inputs as fit_fetkovich.
+# Classic Vogel fixes V = 0.2; with generalized=True V is fitted too (two or more points).
+def fit_vogel(codes, pwf, q, Pws, n_groups=None, generalized=False, V=0.2):
+    codes = np.asarray(codes)
+    n_groups = int(codes.max()) + 1 if n_groups is None else n_groups
+    Pws = _per_well(Pws, n_groups)
+    pwf = np.asarray(pwf, dtype=float)
+    q = np.asarray(q, dtype=float)
+
+    p = pwf / Pws[codes]
+    mask = (q > 0) & (p < 1)
+    w = mask.astype(float)
+    q = np.where(mask, q, 0.0)
+    u = (1 - p * p) * w            # q = a u - b v, a = Qmax, b = Qmax V
+    v = (p - p * p) * w
+
+    def bins(weights):
+        return np.bincount(codes, weights=weights, minlength=n_groups)
+
+    N = bins(w)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if generalized:
+            Suu, Suv, Svv = bins(u * u), bins(u * v), bins(v * v)
+            Squ, Sqv = bins(q * u), bins(q * v)
+            det = Suu * Svv - Suv * Suv
+            Qmax = (Svv * Squ - Suv * Sqv) / det
+            V = (Suv * Squ - Suu * Sqv) / det / Qmax
+            V = np.where(N >= 2, V, np.nan)
+        else:
+            g = u - V * v
+            Qmax = bins(q * g) / bins(g * g)
+            V = np.full(n_groups, float(V))
+        Qmax = np.where(N >= 1, Qmax, np.nan)
+        fitted = Qmax[codes] * (1 - V[codes] * p - (1 - V[codes]) * p * p)
+
+    return {
+        "Qmax": Qmax, "V": V,
+        "n_points": N.astype(int),
+        "rmse": _rmse(codes, (q - fitted) * w, w, n_groups),
+    }
+
+
+# DataFrame front end: well id column plus Pws, Pwf and rate columns (read
+# positionally). Pws is taken per well as its largest value.
+def fit_multirate_wells(data, well_col="Well ID", generalized_vogel=False):
+    ids, codes = group_wells(data[well_col].to_numpy())
+    values = data.drop(columns=[well_col])
+    Pws = group_max(codes, values.iloc[:, 0].to_numpy(float), len(ids))
+    pwf = values.iloc[:, 1].to_numpy(float)
+    q = values.iloc[:, 2].to_numpy(float)
+
+    fet = fit_fetkovich(codes, pwf, q, Pws, len(ids))
+    vog = fit_vogel(codes, pwf, q, Pws, len(ids), generalized=generalized_vogel)
+    return {
+        "well_id": ids, "Pws": Pws, "n_points": fet["n_points"],
+        "n": fet["n"], "C": fet["C"], "AOF_fetkovich": fet["C"] * Pws**(2 * fet["n"]),
+        "rmse_fetkovich": fet["rmse"], "iterations": fet["iterations"],
+        "Qmax": vog["Qmax"], "V": vog["V"], "AOF_vogel": vog["Qmax"], "rmse_vogel": vog["rmse"],
+    }
@@ -0,0 +1,158 @@
+"""Nodal analysis: operating points where inflow (IPR) meets outflow (VLP).
+
+An IPR is any vectorized q(pwf) (see ipr.curves) and an outflow curve is any
+vectorized pwf(q), the bottom-hole pressure the tubing needs to lift rate q.
+Parameters are NumPy arrays that broadcast against each other, so wells on one
+axis and choke/tubing scenarios on another are solved together: the solver
+works on the whole (well x scenario) array at once.
+
+The operating point is the root of h(pwf) = pwf_vlp(q_ipr(pwf)) - pwf on
+[0, Pr]. A coarse scan from the AOF end brackets the highest-rate (stable)
+intersection, which also handles J-shaped outflow curves, and a vectorized
+Illinois (modified regula falsi) iteration refines it.
+"""
+import numpy as np
+
+from ipr import curves
+
+
+# Parameters along the well axis, ready to broadcast against scenarios: shape (wells, 1)
+def well_axis(x):
+    return np.asarray(x, dtype=float).reshape(-1, 1)
+
+
+# Parameters along the scenario axis: shape (1, scenarios)
+def scenario_axis(x):
+    return np.asarray(x, dtype=float).reshape(1, -1)
+
+
+# --- IPR models for arrays of wells ---
+
+def vogel_ipr(Pws, Qmax):
+    return curves.vogel(well_axis(Pws), well_axis(Qmax))
+
+
+def composite_vogel_ipr(J, Pws, Pb):
+    return curves.composite_vogel(well_axis(J), well_axis(Pws), well_axis(Pb))
+
+
+def fetkovich_ipr(n, c, Pws):
+    return curves.fetkovich(well_axis(n), well_axis(c), well_axis(Pws))
+
+
+# One of the four gas methods for every well of a batch fit (ipr.gas_batch.fit_gas_arrays)
+def gas_ipr(fit, method="lit_pressure_squared"):
+    Pr = well_axis(fit["Pr"])
+    if method == "backpressure":
+        return curves.backpressure(well_axis(fit["C"]), well_axis(fit["n"]), Pr)
+    if method == "lit_pressure_squared":
+        return curves.lit_pressure_squared(well_axis(fit["a"]), well_axis(fit["b"]), Pr)
+    if method == "lit_pressure_approx":
+        return curves.lit_pressure_approx(well_axis(fit["a1"]), well_axis(fit["b1"]), Pr)
+    if method == "lit_pseudopressure":
+        return curves.lit_pseudopressure(well_axis(fit["a2"]), well_axis(fit["b2"]), Pr,
+                                         well_axis(fit["psi_r"]))
+    raise ValueError(f"unknown gas method: {method}")
+
+
+# --- outflow curves ---
+
+# pwf = p_wh + dp_hydrostatic + c1 q + c2 q^2: a simple tubing curve per scenario
+# (c1 < 0 gives the low-rate J shape of liquid loading)
+def quadratic_outflow(p_wh, dp_hydrostatic, c1=0.0, c2=0.0):
+    p_wh, dp_hydrostatic = scenario_axis(p_wh), scenario_axis(dp_hydrostatic)
+    c1, c2 = scenario_axis(c1), scenario_axis(c2)
+    return lambda q: p_wh + dp_hydrostatic + c1 * q + c2 * q**2
+
+
+# Tabulated outflow: rates q_table and pressures pwf_table with shape
+# (scenarios, points), q_table increasing along each row. Linear interpolation,
+# linear extrapolation beyond the last point.
+def tabulated_outflow(q_table, pwf_table):
+    q_table = np.atleast_2d(np.asarray(q_table, dtype=float))
+    pwf_table = np.atleast_2d(np.asarray(pwf_table, dtype=float))
+    n_scen, n_pts = q_table.shape
+    slope = np.diff(pwf_table, axis=1) / np.diff(q_table, axis=1)
+
+    def pwf(q):
+        q = np.asarray(q, dtype=float)
+        shape = np.broadcast_shapes(q.shape, (1, n_scen))
+        qb = np.broadcast_to(q, shape)
+        scen = np.broadcast_to(np.arange(n_scen), shape)
+        # index of the segment holding q in each scenario's table
+        idx = np.zeros(shape, dtype=int)
+        for k in range(1, n_pts - 1):
+            idx += qb >= q_table[scen, k]
+        return pwf_table[scen, idx] + slope[scen, idx] * (qb - q_table[scen, idx])
+
+    return pwf
+
+
+# --- solver ---
+
+# Operating points for every (well, scenario) combination.
+# ipr: q(pwf) array model; outflow: pwf(q) array model; p_res: reservoir
+# pressure (upper end of the bracket), broadcastable to the case shape.
+# Returns a dict of arrays: q, pwf, flowing (False where the scan finds no
+# intersection, i.e. the tubing cannot lift the well at any rate) and the
+# iterations used. A J-shaped outflow curve may need more than p_res at zero
+# rate and still cross the IPR, so flowing comes from the scan, not from h(p_res).
+def operating_points(ipr, outflow, p_res, tol=1e-8, max_iter=60, n_scan=16):
+    p_res = np.asarray(p_res, dtype=float)
+
+    def h(p):
+        return outflow(ipr(p)) - p
+
+    h_res = h(p_res)
+    shape = h_res.shape
+    p_res = np.broadcast_to(p_res, shape)
+
+    # scan from pwf = 0 (AOF) upwards for the first + to - sign change
+    lo = np.zeros(shape)
+    hi = p_res.copy()
+    h_lo = h(lo) * np.ones(shape)
+    h_hi = h_res.copy()
+    found = h_lo <= 0              # tubing lifts even the AOF: operating point at pwf = 0
+    p_prev, h_prev = lo, h_lo
+    for k in range(1, n_scan + 1):
+        p_k = p_res * (k / n_scan)
+        h_k = h(p_k) * np.ones(shape)
+        new = ~found & (h_prev > 0) & (h_k <= 0)
+        lo = np.where(new, p_prev, lo)
+        h_lo = np.where(new, h_prev, h_lo)
+        hi = np.where(new, p_k, hi)
+        h_hi = np.where(new, h_k, h_hi)
+        found |= new
+        p_prev, h_prev = p_k, h_k
+
+    flowing = found
+    p = np.where(h_lo <= 0, 0.0, hi)
+    active = flowing & (h_lo > 0)
+    side = np.zeros(shape, dtype=np.int8)
+    scale = np.maximum(p_res, 1.0)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_new = (lo * h_hi - hi * h_lo) / (h_hi - h_lo)
+        bad = ~np.isfinite(p_new) | (p_new <= lo) | (p_new >= hi)
+        p_new = np.where(bad, 0.5 * (lo + hi), p_new)
+        hp = h(p_new) * np.ones(shape)
+        p = np.where(active, p_new, p)
+
+        above = hp > 0             # root lies above p_new
+        lo = np.where(active & above, p_new, lo)
+        h_lo = np.where(active & above, hp, h_lo)
+        hi = np.where(active & ~above, p_new, hi)
+        h_hi = np.where(active & ~above, hp, h_hi)
+        # Illinois step: halve the stale end when the same side moves twice
+        h_hi = np.where(active & above & (side == 1), 0.5 * h_hi, h_hi)
+        h_lo = np.where(active & ~above & (side == -1), 0.5 * h_lo, h_lo)
+        side = np.where(above, 1, -1).astype(np.int8)
+
+        active &= ~((hi - lo <= tol * scale) | (np.abs(hp) <= tol * scale))
+        if not active.any():
+            break
+
+    pwf = np.where(flowing, p, np.nan)
+    q = np.where(flowing, ipr(np.where(flowing, p, p_res)), 0.0)
+    return {"q": q, "pwf": pwf, "flowing": flowing, "iterations": iterations}
@@ -0,0 +1,138 @@
+"""Oil IPR equations: constant J, Vogel, Fetkovich and the composite
+(undersaturated) IPR. All curve functions accept scalars or NumPy arrays.
+"""
+import numpy as np
+
+from ipr.profiling import profiled, stage
+
+
+def generate_pressure_points(Pws, end, num_points=10):
+    return np.linspace(Pws, end, num_points)
+
+
+#Get Q_max:
+def return_Qmax(Qwf, Pwf, Pws):
+    Qmax = (Qwf / (1 - 0.2 * (Pwf / Pws) - 0.8 * (Pwf / Pws)**2))
+    return Qmax
+
+
+# Vogel IPR curve equation:
+def curve_IPR_Vogel(Pwf, Pws, Qmax):
+    return Qmax * (1 - 0.2 * (Pwf / Pws) - 0.8 * (Pwf / Pws)**2)
+
+
+#Find Productivity Index:
+def Productivity_Index(Qwf, Pws, Pwf):
+    J = (Qwf / (Pws - Pwf))
+    return J
+
+
+# Constant J approach IPR curve equation:
+def curve_IPR_constJ(J, Pws, Pwf):
+    return J * (Pws - Pwf)
+
+
+# Composite Vogel IPR below the bubble point
+def undersaturated1(Qob, J, Pb, Pwf):
+    Q = Qob + (((J * Pb) / 1.8) * (1 - 0.2 * (Pwf / Pb) - 0.8 * (Pwf / Pb)**2))
+    return Q
+
+
+# Productivity index from a test point below Pb (composite Vogel)
+def Calc_J(Qwf, Pws, Pb, Pwf):
+    J = Qwf / ((Pws - Pb) + ((Pb / 1.8) * (1 - 0.2 * (Pwf / Pb) - 0.8 * (Pwf / Pb)**2)))
+    return J
+
+
+# Fetkovich n and C from two test points (see ipr.multirate for regression on more points)
+def fetkovich(Pwf, Qwf, Pwf1, Qwf1, Pws):
+    n = float(np.log(Qwf1 / Qwf) / np.log((Pws**2 - Pwf1**2) / (Pws**2 - Pwf**2)))
+    c = (Qwf / ((Pws**2 - Pwf**2)**n))
+    return n, c
+
+
+#Fetkvich ka Q ka function h:
+def curve_fetkovich(n, c, Pwf, Pws):
+    return c * ((Pws**2 - Pwf**2)**n)
+
+
+# Composite Fetkovich IPR below the bubble point
+def curve_fetkovich_undersaturated(J, Pws, Pb, Pwf):
+    return J * ((Pws - Pb) + (1 / (2 * Pb)) * (Pb**2 - Pwf**2))
+
+
+@profiled("table")
+def _table(columns):
+    import pandas as pd
+
+    df = pd.DataFrame(columns)
+    # Add Serial Number starting from 1
+    df.index = df.index + 1
+    df.index.name = "S.No"
+    return df
+
+
+# Saturated reservoir (Pws < Pb): Vogel, constant J and two-point Fetkovich
+@profiled("saturated_ipr")
+def saturated_ipr(Pws, Pwf, Qwf, Pwf1, Qwf1, num_points=10):
+    Pressure_points = generate_pressure_points(Pws, 0, num_points)
+    n, c = fetkovich(Pwf, Qwf, Pwf1, Qwf1, Pws)
+    Qmax = return_Qmax(Qwf, Pwf, Pws)
+    J = Productivity_Index(Qwf, Pws, Pwf)
+
+    with stage("curve"):
+        Vogels_Q_values = curve_IPR_Vogel(Pressure_points, Pws, Qmax)
+        ConstantJ_Qvalues = curve_IPR_constJ(J, Pws, Pressure_points)
+        Fetkovich_Q_values = curve_fetkovich(n, c, Pressure_points, Pws)
+
+    df = _table({
+        "Pwf (bar)": Pressure_points,
+        "Vogel's Q (m³/d)": Vogels_Q_values,
+        "Constant J approach Q (m³/d)": ConstantJ_Qvalues,
+        "Fetkovich_Q_values Q (m³/d)": Fetkovich_Q_values
+    })
+    return {
+        "n": n, "c": c, "J": J, "Qmax": Qmax,
+        "AOF_constJ": ConstantJ_Qvalues[-1],
+        "AOF_vogel": Vogels_Q_values[-1],
+        "AOF_fetkovich": Fetkovich_Q_values[-1],
+        "table": df,
+    }
+
+
+# Undersaturated reservoir (Pws >= Pb): straight line above Pb, composite
+# Vogel / Fetkovich below it. With the test point above Pb both methods share
+# the productivity index; below Pb Vogel's J comes from Calc_J.
+@profiled("undersaturated_ipr")
+def undersaturated_ipr(Pws, Pb, Pwf, Qwf, num_points=10):
+    Pressure_points_Pwsto_Pb = generate_pressure_points(Pws, Pb, num_points)
+    Pressure_points_Pbto_0 = generate_pressure_points(Pb, 0, num_points)[1:]
+
+    J1 = Productivity_Index(Qwf, Pws, Pwf)
+    J = J1 if Pwf > Pb else Calc_J(Qwf, Pws, Pb, Pwf)
+
+    with stage("curve"):
+        # Vogel
+        Qob = J * (Pws - Pb)
+        Q_above_Pb = curve_IPR_constJ(J, Pws, Pressure_points_Pwsto_Pb)
+        Q_below_Pb = undersaturated1(Qob, J, Pb, Pressure_points_Pbto_0)
+
+        # Fetkovich
+        Qob1 = J1 * (Pws - Pb)
+        Q_above_Pb1 = curve_IPR_constJ(J1, Pws, Pressure_points_Pwsto_Pb)
+        Q_below_Pb1 = curve_fetkovich_undersaturated(J1, Pws, Pb, Pressure_points_Pbto_0)
+
+        All_Q_values = np.concatenate([Q_above_Pb, Q_below_Pb])
+        All_Q_values1 = np.concatenate([Q_above_Pb1, Q_below_Pb1])
+
+    df = _table({
+        "Pwf (bar)": np.concatenate([Pressure_points_Pwsto_Pb, Pressure_points_Pbto_0]),
+        "Vogel's Q (m³/d)": All_Q_values,
+        "Fetkovich's Q (m³/d)": All_Q_values1
+    })
+    return {
+        "J": J, "J1": J1, "Qob": Qob, "Qob1": Qob1,
+        "AOF_vogel": All_Q_values[-1],
+        "AOF_fetkovich": All_Q_values1[-1],
+        "table": df,
+    }
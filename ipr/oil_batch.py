@@ -0,0 +1,125 @@
+"""Vectorized multi-well oil IPR: all wells and all three regimes in one pass.
+
+Same equations as the oil page (ipr.oil), but Pb, Pws and the test points are
+arrays with one entry per well. The regime of every well is a mask instead of
+a branch:
+
+- SATURATED (Pws < Pb): Vogel, constant J and two-point Fetkovich
+- ABOVE_PB (Pws >= Pb, test Pwf > Pb): one J for the straight line and both composites
+- BELOW_PB (Pws >= Pb, test Pwf <= Pb): Vogel's J from Calc_J, Fetkovich keeps the test-point J
+
+Quantities that do not apply to a well's regime come back as NaN.
+"""
+import numpy as np
+
+from ipr.oil import (Calc_J, Productivity_Index, curve_fetkovich, curve_fetkovich_undersaturated,
+                     curve_IPR_Vogel, return_Qmax, undersaturated1)
+
+SATURATED, ABOVE_PB, BELOW_PB = 0, 1, 2
+REGIME_NAMES = {SATURATED: "saturated", ABOVE_PB: "undersaturated, test above Pb",
+                BELOW_PB: "undersaturated, test below Pb"}
+
+FIT_KEYS = ["regime", "J", "J1", "Qob", "Qob1", "Qmax", "n", "c",
+            "AOF_constJ", "AOF_vogel", "AOF_fetkovich"]
+
+
+def _arrays(*values):
+    return np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in values))
+
+
+def regime(Pb, Pws, Pwf):
+    Pb, Pws, Pwf = _arrays(Pb, Pws, Pwf)
+    return np.where(Pws < Pb, SATURATED, np.where(Pwf > Pb, ABOVE_PB, BELOW_PB)).astype(np.int8)
+
+
+# Fit every well at once. Pwf1/Qwf1 (second test point) are only used by
+# saturated wells for Fetkovich; leave them NaN (or omit) for the others.
+# Returns a dict of per-well arrays keyed by FIT_KEYS.
+def fit_oil_arrays(Pb, Pws, Pwf, Qwf, Pwf1=np.nan, Qwf1=np.nan):
+    Pb, Pws, Pwf, Qwf, Pwf1, Qwf1 = _arrays(Pb, Pws, Pwf, Qwf, Pwf1, Qwf1)
+    reg = regime(Pb, Pws, Pwf)
+    sat = reg == SATURATED
+    under = ~sat
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        J1 = Productivity_Index(Qwf, Pws, Pwf)
+        J = np.where(reg == BELOW_PB, Calc_J(Qwf, Pws, Pb, Pwf), J1)
+
+        # saturated: Vogel Qmax and the two-point Fetkovich exponent
+        Qmax_sat = return_Qmax(Qwf, Pwf, Pws)
+        dp2, dp2_1 = Pws**2 - Pwf**2, Pws**2 - Pwf1**2
+        n = np.log(Qwf1 / Qwf) / np.log(dp2_1 / dp2)
+        c = Qwf / dp2**n
+
+        # undersaturated: rate at the bubble point for each method
+        Qob = J * (Pws - Pb)
+        Qob1 = J1 * (Pws - Pb)
+
+        AOF_vogel = np.where(sat, Qmax_sat, Qob + J * Pb / 1.8)
+        AOF_fetkovich = np.where(sat, c * Pws**(2 * n), Qob1 + J1 * Pb / 2)
+
+    nan = np.nan
+    return {
+        "regime": reg,
+        "Pb": Pb, "Pws": Pws,
+        "J": J,
+        "J1": np.where(under, J1, nan),
+        "Qob": np.where(under, Qob, nan),
+        "Qob1": np.where(under, Qob1, nan),
+        "Qmax": np.where(sat, Qmax_sat, AOF_vogel),
+        "n": np.where(sat, n, nan),
+        "c": np.where(sat, c, nan),
+        "AOF_constJ": J1 * Pws,
+        "AOF_vogel": AOF_vogel,
+        "AOF_fetkovich": AOF_fetkovich,
+    }
+
+
+# DataFrame front end: one row per well, columns read by name
+# (see ipr.synthetic.OIL_COLUMNS); Pwf1/Qwf1 columns are optional.
+def fit_oil_wells(data, well_col="Well ID"):
+    cols = {c.split(" ")[0]: c for c in data.columns}
+    second = [data[cols[k]].to_numpy(float) if k in cols else np.nan for k in ("Pwf1", "Qwf1")]
+    fit = fit_oil_arrays(data[cols["Pb"]].to_numpy(float), data[cols["Pws"]].to_numpy(float),
+                         data[cols["Pwf"]].to_numpy(float), data[cols["Qwf"]].to_numpy(float), *second)
+    if well_col in data.columns:
+        fit["well_id"] = data[well_col].to_numpy()
+    return fit
+
+
+# The pressure grid of every well, shape (wells, 2 * num_points - 1).
+# Undersaturated wells use the page's layout (num_points from Pws to Pb, then
+# Pb to 0, so Pb is a node); saturated wells are uniform from Pws to 0, and
+# every other node ([:, ::2]) is the page's num_points grid.
+def oil_grid(fit, num_points=10):
+    Pws = fit["Pws"][:, None]
+    Pb = fit["Pb"][:, None]
+    t = np.linspace(0.0, 1.0, num_points)
+    top = Pws + (Pb - Pws) * t
+    bottom = Pb * (1 - t[1:])
+    two_segment = np.concatenate([top, bottom], axis=1)
+    uniform = Pws * (1 - np.linspace(0.0, 1.0, 2 * num_points - 1))
+    return np.where((fit["regime"] == SATURATED)[:, None], uniform, two_segment)
+
+
+# Vogel, Fetkovich and constant-J curves for every well on oil_grid(), or on a
+# given pwf grid of shape (wells, points) where rates above Pws are 0.
+# Returns pwf and a dict of rate arrays with the same shape.
+def oil_curves(fit, num_points=10, pwf=None):
+    col = {k: fit[k][:, None] for k in ("J", "J1", "Qob", "Qob1", "Qmax", "n", "c", "Pws", "Pb")}
+    if pwf is None:
+        pwf = oil_grid(fit, num_points)
+    grid, pwf = pwf, np.minimum(pwf, col["Pws"])
+    sat = (fit["regime"] == SATURATED)[:, None]
+    above = pwf >= col["Pb"]
+    J1 = np.where(sat, col["J"], col["J1"])
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        vogel = np.where(sat, curve_IPR_Vogel(pwf, col["Pws"], col["Qmax"]),
+                         np.where(above, col["J"] * (col["Pws"] - pwf),
+                                  undersaturated1(col["Qob"], col["J"], col["Pb"], pwf)))
+        fetkovich = np.where(sat, curve_fetkovich(col["n"], col["c"], pwf, col["Pws"]),
+                             np.where(above, col["J1"] * (col["Pws"] - pwf),
+                                      curve_fetkovich_undersaturated(col["J1"], col["Pws"], col["Pb"], pwf)))
+    constant_j = J1 * (col["Pws"] - pwf)
+    return grid, {"vogel": vogel, "fetkovich": fetkovich, "constant_j": constant_j}
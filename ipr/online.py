@@ -0,0 +1,171 @@
+"""Online gas IPR refits for wells whose test points arrive one at a time.
+
+Each OnlineGasWell keeps running regression statistics (count, means and
+centred co-moments, updated Welford-style) for the back-pressure log-log fit
+and the three LIT fits, so adding or removing a point and reading back C/n,
+a/b and the AOFs are O(1). The coefficients are the same as the batch fit
+(ipr.gas_batch.fit_gas_arrays) over the points currently held.
+
+Pr and ψr are the largest Pwf / ψ held, as on the gas page, unless they are
+given. A point that raises them (a new shut-in reading) or removing the point
+that set them changes every X and Y, so the statistics are rebuilt from the
+held points; that is the only case that is not O(1).
+"""
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from ipr.gas_batch import FIT_KEYS, lit_rate
+
+METHODS = ("backpressure", "lit_pressure_squared", "lit_pressure_approx", "lit_pseudopressure")
+
+
+# Running least squares y = intercept + slope * x with add and remove
+class RunningRegression:
+    __slots__ = ("n", "mx", "my", "sxx", "sxy")
+
+    def __init__(self):
+        self.n, self.mx, self.my, self.sxx, self.sxy = 0, 0.0, 0.0, 0.0, 0.0
+
+    def add(self, x, y):
+        self.n += 1
+        dx = x - self.mx
+        self.mx += dx / self.n
+        self.my += (y - self.my) / self.n
+        self.sxx += dx * (x - self.mx)
+        self.sxy += dx * (y - self.my)
+
+    def remove(self, x, y):
+        if self.n <= 1:
+            self.__init__()
+            return
+        dx = x - self.mx
+        self.n -= 1
+        self.mx -= dx / self.n
+        self.my -= (y - self.my) / self.n
+        self.sxx -= dx * (x - self.mx)
+        self.sxy -= dx * (y - self.my)
+
+    # (slope, intercept); NaN with fewer than two points or no spread in x
+    def line(self):
+        if self.n < 2 or self.sxx <= 0:
+            return math.nan, math.nan
+        slope = self.sxy / self.sxx
+        return slope, self.my - slope * self.mx
+
+
+class OnlineGasWell:
+    # window: keep only the most recent `window` points (None keeps all).
+    # Pr / psi_r: fixed reservoir pressure and pseudo-pressure (default: largest held).
+    def __init__(self, window=None, Pr=None, psi_r=None):
+        self.window = window
+        self.fixed_Pr = Pr
+        self.fixed_psi_r = psi_r
+        self.points = OrderedDict()       # key -> (pwf, psi, qg)
+        self._next_key = 0
+        self.rebuilds = 0
+        self._reset(Pr if Pr is not None else -math.inf, psi_r if psi_r is not None else -math.inf)
+
+    def _reset(self, Pr, psi_r):
+        self.Pr = Pr
+        self.psi_r = psi_r
+        self.regressions = {m: RunningRegression() for m in METHODS}
+
+    # The (x, y) pair each regression gets from a point, or None where the page masks it out
+    def _terms(self, pwf, psi, qg):
+        if not qg > 0:
+            return ()
+        out = []
+        dp2 = self.Pr**2 - pwf**2
+        if dp2 > 0:
+            out.append(("backpressure", math.log(dp2), math.log(qg)))
+            out.append(("lit_pressure_squared", qg, dp2 / qg))
+        dP = self.Pr - pwf
+        if dP > 0:
+            out.append(("lit_pressure_approx", qg, dP / qg))
+        dpsi = self.psi_r - psi
+        if dpsi > 0:
+            out.append(("lit_pseudopressure", qg, dpsi / qg))
+        return out
+
+    def _rebuild(self):
+        self.rebuilds += 1
+        held = list(self.points.values())
+        Pr = self.fixed_Pr if self.fixed_Pr is not None else max((p[0] for p in held), default=-math.inf)
+        psi_r = self.fixed_psi_r if self.fixed_psi_r is not None else max((p[1] for p in held), default=-math.inf)
+        self._reset(Pr, psi_r)
+        for point in held:
+            for method, x, y in self._terms(*point):
+                self.regressions[method].add(x, y)
+
+    # Add one test point; returns a key for remove()
+    def add(self, pwf, psi, qg):
+        key = self._next_key
+        self._next_key += 1
+        self.points[key] = (pwf, psi, qg)
+        if ((self.fixed_Pr is None and pwf > self.Pr)
+                or (self.fixed_psi_r is None and psi > self.psi_r)):
+            self._rebuild()
+        else:
+            for method, x, y in self._terms(pwf, psi, qg):
+                self.regressions[method].add(x, y)
+        if self.window is not None and len(self.points) > self.window:
+            self.remove(next(iter(self.points)))
+        return key
+
+    def remove(self, key):
+        pwf, psi, qg = self.points.pop(key)
+        if ((self.fixed_Pr is None and pwf >= self.Pr)
+                or (self.fixed_psi_r is None and psi >= self.psi_r)):
+            self._rebuild()
+        else:
+            for method, x, y in self._terms(pwf, psi, qg):
+                self.regressions[method].remove(x, y)
+
+    def __len__(self):
+        return len(self.points)
+
+    # Current coefficients and AOFs, keyed like one well of fit_gas_arrays
+    def fit(self):
+        n, logC = self.regressions["backpressure"].line()
+        b, a = self.regressions["lit_pressure_squared"].line()
+        b1, a1 = self.regressions["lit_pressure_approx"].line()
+        b2, a2 = self.regressions["lit_pseudopressure"].line()
+        Pr, psi_r = self.Pr, self.psi_r
+        # np.exp / np.power: a badly conditioned fit overflows to inf instead of raising
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            C = float(np.exp(logC))
+            return {
+                "Pr": Pr, "psi_r": psi_r,
+                "n_points": self.regressions["backpressure"].n,
+                "C": C, "n": n, "AOF_bp": float(C * np.power(np.float64(Pr)**2, n)),
+                "a": a, "b": b, "AOF_lit": float(lit_rate(a, b, Pr**2)),
+                "a1": a1, "b1": b1, "AOF_litp": float(lit_rate(a1, b1, Pr)),
+                "a2": a2, "b2": b2, "AOF_psi": float(lit_rate(a2, b2, psi_r)),
+            }
+
+
+# Online models for a whole field, created on first sight of a well id
+class OnlineGasField:
+    def __init__(self, window=None):
+        self.window = window
+        self.wells = {}
+
+    def add(self, well_id, pwf, psi, qg):
+        well = self.wells.get(well_id)
+        if well is None:
+            well = self.wells[well_id] = OnlineGasWell(self.window)
+        return well.add(pwf, psi, qg)
+
+    def remove(self, well_id, key):
+        self.wells[well_id].remove(key)
+
+    # Per-well arrays in the layout of fit_gas_arrays (well ids sorted)
+    def fits(self):
+        ids = sorted(self.wells)
+        rows = [self.wells[i].fit() for i in ids]
+        out = {"well_id": np.array(ids)}
+        for key in FIT_KEYS:
+            out[key] = np.array([row[key] for row in rows], dtype=int if key == "n_points" else float)
+        return out
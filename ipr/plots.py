@@ -0,0 +1,310 @@
+"""IPR charts: plain-data chart specs, rendered off the request path.
+
+Figure builders return a chart *spec* (a dict of series, labels and limits)
+instead of a figure. Specs are rendered with matplotlib's object-oriented API
+on an Agg canvas (no pyplot, so nothing is shared between sessions), or turned
+into an interactive Plotly figure for charts with many curves. Rendered PNG /
+SVG bytes are cached by the content hash of the spec, renders can run on a
+background thread pool, and every render is timed.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ipr.cache import ResultCache, content_hash
+from ipr.profiling import profiled
+
+# Use Plotly instead of a static image above these sizes
+PLOTLY_MAX_SERIES = 12
+PLOTLY_MAX_POINTS = 5000
+# render times kept per chart for the median (counts, sums and maxima cover all renders)
+RECENT_RENDERS = 1000
+
+MARKERS = {"o": "circle", "s": "square", "^": "triangle-up", "d": "diamond",
+           "v": "triangle-down", "p": "pentagon"}
+
+
+def _series(x, y, label, marker=None, linestyle="-"):
+    import numpy as np
+
+    return {"x": np.asarray(x, dtype=float), "y": np.asarray(y, dtype=float),
+            "label": label, "marker": marker, "linestyle": linestyle}
+
+
+# Shaded P90-P10 bands for the methods in `labels`, from an ipr.uncertainty
+# result (bootstrap_gas / monte_carlo_oil); colours follow the series order
+def _bands(uncertainty, labels, well=0):
+    if uncertainty is None:
+        return []
+    pwf = uncertainty["pwf"][well]
+    return [{"y": pwf, "x_low": uncertainty["curves"][m][well][0], "x_high": uncertainty["curves"][m][well][2],
+             "label": f"{label} P90-P10", "color": f"C{i}", "alpha": 0.2}
+            for i, (m, label) in enumerate(labels.items()) if m in uncertainty["curves"]]
+
+
+# Gas IPR comparison of the four methods; results as returned by compare_gas_methods
+def gas_comparison_chart(results, uncertainty=None):
+    styles = {
+        "backpressure": ("o", "Back-Pressure"),
+        "lit_pressure_squared": ("s", "LIT Pressure²"),
+        "lit_pressure_approx": ("^", "LIT Pressure Approx"),
+        "lit_pseudopressure": ("d", "Pseudo-pressure"),
+    }
+    return {
+        "name": "gas_comparison",
+        "series": [_series(results[m][1], results[m][0], label, marker)
+                   for m, (marker, label) in styles.items()],
+        "bands": _bands(uncertainty, {m: label for m, (_, label) in styles.items()}),
+        "xlabel": "Qg (Mscf/day)",
+        "ylabel": "Pwf or Ψwf",
+        "title": "Gas IPR Comparison (4 Methods)",
+        "grid": {"linestyle": "--", "alpha": 0.5},
+        "xlim": (0, None),
+        "ylim": (0, None),
+    }
+
+
+# Saturated oil reservoir: constant J vs Vogel vs Fetkovich
+def oil_saturated_chart(df, Pws, uncertainty=None):
+    pwf = df["Pwf (bar)"]
+    return {
+        "name": "oil_saturated",
+        "figsize": (10, 7),
+        "series": [
+            _series(df["Constant J approach Q (m³/d)"], pwf, "Constant J IPR", "s"),
+            _series(df["Vogel's Q (m³/d)"], pwf, "Vogel's IPR", "o"),
+            _series(df["Fetkovich_Q_values Q (m³/d)"], pwf, "Fetkovich_Q_values", "v"),
+        ],
+        "bands": _bands(uncertainty, {"constant_j": "Constant J", "vogel": "Vogel", "fetkovich": "Fetkovich"}),
+        "xlabel": "Flow Rate (m³/d)",
+        "ylabel": "Flowing Pressure (Pwf) [bar]",
+        "title": "IPR Curve Comparison: Vogel vs Constant J vs Fetkovich",
+        "grid": {},
+        "xlim": (0, None),
+        "ylim": (0, Pws + 100),
+    }
+
+
+# Undersaturated oil reservoir: composite Vogel vs Fetkovich with the bubble point marked
+def oil_undersaturated_chart(df, Pws, Pb, Qmax, uncertainty=None):
+    pwf = df["Pwf (bar)"]
+    return {
+        "name": "oil_undersaturated",
+        "figsize": (10, 7),
+        "series": [
+            _series(df["Vogel's Q (m³/d)"], pwf, "Vogel's IPR", "o"),
+            _series(df["Fetkovich's Q (m³/d)"], pwf, "Fetkovich's IPR", "p"),
+        ],
+        "bands": _bands(uncertainty, {"vogel": "Vogel", "fetkovich": "Fetkovich"}),
+        "xlabel": "Flow Rate (m³/d)",
+        "ylabel": "Flowing Pressure (Pwf) [bar]",
+        "title": "IPR Curve",
+        "grid": {},
+        "xlim": (0, None),
+        "ylim": (0, Pws + 100),
+        "hlines": [{"y": Pb, "color": "red", "linestyle": "--", "label": "Bubble Point (Pb)"}],
+        "texts": [
+            {"x": Qmax * 0.5, "y": Pb + 200, "text": "Undersaturated Reservoir Region", "color": "green"},
+            {"x": Qmax * 0.5, "y": Pb - 200, "text": "Saturated Reservoir Region", "color": "blue"},
+        ],
+    }
+
+
+# Commingled well: the curve of every layer (layer_rates: rows of rates on the
+# common pwf grid) and their sum
+def commingled_chart(pwf, layer_rates, total, labels, method_label):
+    return {
+        "name": "commingled",
+        "figsize": (10, 7),
+        "series": [_series(q, pwf, label, linestyle="--") for q, label in zip(layer_rates, labels)]
+                  + [_series(total, pwf, f"Commingled ({method_label})", "o")],
+        "xlabel": "Flow Rate (m³/d)",
+        "ylabel": "Flowing Pressure (Pwf) [bar]",
+        "title": "Commingled IPR by Layer",
+        "grid": {},
+        "ylim": (0, None),
+    }
+
+
+def use_plotly(spec):
+    n_points = sum(len(s["x"]) for s in spec["series"])
+    return len(spec["series"]) > PLOTLY_MAX_SERIES or n_points > PLOTLY_MAX_POINTS
+
+
+# matplotlib Figure on an Agg canvas, built without pyplot
+def matplotlib_figure(spec):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=spec.get("figsize", (6.4, 4.8)))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for s in spec["series"]:
+        ax.plot(s["x"], s["y"], linestyle=s["linestyle"], marker=s["marker"], label=s["label"])
+    for band in spec.get("bands", []):
+        ax.fill_betweenx(band["y"], band["x_low"], band["x_high"], alpha=band.get("alpha", 0.2),
+                         color=band.get("color"), label=band.get("label"), linewidth=0)
+    ax.set_xlabel(spec["xlabel"])
+    ax.set_ylabel(spec["ylabel"])
+    ax.set_title(spec["title"])
+    if "grid" in spec:
+        ax.grid(True, **spec["grid"])
+    ax.legend()
+    for line in spec.get("hlines", []):
+        ax.axhline(y=line["y"], color=line.get("color"), linestyle=line.get("linestyle", "-"),
+                   label=line.get("label"))
+    for text in spec.get("texts", []):
+        ax.text(text["x"], text["y"], text["text"], color=text.get("color"), fontsize=10, ha="center")
+    ax.set_ylim(*spec.get("ylim", (None, None)))
+    ax.set_xlim(*spec.get("xlim", (None, None)))
+    return fig
+
+
+def plotly_figure(spec):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for s in spec["series"]:
+        mode = "lines+markers" if s["marker"] and len(s["x"]) <= 200 else "lines"
+        fig.add_trace(go.Scattergl(x=s["x"], y=s["y"], mode=mode, name=s["label"],
+                                   marker_symbol=MARKERS.get(s["marker"], "circle")))
+    for band in spec.get("bands", []):
+        fig.add_trace(go.Scatter(x=list(band["x_high"]) + list(band["x_low"])[::-1],
+                                 y=list(band["y"]) + list(band["y"])[::-1],
+                                 fill="toself", opacity=band.get("alpha", 0.2), line_width=0,
+                                 name=band.get("label")))
+    for line in spec.get("hlines", []):
+        fig.add_hline(y=line["y"], line_dash="dash", line_color=line.get("color"))
+    for text in spec.get("texts", []):
+        fig.add_annotation(x=text["x"], y=text["y"], text=text["text"], showarrow=False,
+                           font_color=text.get("color"))
+    x0, x1 = spec.get("xlim", (None, None))
+    y0, y1 = spec.get("ylim", (None, None))
+    fig.update_layout(title=spec["title"], xaxis_title=spec["xlabel"], yaxis_title=spec["ylabel"])
+    if x0 is not None or x1 is not None:
+        fig.update_xaxes(rangemode="tozero" if x0 == 0 and x1 is None else "normal",
+                         range=None if x1 is None else [x0, x1])
+    if y0 is not None or y1 is not None:
+        fig.update_yaxes(rangemode="tozero" if y0 == 0 and y1 is None else "normal",
+                         range=None if y1 is None else [y0, y1])
+    return fig
+
+
+# Interactive heat map of a DataFrame (rows on y, columns on x), e.g. ipr.sweep.heatmap_table
+def heatmap_figure(table, title, colorbar=""):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Heatmap(z=table.to_numpy(), x=table.columns.to_numpy(), y=table.index.to_numpy(),
+                               colorscale="Viridis", colorbar_title=colorbar))
+    fig.update_layout(title=title, xaxis_title=table.columns.name, yaxis_title=table.index.name)
+    return fig
+
+
+# Tornado chart of ipr.sweep.tornado_table: metric mean at the low and high level
+# of each parameter, as bars from base (the overall mean)
+def tornado_figure(table, title, base):
+    import plotly.graph_objects as go
+
+    table = table.iloc[::-1]        # largest swing on top
+    fig = go.Figure([go.Bar(y=table["Parameter"], x=table[col] - base, base=base, orientation="h", name=name)
+                     for col, name in (("Mean at low", "Low value"), ("Mean at high", "High value"))])
+    fig.update_layout(title=title, barmode="overlay", xaxis_title="Mean over the other parameters")
+    return fig
+
+
+# Static image bytes (png or svg) of a spec
+@profiled("render_bytes")
+def render_bytes(spec, fmt="png", dpi=200):
+    import io
+
+    buf = io.BytesIO()
+    matplotlib_figure(spec).savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+
+# Renders specs on a small thread pool, caches the bytes by spec hash and
+# records the latency of every render per chart name
+class PlotRenderer:
+    def __init__(self, cache=None, workers=2):
+        self.cache = cache if cache is not None else ResultCache(max_entries=512)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ipr-plot")
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.timings = {}
+
+    def _record(self, name, seconds, cached):
+        with self._lock:
+            entry = self.timings.get(name)
+            if entry is None:
+                entry = self.timings[name] = {"renders": 0, "seconds": 0.0, "max": 0.0, "cache_hits": 0,
+                                              "recent": deque(maxlen=RECENT_RENDERS)}
+            if cached:
+                entry["cache_hits"] += 1
+            else:
+                entry["renders"] += 1
+                entry["seconds"] += seconds
+                entry["max"] = max(entry["max"], seconds)
+                entry["recent"].append(seconds)
+
+    def render(self, spec, fmt="png", dpi=200):
+        key = content_hash("render", spec, fmt, dpi)
+        missing = object()
+        data = self.cache.get(key, missing)
+        if data is not missing:
+            self._record(spec.get("name", "chart"), 0.0, True)
+            return data
+        t0 = time.perf_counter()
+        data = render_bytes(spec, fmt, dpi)
+        self._record(spec.get("name", "chart"), time.perf_counter() - t0, False)
+        self.cache.put(key, data)
+        return data
+
+    # Start rendering in the background; returns a Future for the bytes.
+    # Concurrent requests for the same chart share one render.
+    def submit(self, spec, fmt="png", dpi=200):
+        key = content_hash("render", spec, fmt, dpi)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._pool.submit(self.render, spec, fmt, dpi)
+            self._pending[key] = future
+        # outside the lock: a finished future runs the callback right here
+        future.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    # Per chart: render count, mean / p50 / max latency in ms and cache hits
+    # (p50 over the last RECENT_RENDERS renders)
+    def timing_summary(self):
+        import numpy as np
+
+        with self._lock:
+            summary = {}
+            for name, entry in self.timings.items():
+                n = entry["renders"]
+                summary[name] = {
+                    "renders": n,
+                    "cache_hits": entry["cache_hits"],
+                    "mean_ms": entry["seconds"] / n * 1000 if n else 0.0,
+                    "p50_ms": float(np.median(entry["recent"])) * 1000 if n else 0.0,
+                    "max_ms": entry["max"] * 1000,
+                }
+            return summary
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_renderer():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = PlotRenderer()
+        return _default
@@ -0,0 +1,285 @@
+"""Per-stage timers and memory counters for the IPR hot paths.
+
+Stages are named blocks (`with stage("read_csv"):` or the `@profiled(name)`
+decorator) around data loading, the fits, curve evaluation, table building
+and plotting. Nested stages get slash-separated paths such as
+"compare_gas_methods/backpressure/linregress". Each stage records wall and
+CPU time and the change in resident memory; with IPR_PROFILE=memory it also
+records the peak of Python allocations inside the stage (tracemalloc, which
+is process-wide and noticeably slower, so it is opt-in).
+
+Profiling is off unless IPR_PROFILE is set (1 / memory) or a page turns it on
+for its session with page_run(); when off, stage() returns a shared no-op
+context and profiled functions call straight through. Samples go to the
+records of the current page run (per thread, as Streamlit runs each session
+in its own thread) and to process-wide aggregates that can be exported in
+Prometheus text format; IPR_PROFILE_LOG appends one JSON line per page run.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+SETTING = os.environ.get("IPR_PROFILE", "").strip().lower()
+ENABLED = SETTING not in ("", "0", "false", "off", "no")
+MEMORY = SETTING == "memory"
+LOG_PATH = os.environ.get("IPR_PROFILE_LOG") or None
+
+# histogram bucket bounds of ipr_stage_seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+_local = threading.local()
+_lock = threading.Lock()
+_totals = {}
+
+
+def enabled():
+    return _local.__dict__.get("enabled", ENABLED)
+
+
+_statm = None
+
+
+# Resident set size in bytes (Linux /proc, read through one kept-open
+# descriptor; None elsewhere)
+def rss_bytes():
+    global _statm
+    try:
+        if _statm is None:
+            _statm = (os.open("/proc/self/statm", os.O_RDONLY), os.sysconf("SC_PAGE_SIZE"))
+        elif _statm[0] < 0:
+            return None
+        return int(os.pread(_statm[0], 128, 0).split()[1]) * _statm[1]
+    except (OSError, ValueError, AttributeError):
+        _statm = (-1, 0)
+        return None
+
+
+# Peak resident set size of the process in bytes
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+# Figures still open in pyplot's global figure manager (0 if pyplot was never
+# imported); the pages render without pyplot, so anything here is a leak
+def open_figures():
+    get_fignums = getattr(sys.modules.get("matplotlib.pyplot"), "get_fignums", None)
+    return len(get_fignums()) if get_fignums is not None else 0     # None while pyplot is importing
+
+
+class _Frame:
+    __slots__ = ("path", "t0", "cpu0", "rss0", "mem0", "mem_peak")
+
+
+def _memory():
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return tracemalloc
+
+
+def _record(sample):
+    with _lock:
+        entry = _totals.get(sample["stage"])
+        if entry is None:
+            entry = _totals[sample["stage"]] = {"count": 0, "seconds": 0.0, "cpu_seconds": 0.0,
+                                                "max_seconds": 0.0, "buckets": [0] * len(BUCKETS),
+                                                "rss_delta_max": 0, "alloc_peak_max": 0}
+        entry["count"] += 1
+        entry["seconds"] += sample["seconds"]
+        entry["cpu_seconds"] += sample["cpu_seconds"]
+        entry["max_seconds"] = max(entry["max_seconds"], sample["seconds"])
+        for i, bound in enumerate(BUCKETS):
+            if sample["seconds"] <= bound:
+                entry["buckets"][i] += 1
+        if sample.get("rss_delta") is not None:
+            entry["rss_delta_max"] = max(entry["rss_delta_max"], sample["rss_delta"])
+        if sample.get("alloc_peak") is not None:
+            entry["alloc_peak_max"] = max(entry["alloc_peak_max"], sample["alloc_peak"])
+    records = _local.__dict__.get("records")
+    if records is not None:
+        records.append(sample)
+
+
+@contextmanager
+def _stage(name):
+    stack = _local.__dict__.setdefault("stack", [])
+    frame = _Frame()
+    frame.path = f"{stack[-1].path}/{name}" if stack else name
+    if MEMORY:
+        tm = _memory()
+        current, peak = tm.get_traced_memory()
+        if stack:
+            stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+        tm.reset_peak()
+        frame.mem0 = frame.mem_peak = current
+    frame.rss0 = rss_bytes()
+    stack.append(frame)
+    frame.cpu0 = time.thread_time()
+    frame.t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - frame.t0
+        cpu = time.thread_time() - frame.cpu0
+        stack.pop()
+        rss = rss_bytes()
+        sample = {"stage": frame.path, "seconds": seconds, "cpu_seconds": cpu,
+                  "rss_delta": None if rss is None or frame.rss0 is None else rss - frame.rss0}
+        if MEMORY:
+            tm = _memory()
+            current, peak = tm.get_traced_memory()
+            frame.mem_peak = max(frame.mem_peak, peak)
+            sample["alloc_peak"] = frame.mem_peak - frame.mem0
+            sample["alloc_net"] = current - frame.mem0
+            if stack:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, frame.mem_peak)
+            tm.reset_peak()
+        _record(sample)
+
+
+# Time a block as stage `name` (a shared no-op context when profiling is off)
+def stage(name):
+    if not _local.__dict__.get("enabled", ENABLED):
+        return _NOOP
+    return _stage(name)
+
+
+# Decorator form of stage(); the name defaults to the function name
+def profiled(name=None):
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _local.__dict__.get("enabled", ENABLED):
+                return fn(*args, **kwargs)
+            with _stage(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Samples of one page run
+class Run:
+    def __init__(self, page, enabled):
+        self.page = page
+        self.enabled = enabled
+        self.records = []
+        self.started = time.time()
+        self.seconds = 0.0
+
+    # Stage table: one row per stage path (calls, total / max ms, CPU ms, memory)
+    def frame(self):
+        import pandas as pd
+
+        df = pd.DataFrame(self.records, columns=["stage", "seconds", "cpu_seconds", "rss_delta",
+                                                 "alloc_peak"])
+        if df.empty:
+            return pd.DataFrame(columns=["Stage", "Calls", "Total (ms)", "Max (ms)", "CPU (ms)",
+                                         "RSS Δ (MiB)", "Alloc peak (MiB)"])
+        g = df.groupby("stage", sort=False)
+        out = pd.DataFrame({
+            "Calls": g.size(),
+            "Total (ms)": g["seconds"].sum() * 1e3,
+            "Max (ms)": g["seconds"].max() * 1e3,
+            "CPU (ms)": g["cpu_seconds"].sum() * 1e3,
+            "RSS Δ (MiB)": g["rss_delta"].max() / 2**20,
+            "Alloc peak (MiB)": g["alloc_peak"].max() / 2**20,
+        })
+        out = out.rename_axis("Stage").reset_index().round(3)
+        return out.sort_values("Stage", kind="stable", ignore_index=True)
+
+    def to_json(self):
+        return json.dumps({"page": self.page, "started": self.started, "seconds": self.seconds,
+                           "rss_bytes": rss_bytes(), "peak_rss_bytes": peak_rss_bytes(),
+                           "open_figures": open_figures(), "stages": self.records})
+
+
+# Profile everything a page run does on this thread; enabled=None follows
+# IPR_PROFILE. The run is appended to IPR_PROFILE_LOG when that is set.
+@contextmanager
+def page_run(page, enabled=None):
+    run = Run(page, ENABLED if enabled is None else bool(enabled))
+    saved = (_local.__dict__.get("enabled"), _local.__dict__.get("records"))
+    _local.enabled = run.enabled
+    _local.records = run.records if run.enabled else None
+    t0 = time.perf_counter()
+    try:
+        if run.enabled:
+            with _stage(page):
+                yield run
+        else:
+            yield run
+    finally:
+        run.seconds = time.perf_counter() - t0
+        _local.enabled, _local.records = saved
+        if saved[0] is None:
+            del _local.enabled
+        if run.enabled and LOG_PATH:
+            with _lock, open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(run.to_json() + "\n")
+
+
+# Process-wide totals per stage
+def totals():
+    with _lock:
+        return {name: dict(entry, buckets=list(entry["buckets"])) for name, entry in _totals.items()}
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# All process-wide totals in the Prometheus text exposition format
+def prometheus_text():
+    stages = totals()
+    lines = ["# HELP ipr_stage_seconds Wall time of instrumented IPR stages.",
+             "# TYPE ipr_stage_seconds histogram"]
+    for name, e in stages.items():
+        label = _label(name)
+        for bound, count in zip(BUCKETS, e["buckets"]):
+            lines.append(f'ipr_stage_seconds_bucket{{stage="{label}",le="{bound}"}} {count}')
+        lines.append(f'ipr_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {e["count"]}')
+        lines.append(f'ipr_stage_seconds_sum{{stage="{label}"}} {e["seconds"]!r}')
+        lines.append(f'ipr_stage_seconds_count{{stage="{label}"}} {e["count"]}')
+    lines += ["# HELP ipr_stage_cpu_seconds_total CPU time of instrumented IPR stages.",
+              "# TYPE ipr_stage_cpu_seconds_total counter"]
+    lines += [f'ipr_stage_cpu_seconds_total{{stage="{_label(n)}"}} {e["cpu_seconds"]!r}'
+              for n, e in stages.items()]
+    lines += ["# HELP ipr_stage_rss_delta_bytes_max Largest resident memory growth during a stage.",
+              "# TYPE ipr_stage_rss_delta_bytes_max gauge"]
+    lines += [f'ipr_stage_rss_delta_bytes_max{{stage="{_label(n)}"}} {e["rss_delta_max"]}'
+              for n, e in stages.items()]
+    if MEMORY:
+        lines += ["# HELP ipr_stage_alloc_peak_bytes_max Largest Python allocation peak during a stage.",
+                  "# TYPE ipr_stage_alloc_peak_bytes_max gauge"]
+        lines += [f'ipr_stage_alloc_peak_bytes_max{{stage="{_label(n)}"}} {e["alloc_peak_max"]}'
+                  for n, e in stages.items()]
+    for metric, value, text in (("ipr_process_resident_bytes", rss_bytes(), "Resident set size."),
+                                ("ipr_process_peak_resident_bytes", peak_rss_bytes(), "Peak resident set size."),
+                                ("ipr_open_figures", open_figures(), "Open pyplot figures.")):
+        if value is not None:
+            lines += [f"# HELP {metric} {text}", f"# TYPE {metric} gauge", f"{metric} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+# Process-wide totals as JSON (for log shippers that prefer it to Prometheus)
+def json_snapshot():
+    return json.dumps({"time": time.time(), "rss_bytes": rss_bytes(), "peak_rss_bytes": peak_rss_bytes(),
+                       "open_figures": open_figures(), "stages": totals()})
@@ -0,0 +1,132 @@
+"""Real-gas pseudo-pressure m(p) = 2 ∫ p / (μ Z) dp from gas gravity and temperature.
+
+Z comes from the Hall-Yarborough fit of the Standing-Katz chart (pseudo-critical
+properties from Sutton's gravity correlation) and μ from Lee-Gonzalez-Eakin.
+For each gas (gravity, temperature) the integrand is evaluated once on a dense
+pressure grid and integrated cumulatively; the table is cached, and any array
+of pressures is then converted by linear interpolation. Units are oilfield:
+psia, °F, cp, and m(p) in psia²/cp like the ψ column of gas_well_data.csv.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+R = 10.7316          # psia ft³ / (lb-mol °R)
+AIR_MW = 28.966
+
+DEFAULT_P_MAX = 15000.0
+DEFAULT_POINTS = 3001
+
+
+# Sutton (1985) pseudo-critical pressure (psia) and temperature (°R) of a natural gas
+def pseudo_critical(gravity):
+    Ppc = 756.8 - 131.07 * gravity - 3.6 * gravity**2
+    Tpc = 169.2 + 349.5 * gravity - 74.0 * gravity**2
+    return Ppc, Tpc
+
+
+# Hall-Yarborough Z-factor, solved with a vectorized Newton iteration on the reduced density
+def z_factor(p, temperature_F, gravity, tol=1e-10, max_iter=100):
+    p = np.asarray(p, dtype=float)
+    Ppc, Tpc = pseudo_critical(gravity)
+    Ppr = p / Ppc
+    t = Tpc / (temperature_F + 459.67)
+    A = 0.06125 * t * np.exp(-1.2 * (1 - t)**2)
+    B = 14.76 * t - 9.76 * t**2 + 4.58 * t**3
+    C = 90.7 * t - 242.2 * t**2 + 42.4 * t**3
+    D = 2.18 + 2.82 * t
+
+    y = np.full_like(Ppr, 1e-3) * np.ones(np.broadcast(Ppr, t).shape)
+    for _ in range(max_iter):
+        f = -A * Ppr + (y + y**2 + y**3 - y**4) / (1 - y)**3 - B * y**2 + C * y**D
+        df = (1 + 4 * y + 4 * y**2 - 4 * y**3 + y**4) / (1 - y)**4 - 2 * B * y + C * D * y**(D - 1)
+        step = f / df
+        y = np.clip(y - step, 1e-12, 0.99)
+        if np.all(np.abs(step) < tol):
+            break
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Z = np.where(Ppr > 0, A * Ppr / y, 1.0)
+    return Z
+
+
+# Gas density in g/cm³
+def gas_density(p, temperature_F, gravity, Z=None):
+    if Z is None:
+        Z = z_factor(p, temperature_F, gravity)
+    T = temperature_F + 459.67
+    return p * AIR_MW * gravity / (Z * R * T) * 0.0160185
+
+
+# Lee-Gonzalez-Eakin gas viscosity in cp
+def gas_viscosity(p, temperature_F, gravity, Z=None):
+    T = temperature_F + 459.67
+    M = AIR_MW * gravity
+    K = (9.4 + 0.02 * M) * T**1.5 / (209 + 19 * M + T)
+    X = 3.5 + 986 / T + 0.01 * M
+    Y = 2.4 - 0.2 * X
+    rho = gas_density(p, temperature_F, gravity, Z)
+    return 1e-4 * K * np.exp(X * rho**Y)
+
+
+class PseudoPressureTable:
+    def __init__(self, gravity, temperature_F, p_max=DEFAULT_P_MAX, num_points=DEFAULT_POINTS):
+        self.gravity = gravity
+        self.temperature_F = temperature_F
+        self.p = np.linspace(0.0, p_max, num_points)
+        Z = z_factor(self.p, temperature_F, gravity)
+        mu = gas_viscosity(self.p, temperature_F, gravity, Z)
+        integrand = 2 * self.p / (mu * Z)
+        # cumulative trapezoid: m(p_k) = sum of the areas of the first k intervals
+        areas = 0.5 * (integrand[1:] + integrand[:-1]) * np.diff(self.p)
+        self.m = np.concatenate([[0.0], np.cumsum(areas)])
+        self.p2 = self.p**2
+        self._slope = (self.m[-1] - self.m[-2]) / (self.p[-1] - self.p[-2])
+
+    # m(p) for any array of pressures (linear beyond p_max). Interpolating against
+    # p² keeps the low-pressure end, where m ~ p²/(μZ), accurate between nodes.
+    def psi(self, p):
+        p = np.asarray(p, dtype=float)
+        out = np.interp(p * p, self.p2, self.m)
+        beyond = p > self.p[-1]
+        if np.any(beyond):
+            out = np.where(beyond, self.m[-1] + self._slope * (p - self.p[-1]), out)
+        return out
+
+    __call__ = psi
+
+    # Inverse: pressure for a pseudo-pressure (m is monotone in p)
+    def pressure(self, psi):
+        psi = np.asarray(psi, dtype=float)
+        out = np.sqrt(np.interp(psi, self.m, self.p2))
+        beyond = psi > self.m[-1]
+        if np.any(beyond):
+            out = np.where(beyond, self.p[-1] + (psi - self.m[-1]) / self._slope, out)
+        return out
+
+
+# Cached table per gas; gravity and temperature are rounded so that float noise
+# does not defeat the cache
+@lru_cache(maxsize=64)
+def _table(gravity, temperature_F, p_max, num_points):
+    return PseudoPressureTable(gravity, temperature_F, p_max, num_points)
+
+
+def pseudo_pressure_table(gravity, temperature_F, p_max=DEFAULT_P_MAX, num_points=DEFAULT_POINTS):
+    return _table(round(float(gravity), 4), round(float(temperature_F), 2), float(p_max), int(num_points))
+
+
+# m(p) for a field: p, gravity and temperature broadcast together; one table per distinct gas
+def pseudo_pressure(p, gravity, temperature_F, p_max=DEFAULT_P_MAX, num_points=DEFAULT_POINTS):
+    p, gravity, temperature_F = np.broadcast_arrays(np.asarray(p, dtype=float),
+                                                    np.asarray(gravity, dtype=float),
+                                                    np.asarray(temperature_F, dtype=float))
+    g_values, g_codes = np.unique(gravity.ravel(), return_inverse=True)
+    t_values, t_codes = np.unique(temperature_F.ravel(), return_inverse=True)
+    gas = g_codes * len(t_values) + t_codes
+    flat_p = p.ravel()
+    out = np.empty(p.size)
+    for k in np.unique(gas):
+        sel = gas == k
+        g, T = g_values[k // len(t_values)], t_values[k % len(t_values)]
+        out[sel] = pseudo_pressure_table(g, T, p_max, num_points).psi(flat_p[sel])
+    return out.reshape(p.shape)
@@ -0,0 +1,179 @@
+"""Chunked, bounded-memory reading of large gas well-test files.
+
+Files (CSV, or Parquet / Arrow via ipr.columnar) have the gas_well_data.csv
+columns (p_wf, ψ_wf, Qg) and optionally a well id column. Rows are read in
+chunks with explicit dtypes; multi-well files are regrouped into complete
+wells so that only one chunk (plus the partial well carried over from the
+previous one) is held in memory at a time. Rows of a well must be contiguous,
+which is how historian exports are written.
+"""
+import numpy as np
+
+from ipr import columnar
+from ipr.gas_batch import fit_gas_wells
+from ipr.profiling import profiled
+
+DEFAULT_CHUNKSIZE = 100_000
+VALUE_DTYPE = "float64"
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def read_header(source):
+    import pandas as pd
+
+    if columnar.is_columnar(source):
+        return columnar.column_names(source)
+    _rewind(source)
+    columns = list(pd.read_csv(source, nrows=0).columns)
+    _rewind(source)
+    return columns
+
+
+# Columns to read and their dtypes: the well id (if present) plus the first three value columns
+def gas_columns(source, well_col="Well ID"):
+    header = read_header(source)
+    has_well = well_col in header
+    values = [c for c in header if c != well_col][:3]
+    if len(values) < 3:
+        raise ValueError(f"expected p_wf, ψ_wf and Qg columns, found {values}")
+    dtypes = {c: VALUE_DTYPE for c in values}
+    if has_well:
+        dtypes[well_col] = "str"
+    return ([well_col] if has_well else []) + values, dtypes
+
+
+def iter_chunks(source, well_col="Well ID", chunksize=DEFAULT_CHUNKSIZE):
+    import pandas as pd
+
+    columns, dtypes = gas_columns(source, well_col)
+    if columnar.is_columnar(source):
+        for frame in columnar.iter_frames(source, columns, chunksize):
+            yield frame.astype(dtypes)[columns]
+        return
+    _rewind(source)
+    reader = pd.read_csv(source, usecols=columns, dtype=dtypes, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield chunk[columns]
+
+
+# Ordered ids of the runs of equal well id in a chunk. Only the first run may
+# continue the previous chunk's last well; any other repeat means the rows of a
+# well are not contiguous.
+def _runs(ids, seen, last):
+    runs = ids[np.r_[True, ids[1:] != ids[:-1]]]
+    continuing = runs[0] == last
+    repeated = len(set(runs)) != len(runs) \
+        or any(r in seen for r in runs[1 if continuing else 0:])
+    if repeated:
+        raise ValueError("rows of a well are not contiguous; sort the file by well id")
+    return runs
+
+
+# Yield DataFrames that contain only complete wells (the last well of each
+# chunk is held back until the next chunk shows where it ends)
+def iter_well_batches(source, well_col="Well ID", chunksize=DEFAULT_CHUNKSIZE):
+    import pandas as pd
+
+    seen = set()
+    carry = None
+    for chunk in iter_chunks(source, well_col, chunksize):
+        if well_col not in chunk.columns:
+            raise ValueError(f"no '{well_col}' column; the file holds a single well")
+        ids = chunk[well_col].to_numpy()
+        last = carry[well_col].iloc[0] if carry is not None and not carry.empty else None
+        runs = _runs(ids, seen, last)
+        seen.update(runs)
+
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+            ids = chunk[well_col].to_numpy()
+        tail = ids == runs[-1]
+        carry = chunk[tail]
+        complete = chunk[~tail]
+        if not complete.empty:
+            yield complete
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+# (well id, DataFrame of its p_wf, ψ_wf, Qg rows) for every well in the file
+def iter_well_groups(source, well_col="Well ID", chunksize=DEFAULT_CHUNKSIZE):
+    for batch in iter_well_batches(source, well_col, chunksize):
+        for well_id, rows in batch.groupby(well_col, sort=False):
+            yield well_id, rows.drop(columns=[well_col]).reset_index(drop=True)
+
+
+# Fit the four gas methods batch by batch; yields one fit dict per batch
+def fit_gas_stream(source, well_col="Well ID", chunksize=DEFAULT_CHUNKSIZE):
+    for batch in iter_well_batches(source, well_col, chunksize):
+        yield fit_gas_wells(batch, well_col)
+
+
+# Whole-file fit assembled from the streamed batches (memory grows with wells, not rows)
+@profiled("fit_gas_file")
+def fit_gas_file(source, well_col="Well ID", chunksize=DEFAULT_CHUNKSIZE):
+    fits = list(fit_gas_stream(source, well_col, chunksize))
+    if not fits:
+        raise ValueError("no test points")
+    return {key: np.concatenate([f[key] for f in fits]) for key in fits[0]}
+
+
+@profiled("count_rows")
+def count_rows(source, chunksize=DEFAULT_CHUNKSIZE):
+    import pandas as pd
+
+    if columnar.is_columnar(source):
+        return columnar.count_rows(source)
+    _rewind(source)
+    with pd.read_csv(source, usecols=[0], chunksize=chunksize) as reader:
+        total = sum(len(chunk) for chunk in reader)
+    _rewind(source)
+    return total
+
+
+# One page of rows for a preview table (rows start at 0)
+@profiled("read_preview")
+def read_preview(source, page=0, page_size=50):
+    import pandas as pd
+
+    if columnar.is_columnar(source):
+        start = page * page_size
+        parts, seen = [], 0
+        for frame in columnar.iter_frames(source, batch_size=max(page_size, 10_000)):
+            if seen + len(frame) > start:
+                parts.append(frame.iloc[max(start - seen, 0):])
+                if sum(map(len, parts)) >= page_size:
+                    break
+            seen += len(frame)
+        df = pd.concat(parts, ignore_index=True).iloc[:page_size] if parts else pd.DataFrame()
+        df.index = df.index + start + 1
+        df.index.name = "S.No."
+        return df
+    _rewind(source)
+    df = pd.read_csv(source, skiprows=range(1, page * page_size + 1), nrows=page_size)
+    _rewind(source)
+    df.index = df.index + page * page_size + 1
+    df.index.name = "S.No."
+    return df
+
+
+def well_ids(source, well_col="Well ID", chunksize=DEFAULT_CHUNKSIZE):
+    ids = {}
+    for chunk in iter_chunks(source, well_col, chunksize):
+        ids.update(dict.fromkeys(chunk[well_col].to_numpy()))
+    return list(ids)
+
+
+# The rows of a single well, found by scanning the file chunk by chunk
+@profiled("read_well")
+def read_well(source, well_id, well_col="Well ID", chunksize=DEFAULT_CHUNKSIZE):
+    import pandas as pd
+
+    parts = [chunk.loc[chunk[well_col] == well_id].drop(columns=[well_col])
+             for chunk in iter_chunks(source, well_col, chunksize)]
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,248 @@
+"""Batch gas deliverability over directories or globs of well-test files.
+
+Each CSV (or Parquet / Arrow file) is in the shape of gas_well_data.csv
+(p_wf, ψ_wf, Qg) and holds one well named after the file, or several wells if
+it has a well id column. Files are fanned out in chunks over a process pool;
+every chunk is fitted with the vectorized batch engine and its rows are
+appended to the output as soon as the chunk finishes (a .parquet output gets
+one row group per chunk). Bad files and wells that cannot be fitted are
+written as "failed" rows instead of stopping the run.
+
+    python -m ipr.runner data/wells/ "more/**/*.csv" -o deliverability.csv --workers 8
+"""
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from ipr import columnar
+from ipr.gas_batch import fit_gas_arrays, gas_error_percent
+
+COEFFICIENTS = ["C", "n", "a", "b", "a1", "b1", "a2", "b2"]
+AOFS = ["AOF_bp", "AOF_lit", "AOF_litp", "AOF_psi"]
+ERRORS = {"backpressure": "error_bp_pct",
+          "lit_pressure_squared": "error_lit_pct",
+          "lit_pressure_approx": "error_litp_pct"}
+TEXT_FIELDS = ["source", "well_id", "status", "message"]
+FIELDS = (TEXT_FIELDS + ["n_points", "Pr"]
+          + COEFFICIENTS + AOFS + list(ERRORS.values()))
+INPUT_SUFFIXES = (".csv",) + columnar.PARQUET_SUFFIXES + columnar.ARROW_SUFFIXES
+
+# coefficient pairs per method, used to name the methods that failed to fit
+METHOD_COEFFICIENTS = {"backpressure": ("C", "n"),
+                       "lit_pressure_squared": ("a", "b"),
+                       "lit_pressure_approx": ("a1", "b1"),
+                       "lit_pseudopressure": ("a2", "b2")}
+
+
+# Directories expand to their CSV/Parquet/Arrow files, patterns through glob (**
+# allowed); paths in exclude (e.g. the output file of an earlier run) are left out
+def expand_inputs(inputs, exclude=()):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(p for p in glob.glob(os.path.join(item, "*"))
+                                if p.lower().endswith(INPUT_SUFFIXES)))
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            paths.append(item)
+    skip = {os.path.realpath(p) for p in exclude}
+    return [p for p in dict.fromkeys(paths) if os.path.realpath(p) not in skip]
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _failure(source, well_id, message):
+    return {"source": source, "well_id": well_id, "status": "failed", "message": message}
+
+
+# Read one CSV, Parquet or Arrow file into (well ids, pwf, psi, qg) arrays
+def read_well_file(path, well_col):
+    import pandas as pd
+
+    df = columnar.read_frame(path) if columnar.is_columnar(path) else pd.read_csv(path)
+    if well_col in df.columns:
+        wells = df[well_col].astype(str).to_numpy()
+        df = df.drop(columns=[well_col])
+    else:
+        wells = np.full(len(df), os.path.splitext(os.path.basename(path))[0], dtype=object)
+    if df.shape[1] < 3:
+        raise ValueError(f"expected p_wf, ψ_wf and Qg columns, found {df.shape[1]}")
+    if df.empty:
+        raise ValueError("no test points")
+    values = df.iloc[:, :3].apply(pd.to_numeric, errors="raise").to_numpy(dtype=float)
+    return wells, values[:, 0], values[:, 1], values[:, 2]
+
+
+# Fit every well in a group of files; returns one output row per well (or per bad file)
+def run_chunk(paths, well_col="Well ID", num_points=20):
+    rows = []
+    keys, sources, wells, pwf, psi, qg = [], [], [], [], [], []
+    for path in paths:
+        try:
+            w, p, s, q = read_well_file(path, well_col)
+        except Exception as exc:
+            rows.append(_failure(path, "", f"{type(exc).__name__}: {exc}"))
+            continue
+        keys.append(np.array([f"{len(sources)}\x1f{x}" for x in w]))
+        sources.append(path)
+        wells.append(w)
+        pwf.append(p)
+        psi.append(s)
+        qg.append(q)
+    if not sources:
+        return rows
+
+    fit = fit_gas_arrays(np.concatenate(keys), np.concatenate(pwf),
+                         np.concatenate(psi), np.concatenate(qg))
+    errors = gas_error_percent(fit, num_points)
+
+    for i, key in enumerate(fit["well_id"]):
+        file_index, well_id = key.split("\x1f", 1)
+        source = sources[int(file_index)]
+        if fit["n_points"][i] == 0:
+            rows.append(_failure(source, well_id, "empty mask: no points with Qg > 0 below Pr"))
+            continue
+        singular = [m for m, coefs in METHOD_COEFFICIENTS.items()
+                    if not np.all(np.isfinite([fit[c][i] for c in coefs]))]
+        row = {"source": source, "well_id": well_id,
+               "status": "failed" if singular else "ok",
+               "message": f"singular regression: {', '.join(singular)}" if singular else "",
+               "n_points": int(fit["n_points"][i]), "Pr": fit["Pr"][i]}
+        row.update({k: fit[k][i] for k in COEFFICIENTS + AOFS})
+        row.update({col: errors[m][i] for m, col in ERRORS.items()})
+        rows.append(row)
+    return rows
+
+
+# Output rows go to CSV (one flushed write per chunk) or to Parquet (one row group per chunk)
+class ResultSink:
+    def __init__(self, output):
+        self.parquet = columnar.file_format(output) == "parquet"
+        if self.parquet:
+            self._writer = columnar.ParquetAppender(output)
+        else:
+            self._file = open(output, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+            self._writer.writeheader()
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self.parquet:
+            import pandas as pd
+
+            df = pd.DataFrame(rows, columns=FIELDS)
+            df[TEXT_FIELDS] = df[TEXT_FIELDS].fillna("").astype(str)
+            numeric = [c for c in FIELDS if c not in TEXT_FIELDS]
+            df[numeric] = df[numeric].astype(float)
+            self._writer.write(df)
+        else:
+            self._writer.writerows(rows)
+            self._file.flush()
+
+    def close(self):
+        if self.parquet:
+            self._writer.close()
+        else:
+            self._file.close()
+
+
+# Fitted rows in the layout of a batch fit, for ipr.store
+def rows_to_fit(rows):
+    rows = [r for r in rows if r["status"] == "ok"]
+    fit = {"well_id": np.array([r["well_id"] for r in rows], dtype=str)}
+    for key in ["n_points", "Pr"] + COEFFICIENTS + AOFS:
+        fit[key] = np.array([r[key] for r in rows], dtype=float)
+    return fit
+
+
+# store / test_date: also upsert the fitted wells into an ipr.store results store
+def run(paths, output, workers=None, chunk_size=64, well_col="Well ID", num_points=20,
+        store=None, test_date=None):
+    n_ok = n_failed = 0
+    sink = ResultSink(output)
+    if store is not None:
+        from ipr.store import ResultStore
+
+        store = ResultStore(store)
+        test_date = np.datetime64("today") if test_date is None else test_date
+
+    def write(rows):
+        nonlocal n_ok, n_failed
+        sink.write(rows)
+        if store is not None:
+            store.upsert_fits(rows_to_fit(rows), test_date)
+        ok = sum(r["status"] == "ok" for r in rows)
+        n_ok += ok
+        n_failed += len(rows) - ok
+
+    try:
+        chunks = list(chunked(paths, chunk_size))
+        if workers == 0:
+            for chunk in chunks:
+                try:
+                    rows = run_chunk(chunk, well_col, num_points)
+                except Exception as exc:
+                    rows = [_failure(path, "", f"{type(exc).__name__}: {exc}") for path in chunk]
+                write(rows)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(run_chunk, chunk, well_col, num_points): chunk
+                           for chunk in chunks}
+                for future in as_completed(futures):
+                    try:
+                        rows = future.result()
+                    except Exception as exc:
+                        rows = [_failure(path, "", f"{type(exc).__name__}: {exc}")
+                                for path in futures[future]]
+                    write(rows)
+    finally:
+        sink.close()
+        if store is not None:
+            store.close()
+    return n_ok, n_failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gas deliverability (back-pressure and LIT) for many well-test files.")
+    parser.add_argument("inputs", nargs="+",
+                        help="CSV/Parquet/Arrow files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="gas_deliverability.csv",
+                        help="output .csv or .parquet")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: CPU count, 0 runs in-process)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="files per task")
+    parser.add_argument("--well-col", default="Well ID",
+                        help="well id column in multi-well files (default: %(default)s)")
+    parser.add_argument("--points", type=int, default=20,
+                        help="curve points used for the error percentages")
+    parser.add_argument("--store", default=None,
+                        help="also upsert the fits into this results store (SQLite file)")
+    parser.add_argument("--test-date", default=None,
+                        help="test date of the fits in the store, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs, exclude=[args.output])
+    if not paths:
+        parser.error("no input files found")
+
+    t0 = time.perf_counter()
+    n_ok, n_failed = run(paths, args.output, args.workers, args.chunk_size,
+                         args.well_col, args.points, args.store, args.test_date)
+    print(f"{len(paths)} files, {n_ok} wells ok, {n_failed} failed "
+          f"in {time.perf_counter() - t0:.2f} s -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""Local JSON service for IPR evaluations, with request micro-batching.
+
+Endpoints (POST bodies and responses are JSON):
+
+- POST /gas/fit    {"pwf": [...], "psi": [...], "qg": [...], "num_points": 20 (optional)}
+                   -> back-pressure and LIT coefficients and AOFs (and curves with num_points)
+- POST /oil/fit    {"Pb", "Pws", "Pwf", "Qwf", "Pwf1", "Qwf1" (optional)} -> fit_oil_arrays of one well
+- POST /oil/curve  {"method": "vogel" | "fetkovich" | "composite_vogel" | "constant_j", "pwf": [...],
+                    plus the curve's parameters: vogel Pws, Qmax; fetkovich n, c, Pws;
+                    composite_vogel Qob, J, Pb; constant_j J, Pws} -> {"rate": [...]}
+- GET  /metrics    latency p50/p99, throughput and batch sizes per endpoint
+- GET  /health
+
+Requests that arrive within window_ms of each other (up to max_batch) are
+coalesced per endpoint: the gas fits of a batch become one grouped fit
+(ipr.gas_batch.fit_gas_codes) and oil curves one array evaluation per method.
+The server is plain asyncio streams with a minimal HTTP/1.1 parser (keep-alive,
+Content-Length bodies), so it needs nothing outside the standard library and NumPy.
+
+    python -m ipr.service --port 8765 --window-ms 2 --max-batch 256
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from ipr.gas_batch import FIT_KEYS, fit_gas_codes, gas_curves
+from ipr import curves
+from ipr.oil import curve_fetkovich, curve_IPR_constJ, curve_IPR_Vogel
+from ipr.oil_batch import REGIME_NAMES, fit_oil_arrays
+
+
+# Composite Vogel in the endpoint's parameters (Pws follows from Qob = J (Pws - Pb)):
+# straight line above Pb, Vogel below
+def composite_vogel(Pwf, Qob, J, Pb):
+    return curves.composite_vogel(J, Pb + Qob / J, Pb)(Pwf)
+
+
+OIL_CURVES = {
+    "vogel": (curve_IPR_Vogel, ("Pws", "Qmax")),
+    "fetkovich": (curve_fetkovich, ("n", "c", "Pws")),
+    "composite_vogel": (composite_vogel, ("Qob", "J", "Pb")),
+    "constant_j": (curve_IPR_constJ, ("J", "Pws")),
+}
+OIL_FIT_INPUTS = ("Pb", "Pws", "Pwf", "Qwf", "Pwf1", "Qwf1")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY = 16 * 1024 * 1024
+
+
+class RequestError(ValueError):
+    pass
+
+
+# JSON-safe copy: arrays to lists, NaN / inf to null
+def to_json(value):
+    if isinstance(value, dict):
+        return {k: to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_json(value.tolist())
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    return value
+
+
+def _array(body, key, length=None):
+    if key not in body:
+        raise RequestError(f"missing field: {key}")
+    try:
+        values = np.asarray(body[key], dtype=float)
+    except (TypeError, ValueError):
+        raise RequestError(f"{key} must be a number or a list of numbers") from None
+    if values.ndim > 1 or (length is not None and values.size != length):
+        raise RequestError(f"{key} must be a flat list" + (f" of {length} values" if length else ""))
+    return values
+
+
+def _number(body, key, default=None):
+    if key not in body and default is not None:
+        return default
+    values = _array(body, key)
+    if values.ndim != 0:
+        raise RequestError(f"{key} must be a number")
+    return float(values)
+
+
+# Request parsing: each returns the item queued for the endpoint's batch function
+
+def parse_gas_fit(body):
+    pwf = np.atleast_1d(_array(body, "pwf"))
+    item = {"pwf": pwf, "psi": np.atleast_1d(_array(body, "psi", pwf.size)),
+            "qg": np.atleast_1d(_array(body, "qg", pwf.size))}
+    if pwf.size == 0:
+        raise RequestError("pwf is empty")
+    num_points = body.get("num_points")
+    if num_points is not None and (not isinstance(num_points, int) or not 2 <= num_points <= 10000):
+        raise RequestError("num_points must be an integer between 2 and 10000")
+    item["num_points"] = num_points
+    return item
+
+
+def parse_oil_fit(body):
+    return {k: _number(body, k, math.nan if k in ("Pwf1", "Qwf1") else None) for k in OIL_FIT_INPUTS}
+
+
+def parse_oil_curve(body):
+    method = body.get("method")
+    if method not in OIL_CURVES:
+        raise RequestError(f"method must be one of {', '.join(OIL_CURVES)}")
+    _, params = OIL_CURVES[method]
+    return {"method": method, "pwf": np.atleast_1d(_array(body, "pwf")),
+            **{p: _number(body, p) for p in params}}
+
+
+# Batch functions: a list of parsed items in, one response dict per item out
+
+def run_gas_fit(items):
+    lengths = [len(item["pwf"]) for item in items]
+    codes = np.repeat(np.arange(len(items)), lengths)
+    fit = fit_gas_codes(codes, len(items), *(np.concatenate([item[k] for item in items])
+                                              for k in ("pwf", "psi", "qg")))
+    out = [{k: fit[k][i] for k in FIT_KEYS} for i in range(len(items))]
+    # curves for the items that asked, one gas_curves call per distinct num_points
+    for num_points in {item["num_points"] for item in items} - {None}:
+        idx = np.array([i for i, item in enumerate(items) if item["num_points"] == num_points])
+        pwf, rates = gas_curves({k: v[idx] for k, v in fit.items()}, num_points)
+        for row, i in enumerate(idx):
+            out[i]["curves"] = {"pwf": pwf[row], **{m: q[row] for m, q in rates.items()}}
+    return out
+
+
+def run_oil_fit(items):
+    fit = fit_oil_arrays(*(np.array([item[k] for item in items]) for k in OIL_FIT_INPUTS))
+    out = [{k: v[i] for k, v in fit.items()} for i in range(len(items))]
+    for row in out:
+        row["regime"] = REGIME_NAMES[int(row["regime"])]
+    return out
+
+
+def run_oil_curve(items):
+    out = [None] * len(items)
+    for method, (fn, params) in OIL_CURVES.items():
+        idx = [i for i, item in enumerate(items) if item["method"] == method]
+        if not idx:
+            continue
+        lengths = [len(items[i]["pwf"]) for i in idx]
+        pwf = np.concatenate([items[i]["pwf"] for i in idx])
+        args = {p: np.repeat([items[i][p] for i in idx], lengths) for p in params}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = fn(Pwf=pwf, **args)
+        for i, part in zip(idx, np.split(rates, np.cumsum(lengths)[:-1])):
+            out[i] = {"rate": part}
+    return out
+
+
+ENDPOINTS = {
+    "/gas/fit": (parse_gas_fit, run_gas_fit),
+    "/oil/fit": (parse_oil_fit, run_oil_fit),
+    "/oil/curve": (parse_oil_curve, run_oil_curve),
+}
+
+
+# Coalesces items submitted within `window` seconds (at most max_batch) into
+# one call of fn(items); each submitter awaits its own result
+class MicroBatcher:
+    def __init__(self, fn, window=0.002, max_batch=256):
+        self.fn = fn
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.flusher = None
+        self.batch_sizes = deque(maxlen=10000)
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((item, future))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.flusher is None:
+            self.flusher = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self.flusher is not None:
+            self.flusher.cancel()
+            self.flusher = None
+        batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+        if self.pending:
+            self.flusher = asyncio.get_running_loop().call_soon(self._flush)
+        if not batch:
+            return
+        self.batch_sizes.append(len(batch))
+        try:
+            results = self.fn([item for item, _ in batch])
+        except Exception:
+            # one bad item must not fail its neighbours: rerun them one at a time
+            for item, future in batch:
+                try:
+                    result = self.fn([item])[0]
+                except Exception as exc:
+                    if not future.done():
+                        future.set_exception(exc)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+# Request latencies (seconds) per endpoint over the most recent requests
+class Metrics:
+    def __init__(self, keep=100_000):
+        self.started = time.perf_counter()
+        self.latency = {}
+        self.counts = {}
+        self.errors = {}
+        self.keep = keep
+
+    def record(self, endpoint, seconds, ok=True):
+        self.latency.setdefault(endpoint, deque(maxlen=self.keep)).append(seconds)
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, batchers=None):
+        uptime = time.perf_counter() - self.started
+        out = {"uptime_s": uptime, "requests": sum(self.counts.values()), "endpoints": {}}
+        out["throughput_rps"] = out["requests"] / uptime if uptime > 0 else 0.0
+        for endpoint, lat in self.latency.items():
+            ms = np.array(lat) * 1e3
+            row = {"requests": self.counts[endpoint], "errors": self.errors.get(endpoint, 0),
+                   "p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99)),
+                   "max_ms": float(ms.max()), "throughput_rps": self.counts[endpoint] / uptime}
+            batcher = (batchers or {}).get(endpoint)
+            if batcher is not None and batcher.batch_sizes:
+                sizes = np.array(batcher.batch_sizes)
+                row.update(batches=len(sizes), mean_batch=float(sizes.mean()), max_batch=int(sizes.max()))
+            out["endpoints"][endpoint] = row
+        return out
+
+
+class IPRService:
+    def __init__(self, window_ms=2.0, max_batch=256):
+        self.batchers = {path: MicroBatcher(run, window_ms / 1e3, max_batch)
+                         for path, (_, run) in ENDPOINTS.items()}
+        self.metrics = Metrics()
+
+    async def handle(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics.summary(self.batchers)
+        if path not in ENDPOINTS:
+            return 404, {"error": f"unknown endpoint: {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise RequestError("body must be a JSON object")
+            item = ENDPOINTS[path][0](payload)
+        except (RequestError, json.JSONDecodeError, UnicodeDecodeError) as exc:
+            return 400, {"error": str(exc)}
+        return 200, await self.batchers[path].submit(item)
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, result = 400, {"error": "invalid Content-Length"}
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, result = 413, {"error": "request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    path = target.split("?", 1)[0]
+                    try:
+                        status, result = await self.handle(method, path, body)
+                    except Exception as exc:
+                        status, result = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                payload = json.dumps(to_json(result), separators=(",", ":")).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                             + payload)
+                await writer.drain()
+                if method == "POST" and status != 404:
+                    self.metrics.record(target.split("?", 1)[0], time.perf_counter() - t0, status == 200)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        return await asyncio.start_server(self.serve_connection, host, port)
+
+
+async def serve(host="127.0.0.1", port=8765, window_ms=2.0, max_batch=256):
+    service = IPRService(window_ms, max_batch)
+    server = await service.start(host, port)
+    print(f"IPR service on http://{host}:{port} (window {window_ms} ms, max batch {max_batch})")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON service for IPR fits and curves.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--window-ms", type=float, default=2.0,
+                        help="how long a batch waits for more requests (0 disables waiting)")
+    parser.add_argument("--max-batch", type=int, default=256, help="largest batch per endpoint")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.window_ms, args.max_batch))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Persistent results store for fitted well models and their IPR curves.
+
+One SQLite file holds a row of coefficients and AOFs per well and test date
+(gas and oil fits share the table; columns that do not apply stay NULL) and,
+optionally, the curve points of each method. Both tables are keyed (and
+clustered, WITHOUT ROWID) on well id, test date and kind ("gas" or "oil"), so
+the history of a set of wells is a handful of index range scans and a gas and
+an oil fit of the same well and date are kept side by side. Writes are bulk
+upserts in one transaction; a refit of the same well, date and kind replaces
+the old row.
+
+Curves are stored compactly: one row per well and test date with the shared
+Pwf grid and a (methods, points) rate matrix as raw little-endian arrays
+(float32 by default) in BLOB columns, rather than one row per point. Dates are ISO strings
+(YYYY-MM-DD). sqlite3 is in the standard library; pandas is imported by the
+query helpers that return DataFrames.
+"""
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+GAS_FIELDS = ["Pr", "psi_r", "n_points", "C", "n", "a", "b", "a1", "b1", "a2", "b2",
+              "AOF_bp", "AOF_lit", "AOF_litp", "AOF_psi"]
+OIL_FIELDS = ["Pb", "Pws", "regime", "J", "J1", "Qob", "Qob1", "Qmax", "n", "c",
+              "AOF_constJ", "AOF_vogel", "AOF_fetkovich"]
+# oil Fetkovich c is stored in the gas C column; Pws in Pr
+ALIASES = {"c": "C", "Pws": "Pr"}
+FIT_FIELDS = list(dict.fromkeys(ALIASES.get(f, f) for f in GAS_FIELDS + OIL_FIELDS))
+
+CURVE_DTYPE = "<f4"
+DEFAULT_PATH = "ipr_results.db"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS fits (
+    well_id TEXT NOT NULL,
+    test_date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    {", ".join(f'"{f}" REAL' for f in FIT_FIELDS)},
+    PRIMARY KEY (well_id, test_date, kind)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fits_by_date ON fits (test_date);
+CREATE TABLE IF NOT EXISTS curves (
+    well_id TEXT NOT NULL,
+    test_date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    methods TEXT NOT NULL,
+    dtype TEXT NOT NULL,
+    pwf BLOB NOT NULL,
+    rates BLOB NOT NULL,
+    PRIMARY KEY (well_id, test_date, kind)
+) WITHOUT ROWID;
+"""
+
+
+# ISO date strings for a date, a string or an array of either
+def iso_dates(dates, n=None):
+    d = np.asarray(dates)
+    if d.dtype.kind not in "M":
+        d = d.astype("datetime64[D]")
+    out = np.datetime_as_string(d.astype("datetime64[D]"), unit="D")
+    return np.broadcast_to(out, (n,)) if n is not None and out.ndim == 0 else out
+
+
+def encode_array(values, dtype=CURVE_DTYPE):
+    return np.ascontiguousarray(values, dtype=dtype).tobytes()
+
+
+def decode_array(blob, dtype=CURVE_DTYPE):
+    return np.frombuffer(blob, dtype=dtype).astype(float)
+
+
+def _quoted(columns):
+    return ", ".join(f'"{c}"' for c in columns)
+
+
+# Store file used by the pages and the batch runner: IPR_STORE or ./ipr_results.db
+def default_store_path():
+    return os.environ.get("IPR_STORE") or DEFAULT_PATH
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+
+    # Files written before kind was part of the key: copy both tables into the
+    # new layout (old curves take the kind of their fit row, else gas)
+    def _migrate(self):
+        key = [r[1] for r in sorted(self.conn.execute("PRAGMA table_info(fits)"), key=lambda r: r[5]) if r[5]]
+        if key != ["well_id", "test_date"]:
+            return
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("ALTER TABLE fits RENAME TO fits_old")
+            self.conn.execute("ALTER TABLE curves RENAME TO curves_old")
+            self.conn.execute("DROP INDEX IF EXISTS fits_by_date")
+            for statement in SCHEMA.split(";")[:-1]:
+                self.conn.execute(statement)
+            self.conn.execute("INSERT INTO fits SELECT * FROM fits_old")
+            self.conn.execute(
+                "INSERT INTO curves SELECT c.well_id, c.test_date, COALESCE(f.kind, 'gas'), "
+                "c.methods, c.dtype, c.pwf, c.rates FROM curves_old c "
+                "LEFT JOIN fits_old f USING (well_id, test_date)")
+            self.conn.execute("DROP TABLE fits_old")
+            self.conn.execute("DROP TABLE curves_old")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Bulk upsert of a batch fit (dict of per-well arrays with "well_id", e.g.
+    # from fit_gas_arrays or fit_oil_wells; missing fields are left NULL). test_date: one date or one per well;
+    # kind: "gas" or "oil". Returns the number of rows written.
+    def upsert_fits(self, fit, test_date, kind="gas"):
+        ids = np.asarray(fit["well_id"]).astype(str)
+        dates = iso_dates(test_date, len(ids))
+        fields = GAS_FIELDS if kind == "gas" else OIL_FIELDS
+        present = [f for f in fields if f in fit]
+        columns = [ALIASES.get(f, f) for f in present]
+        numbers = np.column_stack([np.asarray(fit[f], dtype=float) for f in present])
+        values = numbers.astype(object)
+        values[~np.isfinite(numbers)] = None      # NaN / inf -> NULL
+        names = _quoted(["well_id", "test_date", "kind"] + columns)
+        updates = ", ".join(f'"{c}" = excluded."{c}"' for c in columns)
+        sql = (f"INSERT INTO fits ({names}) VALUES ({', '.join('?' * (len(columns) + 3))}) "
+               f"ON CONFLICT (well_id, test_date, kind) DO UPDATE SET {updates}")
+        rows = ((w, d, kind, *v) for w, d, v in zip(ids.tolist(), dates.tolist(), values.tolist()))
+        with self.conn:
+            self.conn.executemany(sql, rows)
+        return len(ids)
+
+    # Bulk upsert of curves: pwf and each rates[method] have shape (wells, points)
+    # (as from gas_curves / oil_curves); stored as raw arrays of dtype.
+    def upsert_curves(self, well_ids, test_date, pwf, rates, kind="gas", dtype=CURVE_DTYPE):
+        ids = np.asarray(well_ids).astype(str)
+        dates = iso_dates(test_date, len(ids))
+        methods = ",".join(rates)
+        matrix = np.stack([np.asarray(q, dtype=dtype) for q in rates.values()], axis=1)
+        sql = ("INSERT INTO curves (well_id, test_date, kind, methods, dtype, pwf, rates) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?) "
+               "ON CONFLICT (well_id, test_date, kind) DO UPDATE SET methods = excluded.methods, "
+               "dtype = excluded.dtype, pwf = excluded.pwf, rates = excluded.rates")
+        rows = ((w, d, kind, methods, dtype, encode_array(p, dtype), encode_array(q, dtype))
+                for w, d, p, q in zip(ids.tolist(), dates.tolist(), np.asarray(pwf), matrix))
+        with self.conn:
+            self.conn.executemany(sql, rows)
+        return len(ids)
+
+    def _where(self, well_ids, start, end, kind=None):
+        clauses, params = [], []
+        if well_ids is not None:
+            # one JSON parameter instead of one placeholder per well
+            clauses.append("well_id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps([str(w) for w in np.asarray(well_ids).tolist()]))
+        if start is not None:
+            clauses.append("test_date >= ?")
+            params.append(str(iso_dates(start)))
+        if end is not None:
+            clauses.append("test_date <= ?")
+            params.append(str(iso_dates(end)))
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    # Fit history as a DataFrame (one row per well, test date and kind, sorted), for
+    # the given wells, date range and kind; columns defaults to every fit field.
+    def history(self, well_ids=None, start=None, end=None, columns=None, kind=None):
+        import pandas as pd
+
+        columns = FIT_FIELDS if columns is None else [ALIASES.get(c, c) for c in columns]
+        where, params = self._where(well_ids, start, end, kind)
+        cols = ["well_id", "test_date", "kind"] + list(columns)
+        sql = f"SELECT {_quoted(cols)} FROM fits{where} ORDER BY well_id, test_date, kind"
+        rows = self.conn.execute(sql, params).fetchall()
+        df = pd.DataFrame.from_records(rows, columns=cols)
+        df[list(columns)] = df[list(columns)].astype(float)
+        df["test_date"] = pd.to_datetime(df["test_date"])
+        return df
+
+    # One column (e.g. AOF_psi) as a wells × test dates table; pass kind for
+    # wells that have both gas and oil fits
+    def trend(self, well_ids, column="AOF_psi", start=None, end=None, kind=None):
+        df = self.history(well_ids, start, end, [column], kind)
+        return df.pivot(index="test_date", columns="well_id", values=ALIASES.get(column, column))
+
+    # Stored curves of one well and kind as {test_date: (pwf, {method: rate})}
+    def curves(self, well_id, start=None, end=None, kind="gas"):
+        where, params = self._where([well_id], start, end, kind)
+        sql = f"SELECT test_date, methods, dtype, pwf, rates FROM curves{where} ORDER BY test_date"
+        out = {}
+        for date, methods, dtype, pwf, rates in self.conn.execute(sql, params):
+            pwf = decode_array(pwf, dtype)
+            rates = decode_array(rates, dtype).reshape(-1, len(pwf))
+            out[date] = (pwf, dict(zip(methods.split(","), rates)))
+        return out
+
+    def count(self, table="fits"):
+        if table not in ("fits", "curves"):
+            raise ValueError(f"unknown table: {table}")
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
@@ -0,0 +1,185 @@
+"""Sensitivity sweeps of the oil IPR over grids of reservoir and test inputs.
+
+Any of Pb, Pws, Pwf, Qwf, Pwf1, Qwf1 (second test point, used by saturated
+wells) and target (the Pwf at which rates are reported) can be a grid axis; the
+others are fixed values. The sweep covers the full Cartesian product of the
+axes but never builds it: combinations are numbered and decoded in chunks
+(np.unravel_index on a range), each chunk goes through the vectorized
+fit_oil_arrays / oil_curves (Calc_J, undersaturated1, curve_IPR_Vogel and the
+Fetkovich formulas broadcast over the chunk) and is reduced straight away to
+running aggregates:
+
+- totals per metric (valid count, mean, std, min, max and the combination
+  giving the max)
+- the conditional mean of every metric at each level of each axis (tornado)
+- the mean over the other axes on a grid of two chosen axes (heat map)
+
+Memory is bounded by max_elements whatever the grid size; chunks can run on a
+process pool. Combinations with an impossible test (Pwf >= Pws, Qwf <= 0)
+count as invalid.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ipr.oil_batch import fit_oil_arrays, oil_curves
+
+PARAMS = ("Pb", "Pws", "Pwf", "Qwf", "Pwf1", "Qwf1", "target")
+METRICS = ("AOF_vogel", "AOF_fetkovich", "AOF_constJ", "Q_vogel", "Q_fetkovich", "Q_constant_j")
+METRIC_LABELS = {"AOF_vogel": "AOF Vogel", "AOF_fetkovich": "AOF Fetkovich", "AOF_constJ": "AOF Constant J",
+                 "Q_vogel": "Q at target Pwf, Vogel", "Q_fetkovich": "Q at target Pwf, Fetkovich",
+                 "Q_constant_j": "Q at target Pwf, Constant J"}
+# arrays of about this many elements per combination are alive during a chunk
+ELEMENTS_PER_COMBINATION = 48
+
+
+# Every metric for a batch of input combinations (1-D arrays or scalars)
+def oil_metrics(Pb, Pws, Pwf, Qwf, Pwf1=np.nan, Qwf1=np.nan, target=0.0):
+    Pb, Pws, Pwf, Qwf, Pwf1, Qwf1, target = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (Pb, Pws, Pwf, Qwf, Pwf1, Qwf1, target)))
+    fit = fit_oil_arrays(Pb, Pws, Pwf, Qwf, Pwf1, Qwf1)
+    _, rates = oil_curves(fit, pwf=target[:, None])
+    valid = (Pwf < Pws) & (Qwf > 0) & (Pb > 0)
+    out = {key: fit[key] for key in ("AOF_vogel", "AOF_fetkovich", "AOF_constJ")}
+    out.update({f"Q_{m}": q[:, 0] for m, q in rates.items()})
+    return {key: np.where(valid, v, np.nan) for key, v in out.items()}
+
+
+def _empty(shape, heat_shape):
+    return {"count": 0, "sum": 0.0, "sumsq": 0.0, "min": np.inf, "max": -np.inf, "argmax": -1,
+            "levels": [(np.zeros(n), np.zeros(n)) for n in shape],
+            "heat": None if heat_shape is None else (np.zeros(heat_shape), np.zeros(heat_shape))}
+
+
+# Aggregates of the combinations start..stop-1 of the grid
+def _sweep_range(axes, fixed, heat, start, stop):
+    names = list(axes)
+    shape = tuple(len(axes[n]) for n in names)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    inputs = dict(fixed)
+    inputs.update({n: axes[n][i] for n, i in zip(names, index)})
+    with np.errstate(all="ignore"):
+        metrics = oil_metrics(**inputs)
+
+    heat_shape = None if heat is None else (shape[names.index(heat[0])], shape[names.index(heat[1])])
+    if heat is not None:
+        cell = index[names.index(heat[0])] * heat_shape[1] + index[names.index(heat[1])]
+    out = {}
+    for key, v in metrics.items():
+        agg = _empty(shape, heat_shape)
+        ok = np.isfinite(v)
+        vo = v[ok]
+        if vo.size:
+            agg.update(count=int(vo.size), sum=float(vo.sum()), sumsq=float(np.dot(vo, vo)),
+                       min=float(vo.min()), max=float(vo.max()), argmax=int(start + np.flatnonzero(ok)[vo.argmax()]))
+        agg["levels"] = [(np.bincount(i[ok], vo, n), np.bincount(i[ok], minlength=n).astype(float))
+                         for i, n in zip(index, shape)]
+        if heat is not None:
+            size = heat_shape[0] * heat_shape[1]
+            agg["heat"] = (np.bincount(cell[ok], vo, size).reshape(heat_shape),
+                           np.bincount(cell[ok], minlength=size).reshape(heat_shape).astype(float))
+        out[key] = agg
+    return out
+
+
+def _merge(total, part):
+    for key, p in part.items():
+        t = total.setdefault(key, p)
+        if t is p:
+            continue
+        if p["count"] and p["max"] > t["max"]:
+            t["argmax"] = p["argmax"]
+        t["count"] += p["count"]
+        t["sum"] += p["sum"]
+        t["sumsq"] += p["sumsq"]
+        t["min"] = min(t["min"], p["min"])
+        t["max"] = max(t["max"], p["max"])
+        t["levels"] = [(ts + ps, tc + pc) for (ts, tc), (ps, pc) in zip(t["levels"], p["levels"])]
+        if t["heat"] is not None:
+            t["heat"] = (t["heat"][0] + p["heat"][0], t["heat"][1] + p["heat"][1])
+    return total
+
+
+# Sweep the oil IPR over the product of the grid axes. axes: {param: 1-D
+# values}; fixed: {param: scalar} for the rest (Pwf1 / Qwf1 default to NaN,
+# target to 0, i.e. AOF). heat: two axis names for the heat map. workers > 0
+# runs the chunks on a process pool. Returns a dict of aggregates (see
+# sensitivity_table, tornado_table and heatmap_table).
+def oil_sweep(axes, fixed=None, heat=None, max_elements=20_000_000, workers=0):
+    axes = {name: np.asarray(values, dtype=float).ravel() for name, values in axes.items()}
+    fixed = {"Pwf1": np.nan, "Qwf1": np.nan, "target": 0.0, **(fixed or {})}
+    for name in list(axes) + list(fixed):
+        if name not in PARAMS:
+            raise ValueError(f"unknown sweep parameter: {name}")
+    fixed = {k: float(v) for k, v in fixed.items() if k not in axes}
+    missing = [p for p in PARAMS if p not in axes and p not in fixed]
+    if missing:
+        raise ValueError(f"no value or axis for: {', '.join(missing)}")
+    if heat is not None and (len(heat) != 2 or any(h not in axes for h in heat) or heat[0] == heat[1]):
+        raise ValueError("heat needs two different sweep axes")
+
+    n = int(np.prod([len(v) for v in axes.values()]))
+    step = max(1, int(max_elements // ELEMENTS_PER_COMBINATION))
+    ranges = [(start, min(start + step, n)) for start in range(0, n, step)]
+    total = {}
+    if workers == 0 or len(ranges) == 1:
+        for start, stop in ranges:
+            _merge(total, _sweep_range(axes, fixed, heat, start, stop))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_sweep_range, *zip(*[(axes, fixed, heat, a, b) for a, b in ranges])):
+                _merge(total, part)
+    return {"axes": axes, "fixed": fixed, "heat": heat, "combinations": n, "metrics": total}
+
+
+# One row per metric: valid combinations, mean, std, min, max and the inputs of the max
+def sensitivity_table(result, metrics=METRICS):
+    import pandas as pd
+
+    names = list(result["axes"])
+    shape = tuple(len(v) for v in result["axes"].values())
+    rows = []
+    for key in metrics:
+        t = result["metrics"][key]
+        count = t["count"]
+        mean = t["sum"] / count if count else np.nan
+        row = {"Metric": METRIC_LABELS[key], "Valid (%)": 100 * count / result["combinations"],
+               "Mean": mean, "Std": np.sqrt(max(t["sumsq"] / count - mean * mean, 0.0)) if count else np.nan,
+               "Min": t["min"] if count else np.nan, "Max": t["max"] if count else np.nan}
+        if count:
+            best = np.unravel_index(t["argmax"], shape)
+            row.update({f"{n} at max": result["axes"][n][i] for n, i in zip(names, best)})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+# Tornado: for each axis, the metric's mean at its lowest and highest level
+# (averaged over all other axes) and the largest swing between any two levels,
+# sorted by swing
+def tornado_table(result, metric="AOF_vogel"):
+    import pandas as pd
+
+    t = result["metrics"][metric]
+    rows = []
+    for name, (sums, counts) in zip(result["axes"], t["levels"]):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / counts
+        values = result["axes"][name]
+        rows.append({"Parameter": name, "Low": values[0], "High": values[-1],
+                     "Mean at low": means[0], "Mean at high": means[-1],
+                     "Swing": np.nanmax(means) - np.nanmin(means) if np.isfinite(means).any() else np.nan})
+    return pd.DataFrame(rows).sort_values("Swing", ascending=False, ignore_index=True)
+
+
+# Heat map of the metric's mean over the other axes: rows heat[0], columns heat[1]
+def heatmap_table(result, metric="AOF_vogel"):
+    import pandas as pd
+
+    if result["heat"] is None:
+        raise ValueError("the sweep was run without heat axes")
+    sums, counts = result["metrics"][metric]["heat"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / counts
+    rows, cols = result["heat"]
+    return pd.DataFrame(mean, index=pd.Index(result["axes"][rows], name=rows),
+                        columns=pd.Index(result["axes"][cols], name=cols))
@@ -0,0 +1,113 @@
+"""Synthetic well-test data for benchmarks and batch runs."""
+import numpy as np
+
+GAS_COLUMNS = ["Well ID", "p_wf (psia)", "ψ_wf (psi^2/cp)", "Qg (Mscf/day)"]
+
+
+# Long-format multi-well gas test table in the shape of gas_well_data.csv (+ well id).
+# Each well gets a shut-in point at Pr and (points_per_well - 1) flowing points
+# generated from an LIT pressure-squared deliverability with multiplicative noise.
+# pressure_noise adds a gauge error (psia std. deviation) to the flowing pressures.
+def gas_well_tests(n_wells, points_per_well=4, noise=0.02, seed=0, pressure_noise=0.0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    Pr = rng.uniform(1500.0, 5000.0, n_wells)
+    aof = rng.uniform(2000.0, 20000.0, n_wells)
+    turb = rng.uniform(0.2, 0.8, n_wells)       # share of Pr^2 lost to turbulence at AOF
+    b = turb * Pr**2 / aof**2
+    a = (1 - turb) * Pr**2 / aof
+    k = rng.uniform(75.0, 90.0, n_wells)          # psi ≈ k * p^2, as in the sample data
+
+    frac = np.linspace(0.0, 0.6, points_per_well)
+    pwf = Pr[:, None] * (1 - frac[None, :])
+    dp2 = Pr[:, None]**2 - pwf**2
+    qg = (-a[:, None] + np.sqrt(a[:, None]**2 + 4 * b[:, None] * dp2)) / (2 * b[:, None])
+    qg = qg * (1 + noise * rng.standard_normal(qg.shape))
+    qg[:, 0] = 0.0
+    if pressure_noise:
+        pwf[:, 1:] += pressure_noise * rng.standard_normal((n_wells, points_per_well - 1))
+    psi = k[:, None] * pwf**2
+
+    width = len(str(n_wells))
+    ids = np.array([f"W{i:0{width}d}" for i in range(n_wells)])
+    return pd.DataFrame({
+        GAS_COLUMNS[0]: np.repeat(ids, points_per_well),
+        GAS_COLUMNS[1]: np.round(pwf.ravel(), 1),
+        GAS_COLUMNS[2]: np.round(psi.ravel(), 0),
+        GAS_COLUMNS[3]: np.round(qg.ravel(), 1),
+    })
+
+
+OIL_COLUMNS = ["Well ID", "Pb (bar)", "Pws (bar)", "Pwf (bar)", "Qwf (m³/d)", "Pwf1 (bar)", "Qwf1 (m³/d)"]
+
+
+# One row per oil well in the oil page's units, about a third in each regime:
+# saturated (Pws < Pb, two Vogel test points), undersaturated with the test
+# point above Pb and undersaturated with it below Pb (one test point, Pwf1/Qwf1 NaN).
+# mix: shares of the three regimes in that order, e.g. (0.7, 0.15, 0.15).
+def oil_well_tests(n_wells, noise=0.02, seed=0, mix=None):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    if mix is None:
+        kind = rng.integers(0, 3, n_wells)
+    else:
+        kind = rng.choice(3, n_wells, p=np.asarray(mix, dtype=float) / np.sum(mix))
+    Pb = rng.uniform(100.0, 300.0, n_wells)
+    Pws = np.where(kind == 0, Pb * rng.uniform(0.5, 0.95, n_wells), Pb * rng.uniform(1.1, 2.0, n_wells))
+    J = rng.uniform(0.5, 20.0, n_wells)                   # m³/d/bar
+    Pwf = np.where(kind == 1, Pb + (Pws - Pb) * rng.uniform(0.2, 0.8, n_wells),
+                   np.where(kind == 2, Pb * rng.uniform(0.3, 0.9, n_wells),
+                            Pws * rng.uniform(0.5, 0.9, n_wells)))
+    Pwf1 = np.where(kind == 0, Pws * rng.uniform(0.1, 0.45, n_wells), np.nan)
+
+    def vogel(p):
+        return J * Pws / 1.8 * (1 - 0.2 * (p / Pws) - 0.8 * (p / Pws)**2)
+
+    Qob = J * (Pws - Pb)
+    composite = Qob + J * Pb / 1.8 * (1 - 0.2 * (Pwf / Pb) - 0.8 * (Pwf / Pb)**2)
+    Qwf = np.where(kind == 0, vogel(Pwf), np.where(kind == 1, J * (Pws - Pwf), composite))
+    Qwf1 = np.where(kind == 0, vogel(Pwf1), np.nan)
+    Qwf = Qwf * (1 + noise * rng.standard_normal(n_wells))
+    Qwf1 = Qwf1 * (1 + noise * rng.standard_normal(n_wells))
+
+    width = len(str(n_wells))
+    return pd.DataFrame({
+        OIL_COLUMNS[0]: [f"O{i:0{width}d}" for i in range(n_wells)],
+        OIL_COLUMNS[1]: np.round(Pb, 1),
+        OIL_COLUMNS[2]: np.round(Pws, 1),
+        OIL_COLUMNS[3]: np.round(Pwf, 1),
+        OIL_COLUMNS[4]: np.round(Qwf, 2),
+        OIL_COLUMNS[5]: np.round(Pwf1, 1),
+        OIL_COLUMNS[6]: np.round(Qwf1, 2),
+    })
+
+
+MULTIRATE_COLUMNS = ["Well ID", "Pws (bar)", "Pwf (bar)", "Qwf (m³/d)"]
+
+
+# Long-format multi-rate oil tests (saturated wells): points_per_well flowing
+# points per well from a Fetkovich deliverability with multiplicative noise.
+def oil_multirate_tests(n_wells, points_per_well=5, noise=0.03, seed=0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    Pws = rng.uniform(100.0, 350.0, n_wells)
+    n = rng.uniform(0.55, 1.0, n_wells)
+    aof = rng.uniform(50.0, 2000.0, n_wells)
+    C = aof / Pws**(2 * n)
+
+    frac = rng.uniform(0.1, 0.9, (n_wells, points_per_well))
+    pwf = Pws[:, None] * np.sort(frac, axis=1)[:, ::-1]
+    q = C[:, None] * (Pws[:, None]**2 - pwf**2)**n[:, None]
+    q = q * (1 + noise * rng.standard_normal(q.shape))
+
+    width = len(str(n_wells))
+    ids = np.array([f"M{i:0{width}d}" for i in range(n_wells)])
+    return pd.DataFrame({
+        MULTIRATE_COLUMNS[0]: np.repeat(ids, points_per_well),
+        MULTIRATE_COLUMNS[1]: np.repeat(np.round(Pws, 1), points_per_well),
+        MULTIRATE_COLUMNS[2]: np.round(pwf.ravel(), 1),
+        MULTIRATE_COLUMNS[3]: np.round(q.ravel(), 2),
+    })
@@ -0,0 +1,261 @@
+"""P90 / P50 / P10 uncertainty for AOFs and IPR curves.
+
+Gas wells are bootstrapped: the flowing test points of every well are
+resampled with replacement (optionally with a normally distributed error on
+Pr) and all four methods are refitted. Oil wells are sampled by Monte Carlo
+from normal errors on Pb, Pws and the test pressures and multiplicative
+errors on the rates. Either way every replicate of every well is one group of
+the batch fitters (ipr.gas_batch / ipr.oil_batch), so all replicate fits and
+curve evaluations are array operations; wells are processed in chunks sized so
+that no intermediate array exceeds max_elements.
+
+Levels follow the reserves convention: P90 is the low case (exceeded by 90 %
+of replicates), P10 the high case. Replicates whose fit fails (e.g. a resample
+with a single distinct point) are left out of the percentiles.
+"""
+import numpy as np
+
+from ipr.gas_batch import gas_curves, group_max, group_wells, lit_rate
+from ipr.oil_batch import fit_oil_arrays, oil_curves, oil_grid
+
+LEVELS = ("P90", "P50", "P10")
+PROBABILITIES = (0.10, 0.50, 0.90)
+
+GAS_AOF_KEYS = {"backpressure": "AOF_bp", "lit_pressure_squared": "AOF_lit",
+                "lit_pressure_approx": "AOF_litp", "lit_pseudopressure": "AOF_psi"}
+OIL_AOF_KEYS = {"vogel": "AOF_vogel", "fetkovich": "AOF_fetkovich", "constant_j": "AOF_constJ"}
+
+
+# Linear-interpolation quantiles along `axis` ignoring NaN (much faster than
+# np.nanpercentile on large arrays). The quantile axis goes first in the result.
+def quantiles(values, probabilities=PROBABILITIES, axis=-1):
+    values = np.sort(np.moveaxis(np.asarray(values, dtype=float), axis, -1), axis=-1)  # NaN sort last
+    count = np.sum(~np.isnan(values), axis=-1, keepdims=True)
+    last = np.maximum(count - 1, 0)
+    out = []
+    for p in probabilities:
+        pos = p * last
+        lo = np.floor(pos).astype(int)
+        hi = np.minimum(lo + 1, last)
+        v_lo = np.take_along_axis(values, lo, axis=-1)
+        v_hi = np.take_along_axis(values, hi, axis=-1)
+        out.append(np.where(count > 0, v_lo + (v_hi - v_lo) * (pos - lo), np.nan)[..., 0])
+    return np.stack(out)
+
+
+def _chunks(n_wells, per_well_elements, max_elements):
+    step = max(1, int(max_elements // max(per_well_elements, 1)))
+    for start in range(0, n_wells, step):
+        yield slice(start, min(start + step, n_wells))
+
+
+# Least-squares line from weighted sums over x centred on c: (slope, intercept);
+# NaN with fewer than two points or no spread in x
+def _line(N, Sx, Sy, Sxx, Sxy, c):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        det = N * Sxx - Sx * Sx
+        det[~(det > 1e-10 * N * Sxx)] = np.nan
+        slope = (N * Sxy - Sx * Sy) / det
+        intercept = (Sy - slope * Sx) / N - slope * c
+    return slope, intercept
+
+
+# Weighted sums of per-point features for every replicate: features (k, m, f)
+# against weights (k, m, R) as one batched matrix product; result (k, f, R)
+def _sums(features, weights):
+    return np.swapaxes(features, 1, 2) @ weights
+
+
+# Bootstrap counts: how often each of a well's n flowing points is drawn in each
+# of R resamples of size n. Shape (wells, m_max, R); slots beyond n stay 0.
+def _resample_counts(rng, n, R, m_max):
+    k = len(n)
+    draws = (rng.random((k, m_max, R)) * n[:, None, None]).astype(np.intp)
+    draws = draws * R + np.arange(R) + (np.arange(k) * m_max * R)[:, None, None]
+    live = np.broadcast_to((np.arange(m_max) < n[:, None])[..., None], draws.shape)
+    return np.bincount(draws[live], minlength=k * m_max * R).reshape(k, m_max, R).astype(float)
+
+
+# Bootstrap envelopes for a long-format gas table (flat arrays, one entry per point).
+# psi_fn (an ipr.pseudo table) replaces the ψ column as in compare_gas_methods.
+# Returns well ids, the nominal pwf grid (wells, num_points) and, per method,
+# AOF levels (wells, 3) from all replicates and curve levels (wells, 3, num_points)
+# from the first curve_replicates, in LEVELS order, plus the fraction of
+# replicates that gave a fit.
+#
+# A resample only changes how often each test point is counted, so every
+# replicate regression is a weighted one: the weighted sums of all replicates
+# are one batched matrix product of per-point features with the resample counts.
+# Pr noise enters the LIT sums linearly (through Pr², Pr and ψr); only the
+# back-pressure x = log(Pr² - Pwf²) is recomputed per replicate.
+def bootstrap_gas(well_ids, pwf, psi, qg, n_replicates=1000, num_points=20, Pr_sd=0.0,
+                  psi_fn=None, curve_replicates=1000, seed=0, max_elements=20_000_000):
+    rng = np.random.default_rng(seed)
+    ids, codes = group_wells(well_ids)
+    nw, R = len(ids), n_replicates
+    Rc = min(R, curve_replicates)
+    pwf = np.asarray(pwf, dtype=float)
+    psi = np.asarray(psi, dtype=float) if psi_fn is None else psi_fn(pwf)
+    qg = np.asarray(qg, dtype=float)
+    Pr = group_max(codes, pwf, nw)
+    psi_r = group_max(codes, psi, nw)
+
+    # flowing points of every well in a padded (wells, m_max) layout
+    flowing = (qg > 0) & (pwf < Pr[codes])
+    order = np.argsort(codes[flowing], kind="stable")
+    f_codes = codes[flowing][order]
+    n_flow = np.bincount(f_codes, minlength=nw)
+    m_max = max(int(n_flow.max(initial=0)), 1)
+    slot = np.arange(len(f_codes)) - np.concatenate([[0], np.cumsum(n_flow)[:-1]])[f_codes]
+    P, PSI, Q = np.zeros((nw, m_max)), np.zeros((nw, m_max)), np.ones((nw, m_max))
+    for dense, values in ((P, pwf), (PSI, psi), (Q, qg)):
+        dense[f_codes, slot] = values[flowing][order]
+    live = np.arange(m_max) < n_flow[:, None]
+    n_safe = np.maximum(n_flow, 1)
+
+    # per-point features; x = Qg centred per well for the three LIT fits
+    cq = np.sum(Q * live, axis=1) / n_safe
+    xc = Q - cq[:, None]
+    lit_features = np.stack([np.ones_like(Q), xc, xc**2, 1 / Q, xc / Q,
+                             P**2 / Q, xc * P**2 / Q, P / Q, xc * P / Q,
+                             PSI / Q, xc * PSI / Q], axis=-1) * live[..., None]
+    log_q = np.log(Q) * live
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bp_x = np.log(np.where(live, Pr[:, None]**2 - P**2, 1.0))
+    bp_centre = np.sum(bp_x * live, axis=1) / n_safe
+    bp_x = (bp_x - bp_centre[:, None]) * live
+    bp_features = np.stack([bp_x, log_q, bp_x**2, bp_x * log_q], axis=-1)
+
+    grid = Pr[:, None] * np.linspace(1.0, 0.0, num_points)[None, :]
+    aof = {method: np.full((nw, 3), np.nan) for method in GAS_AOF_KEYS}
+    curves = {method: np.full((nw, 3, num_points), np.nan) for method in GAS_AOF_KEYS}
+    valid = {method: np.zeros(nw) for method in GAS_AOF_KEYS}
+
+    per_well = R * (m_max + 16) + Rc * num_points * 4
+    for chunk in _chunks(nw, per_well, max_elements):
+        k = chunk.stop - chunk.start
+        W = _resample_counts(rng, n_flow[chunk], R, m_max)      # (k, m_max, R)
+        Pr_g = np.broadcast_to(Pr[chunk, None], (k, R))
+        if Pr_sd:
+            Pr_g = Pr_g + Pr_sd * rng.standard_normal((k, R))
+        if psi_fn is None:
+            psi_g = psi_r[chunk, None] * (Pr_g / Pr[chunk, None])**2
+        else:
+            psi_g = psi_fn(Pr_g)
+        p, ps = P[chunk][..., None], PSI[chunk][..., None]
+
+        # points above a replicate's Pr (or ψr) drop out, as in the page's masks
+        W_p = W * (p < Pr_g[:, None, :]) if Pr_sd else W
+        W_psi = W * (ps < psi_g[:, None, :])
+        S = _sums(lit_features[chunk], W_p)                  # (k, features, R)
+        T = _sums(lit_features[chunk][:, :, [0, 1, 2, 3, 4, 9, 10]], W_psi)
+        c = cq[chunk, None]
+        Pr2 = Pr_g**2
+
+        fit = {"Pr": Pr_g, "psi_r": psi_g}
+        N, Sx, Sxx = S[:, 0], S[:, 1], S[:, 2]
+        fit["b"], fit["a"] = _line(N, Sx, Pr2 * S[:, 3] - S[:, 5], Sxx, Pr2 * S[:, 4] - S[:, 6], c)
+        fit["b1"], fit["a1"] = _line(N, Sx, Pr_g * S[:, 3] - S[:, 7], Sxx, Pr_g * S[:, 4] - S[:, 8], c)
+        fit["b2"], fit["a2"] = _line(T[:, 0], T[:, 1], psi_g * T[:, 3] - T[:, 5], T[:, 2],
+                                     psi_g * T[:, 4] - T[:, 6], c)
+
+        # back-pressure: log Qg against log(Pr² - Pwf²), x centred on the nominal mean
+        cx = bp_centre[chunk, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if Pr_sd:
+                lx = np.log(np.where(W_p > 0, Pr2[:, None, :] - p**2, 1.0)) - cx[..., None]
+                ly = log_q[chunk][..., None]
+                sums = [np.sum(W_p * f, axis=1) for f in (lx, ly, lx * lx, lx * ly)]
+            else:
+                U = _sums(bp_features[chunk], W)
+                sums = [U[:, j] for j in range(4)]
+            fit["n"], logC = _line(N, *sums, cx)
+            fit["C"] = np.exp(logC)
+            fit["AOF_bp"] = fit["C"] * Pr2**fit["n"]
+        fit["AOF_lit"] = lit_rate(fit["a"], fit["b"], Pr2)
+        fit["AOF_litp"] = lit_rate(fit["a1"], fit["b1"], Pr_g)
+        fit["AOF_psi"] = lit_rate(fit["a2"], fit["b2"], psi_g)
+
+        # curves of the first Rc replicates on the nominal grid
+        sub = {key: np.broadcast_to(v, (k, R))[:, :Rc].ravel() for key, v in fit.items()}
+        _, rates = gas_curves(sub, psi_fn=psi_fn, pwf=np.repeat(grid[chunk], Rc, axis=0))
+
+        for method, key in GAS_AOF_KEYS.items():
+            a = np.array(fit[key], dtype=float)
+            a[~np.isfinite(a)] = np.nan
+            valid[method][chunk] = np.mean(~np.isnan(a), axis=1)
+            aof[method][chunk] = quantiles(a, axis=1).T
+            q = rates[method].reshape(k, Rc, num_points)
+            q[np.isnan(a[:, :Rc])] = np.nan
+            curves[method][chunk] = np.moveaxis(quantiles(q, axis=1), 0, 1)
+
+    return {"well_id": ids, "pwf": grid, "aof": aof, "curves": curves, "valid": valid}
+
+
+# Monte Carlo envelopes for oil wells (arrays with one entry per well, as for
+# fit_oil_arrays). sd: absolute standard deviations for any of "Pb", "Pws",
+# "Pwf", "Pwf1"; rate_cv: relative standard deviation of Qwf / Qwf1. Every
+# replicate is one row of the batch oil fit, so a replicate may land in a
+# different regime than the nominal well (the share per regime is returned).
+# Curves of the first curve_replicates are evaluated on each well's nominal oil_grid().
+def monte_carlo_oil(Pb, Pws, Pwf, Qwf, Pwf1=np.nan, Qwf1=np.nan, sd=None, rate_cv=0.0,
+                    n_replicates=1000, num_points=10, curve_replicates=1000, seed=0,
+                    max_elements=20_000_000):
+    rng = np.random.default_rng(seed)
+    inputs = dict(zip(("Pb", "Pws", "Pwf", "Qwf", "Pwf1", "Qwf1"),
+                      np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float))
+                                            for v in (Pb, Pws, Pwf, Qwf, Pwf1, Qwf1)))))
+    sd = sd or {}
+    nw, R = len(inputs["Pb"]), n_replicates
+    Rc = min(R, curve_replicates)
+    grid = oil_grid(fit_oil_arrays(**inputs), num_points)
+    n_pts = grid.shape[1]
+
+    aof = {method: np.full((nw, 3), np.nan) for method in OIL_AOF_KEYS}
+    curves = {method: np.full((nw, 3, n_pts), np.nan) for method in OIL_AOF_KEYS}
+    valid = {method: np.zeros(nw) for method in OIL_AOF_KEYS}
+    regimes = np.zeros((nw, 3))
+
+    for chunk in _chunks(nw, R * 24 + Rc * n_pts * 4, max_elements):
+        k = chunk.stop - chunk.start
+        sample = {}
+        for name, value in inputs.items():
+            v = np.repeat(value[chunk], R)
+            if name in ("Qwf", "Qwf1"):
+                v = v * (1 + rate_cv * rng.standard_normal(k * R)) if rate_cv else v
+            elif sd.get(name):
+                v = v + sd[name] * rng.standard_normal(k * R)
+            sample[name] = v
+        fit = fit_oil_arrays(**sample)
+        regime = fit["regime"].reshape(k, R)
+        regimes[chunk] = np.stack([np.mean(regime == r, axis=1) for r in range(3)], axis=1)
+
+        # curves of the first Rc replicates on the nominal grid
+        sub = {key: v.reshape(k, R)[:, :Rc].ravel() for key, v in fit.items()}
+        _, rates = oil_curves(sub, pwf=np.repeat(grid[chunk], Rc, axis=0))
+
+        for method, key in OIL_AOF_KEYS.items():
+            a = fit[key].reshape(k, R)
+            a[~np.isfinite(a) | (a < 0)] = np.nan
+            valid[method][chunk] = np.mean(~np.isnan(a), axis=1)
+            aof[method][chunk] = quantiles(a, axis=1).T
+            q = rates[method].reshape(k, Rc, n_pts)
+            q[np.isnan(a[:, :Rc])] = np.nan
+            curves[method][chunk] = np.moveaxis(quantiles(q, axis=1), 0, 1)
+
+    return {"pwf": grid, "aof": aof, "curves": curves, "valid": valid, "regimes": regimes}
+
+
+# AOF levels of one well as a table: one row per method, P90 / P50 / P10 columns
+def aof_table(result, labels, well=0, unit=""):
+    import pandas as pd
+
+    df = pd.DataFrame({
+        "Method": list(labels.values()),
+        **{f"{level}{unit}": [round(float(result["aof"][m][well][i]), 2) for m in labels]
+           for i, level in enumerate(LEVELS)},
+        "Valid replicates (%)": [round(100 * float(result["valid"][m][well]), 1) for m in labels],
+    })
+    df.index = df.index + 1
+    df.index.name = "S.No."
+    return df
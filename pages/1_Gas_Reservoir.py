@@ -1,9 +1,18 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import linregress
 import pandas as pd
 
+from ipr import columnar, profiling, reader
+from ipr.cache import content_hash, default_cache
+from ipr.gas_batch import fit_gas_arrays, gas_curves
+from ipr.graph import gas_page_graph
+from ipr.pseudo import pseudo_pressure_table
+from ipr.store import ResultStore, default_store_path
+from ipr.uncertainty import aof_table
+from ipr.plots import default_renderer, plotly_figure, use_plotly
+
+WELL_COL = "Well ID"
+PAGE_SIZE = 50
+
 st.page_link("Homepage.py", label="Go back to Homepage")
 st.title("Gas Reservoir")
 
@@ -12,25 +21,126 @@ st.subheader("Gas Inflow Performance Relationship : ")
 
 # Load sample data from local CSV
 def load_sample_data():
-    return pd.read_csv("./gas_well_data.csv")   # apne folder me sample_data.csv rakhna
+    with profiling.stage("read_csv"):
+        return pd.read_csv("./gas_well_data.csv")   # apne folder me sample_data.csv rakhna
+
+
+# Interactive Plotly chart for many curves, otherwise the PNG rendered in the background
+def show_chart(spec, future=None):
+    if use_plotly(spec):
+        with profiling.stage("plotly_chart"):
+            st.plotly_chart(plotly_figure(spec), use_container_width=True)
+    else:
+        with profiling.stage("plot_wait"):
+            image = (future or default_renderer().submit(spec)).result()
+        st.image(image)
+
+
+def show_render_timings():
+    for name, t in default_renderer().timing_summary().items():
+        st.sidebar.caption(f"Plot {name}: {t['renders']} renders (p50 {t['p50_ms']:.0f} ms, "
+                           f"max {t['max_ms']:.0f} ms), {t['cache_hits']} cached")
+
+
+# Stage timings of this run plus Prometheus / JSON exports of the process totals
+def show_diagnostics(run):
+    if not run.enabled:
+        return
+    with st.expander(f"Diagnostics ({run.seconds * 1e3:.0f} ms)"):
+        st.dataframe(run.frame(), hide_index=True)
+        st.caption("Charts render on a background thread; see render_bytes in the exports.")
+        col1, col2 = st.columns(2)
+        col1.download_button("Metrics (Prometheus)", profiling.prometheus_text(), "ipr_metrics.prom", "text/plain")
+        col2.download_button("Run log (JSON)", run.to_json(), "ipr_run.json", "application/json")
+
+
+# The page's computation graph, kept for the session
+def session_graph():
+    if "gas_graph" not in st.session_state:
+        st.session_state["gas_graph"] = gas_page_graph()
+    return st.session_state["gas_graph"].begin()
+
+
+# Page selector for large tables; returns the 0-based page to show
+def select_page(label, n_rows, key):
+    pages = max(1, -(-n_rows // PAGE_SIZE))
+    if pages == 1:
+        return 0
+    return st.number_input(f"{label} page (1-{pages}):", 1, pages, 1, key=key) - 1
+
+
+# Reader result for the upload, cached by the hash of its bytes: reruns (and
+# other sessions with the same file) reuse it instead of rescanning the file
+def from_upload(fn, input_file, *args):
+    if st.session_state.get("upload_id") != input_file.file_id:
+        st.session_state["upload_id"] = input_file.file_id
+        st.session_state["upload_hash"] = content_hash(input_file.getvalue())
+    cache = default_cache()
+    key = content_hash(fn, st.session_state["upload_hash"], args)
+    value = cache.get(key)
+    if value is None:
+        value = fn(input_file, *args)
+        cache.put(key, value)
+    return value
+
+
+# First chunk of a file without a well id column (one well); larger files
+# need a well id column so they can be streamed
+def read_single_well(input_file):
+    chunks = reader.iter_chunks(input_file, WELL_COL)
+    data = next(chunks)
+    if next(chunks, None) is not None:
+        raise ValueError(f"files over {reader.DEFAULT_CHUNKSIZE:,} rows need a '{WELL_COL}' column")
+    return data.reset_index(drop=True)
+
+
+# Multi-well upload: streamed fit of every well, then one well for the detailed analysis
+def select_well(input_file):
+    fit = from_upload(reader.fit_gas_file, input_file, WELL_COL)
+    summary = pd.DataFrame({
+        WELL_COL: fit["well_id"],
+        "Pr (psia)": fit["Pr"],
+        "AOF Back-Pressure": fit["AOF_bp"],
+        "AOF LIT Pressure²": fit["AOF_lit"],
+        "AOF LIT Pressure Approx": fit["AOF_litp"],
+        "AOF Pseudo-pressure": fit["AOF_psi"],
+    }).round(2)
+    summary.index = summary.index + 1
+    summary.index.name = "S.No."
+    st.write(f"### Field Summary ({len(summary)} wells)")
+    page = select_page("Summary", len(summary), "summary_page")
+    st.dataframe(summary.iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE])
+
+    well_id = st.selectbox("Well for detailed analysis:", fit["well_id"])
+    return from_upload(reader.read_well, input_file, well_id, WELL_COL)
 
 
 # Function to collect input data
 def collect_data():
-    st.header("Upload CSV File or Use Sample Data:")
-    option = st.radio("Choose Data Source:", ["Upload CSV", "Use Sample Data"])
+    st.header("Upload CSV / Parquet / Arrow File or Use Sample Data:")
+    option = st.radio("Choose Data Source:", ["Upload File", "Use Sample Data"])
 
     data = None
-    if option == "Upload CSV":
-        input_file = st.file_uploader("Upload File:", type=["csv"])
+    if option == "Upload File":
+        input_file = st.file_uploader("Upload File:", type=["csv", "parquet", "arrow", "feather"])
         if input_file is not None:
-            df = pd.read_csv(input_file)
-            data = pd.DataFrame(df)
-            data.reset_index(drop=True, inplace=True)
+            # large uploads are streamed; only one page of rows is rendered
+            n_rows = from_upload(reader.count_rows, input_file)
+            st.write(f"Uploaded Data ({n_rows} rows):")
+            page = select_page("Preview", n_rows, "preview_page")
+            st.dataframe(from_upload(reader.read_preview, input_file, page, PAGE_SIZE))
+
+            if WELL_COL in from_upload(reader.read_header, input_file):
+                data = select_well(input_file)
+            else:
+                try:
+                    data = from_upload(read_single_well, input_file)
+                except ValueError as exc:
+                    st.error(f"❌ {exc}")
+                    return None
+            data = data.copy()          # the cached frame is shared
             data.index = data.index + 1
             data.index.name = "S.No."
-            st.write("Uploaded Data:")
-            st.dataframe(data)
 
     else:
         data = load_sample_data()
@@ -42,195 +152,101 @@ def collect_data():
     return data
 
 
-# 1. Simplified Backpressure
-def simplified_backpressure(data):
-    Pwf = data.iloc[:, 0].values
-    Qg = data.iloc[:, 2].values
-    Pr = max(Pwf)
-
-    dp2 = (Pr**2 - Pwf**2)
-    mask = (Qg > 0) & (dp2 > 0)
-
-    log_dp2 = np.log(dp2[mask])
-    log_Qg = np.log(Qg[mask])
-    slope, intercept, _, _, _ = linregress(log_dp2, log_Qg)
-    n = slope
-    C = np.exp(intercept)
-
-    pwf_range = np.linspace(Pr, 0, 20)
-    Qg_pred = C * (Pr**2 - pwf_range**2)**n
-    AOF = Qg_pred[-1]
-
-    result_df = pd.DataFrame({
-        "Pwf (psia)": np.round(pwf_range, 2),
-        "Qg (Backpressure) (Mscf/day)": np.round(Qg_pred, 2)
-    })
-
-    return pwf_range, Qg_pred, AOF, C, n, result_df
-
-
-# 2. LIT Pressure-Squared
-def lit_pressure_squared(data):
-    Pwf = data.iloc[:, 0].values
-    Qg = data.iloc[:, 2].values
-    Pr = max(Pwf)
-
-    dp2 = (Pr**2 - Pwf**2)
-    mask = (Qg > 0) & (dp2 > 0)
-
-    X = Qg[mask]
-    Y = dp2[mask] / Qg[mask]
-    slope, intercept, _, _, _ = linregress(X, Y)
-    a, b = intercept, slope
-
-    pwf_range = np.linspace(Pr, 0, 20)
-    dp2_range = Pr**2 - pwf_range**2
-
-    Qg_pred = (-a + np.sqrt(a**2 + 4*b*dp2_range)) / (2*b)
-    AOF = Qg_pred[-1]
-
-    result_df = pd.DataFrame({
-        "Pwf (psia)": np.round(pwf_range, 2),
-        "Qg (LIT-Pressure²) (Mscf/day)": np.round(Qg_pred, 2)
-    })
-
-    return pwf_range, Qg_pred, AOF, a, b, result_df
-
-
-# 3. LIT Pressure-Approximation
-def lit_pressure_approx(data):
-    Pwf = data.iloc[:, 0].values
-    Qg = data.iloc[:, 2].values
-    Pr = max(Pwf)
-
-    dP = (Pr - Pwf)
-    mask = (Qg > 0) & (dP > 0)
-
-    X = Qg[mask]
-    Y = dP[mask] / Qg[mask]
-    slope, intercept, _, _, _ = linregress(X, Y)
-    a1, b1 = intercept, slope
-
-    pwf_range = np.linspace(Pr, 0, 20)
-    dp_range = Pr - pwf_range
-
-    Qg_pred = (-a1 + np.sqrt(a1**2 + 4*b1*dp_range)) / (2*b1)
-    AOF = Qg_pred[-1]
-
-    result_df = pd.DataFrame({
-        "Pwf (psia)": np.round(pwf_range, 2),
-        "Qg (LIT-Pressure Approx) (Mscf/day)": np.round(Qg_pred, 2)
-    })
-
-    return pwf_range, Qg_pred, AOF, a1, b1, result_df
-
-
-# 4. LIT Pseudopressure Method
-def lit_pseudopressure(data):
-    Pwf = data.iloc[:, 0].values     # flowing pressure
-    mp = data.iloc[:, 1].values      # pseudopressure m(p)
-    Qg = data.iloc[:, 2].values      # gas rate
-
-    psi_r = np.max(mp)
-    k = psi_r / (np.max(Pwf) ** 2)
-
-    pwf_range = np.linspace(np.max(Pwf), 0, 20)
-    mp_range = k * (pwf_range ** 2)
-
-    dpsi = psi_r - mp
-    mask = (Qg > 0) & (dpsi > 0)
-
-    X = Qg[mask]
-    Y = dpsi[mask] / Qg[mask]
-    slope, intercept, _, _, _ = linregress(X, Y)
-    a2, b2 = intercept, slope
-
-    dpsi_range = psi_r - mp_range
-    Qg_pred = (-a2 + np.sqrt(a2**2 + 4 * b2 * dpsi_range)) / (2 * b2)
-    AOF = Qg_pred[-1]
-
-    result_df = pd.DataFrame({
-        "Pwf (psia)": np.round(pwf_range, 2),
-        "m(p)": np.round(mp_range, 2),
-        "Qg (Pseudo-pressure) (Mscf/day)": np.round(Qg_pred, 2)
-    })
-
-    return pwf_range, Qg_pred, AOF, a2, b2, result_df
-
-
 def main():
     data = collect_data()
 
     if data is not None and not data.empty:
+        num_points = st.sidebar.number_input("Curve points:", 5, 20000, 20, step=5)
+        psi_fn = None
+        if st.sidebar.checkbox("Compute ψ from gas gravity and temperature"):
+            gravity = st.sidebar.number_input("Gas gravity (air = 1):", 0.55, 1.5, 0.65, step=0.01)
+            temperature = st.sidebar.number_input("Reservoir temperature (°F):", 60.0, 400.0, 200.0, step=5.0)
+            psi_fn = pseudo_pressure_table(gravity, temperature)
+        bootstrap = None
+        if st.sidebar.checkbox("Uncertainty bands (bootstrap)"):
+            replicates = st.sidebar.number_input("Bootstrap replicates:", 100, 100000, 2000, step=100)
+            Pr_sd = st.sidebar.number_input("Pr std. deviation (psia):", 0.0, 1000.0, 0.0, step=5.0)
+            bootstrap = (replicates, Pr_sd)
+        # only the nodes downstream of a changed input are recomputed on a rerun
+        graph = session_graph().update(data=data, num_points=num_points, psi_fn=psi_fn, bootstrap=bootstrap)
+        try:
+            results = graph.get("results")
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        result_df, error_df = graph.get("tables")
+        uncertainty = graph.get("uncertainty")
+        # start the chart render while the text and tables are written
+        chart = graph.get("chart")
+        future = None if use_plotly(chart) else default_renderer().submit(chart)
+
         # Methods
-        pwf_bp, qg_bp, AOF_bp, C, n, df_bp = simplified_backpressure(data)
+        _, _, AOF_bp, C, n, _ = results["backpressure"]
         st.write("### Simplified Backpressure Method")
         st.latex(rf"Q_g = {C:.3e} \cdot (P_r^2 - P_{{wf}}^2)^{{{n:.3f}}}")
         st.write(f"**AOF (Back-Pressure): {AOF_bp:.2f} Mscf/day**")
 
-        pwf_lit, qg_lit, AOF_lit, a, b, df_lit = lit_pressure_squared(data)
+        _, _, AOF_lit, a, b, _ = results["lit_pressure_squared"]
         st.write("### LIT Pressure-Squared Method")
         st.latex(rf"(P_r^2 - P_{{wf}}^2) = {a:.2f} Q_g + {b:.5f} Q_g^2")
         st.write(f"**AOF (LIT-Pressure²): {AOF_lit:.2f} Mscf/day**")
 
-        pwf_litp, qg_litp, AOF_litp, a1, b1, df_litp = lit_pressure_approx(data)
+        _, _, AOF_litp, a1, b1, _ = results["lit_pressure_approx"]
         st.write("### LIT Pressure-Approximation Method")
         st.latex(rf"(P_r - P_{{wf}}) = {a1:.4f} Q_g + {b1:.5f} Q_g^2")
         st.write(f"**AOF (LIT-Pressure Approx): {AOF_litp:.2f} Mscf/day**")
 
-        pwf_psi, qg_psi, AOF_psi, a2, b2, df_psi = lit_pseudopressure(data)
+        _, _, AOF_psi, a2, b2, _ = results["lit_pseudopressure"]
         st.write("### LIT Pseudopressure Method")
         st.latex(rf"(\psi_r - \psi_{{wf}}) = {a2:.2f} Q_g + {b2:.4f} Q_g^2")
         st.write(f"**AOF (Pseudo-pressure): {AOF_psi:.2f} Mscf/day**")
 
-        # Comparison Table
-        result_df = pd.concat([
-            df_bp,
-            df_lit["Qg (LIT-Pressure²) (Mscf/day)"],
-            df_litp["Qg (LIT-Pressure Approx) (Mscf/day)"],
-            df_psi["Qg (Pseudo-pressure) (Mscf/day)"]
-        ], axis=1)
-        result_df.reset_index(drop=True, inplace=True)
-        result_df.index = result_df.index + 1
-        result_df.index.name = "S.No."
-
         st.write("### IPR Values Table (Comparison of 4 Methods)")
         st.dataframe(result_df)
 
-        # Error Table (compared with pseudo-pressure)
-        error_df = pd.DataFrame({
-            "Method": ["Back-Pressure", "LIT Pressure²", "LIT Pressure Approx"],
-            "Error (%)": [
-                  round(np.mean(np.abs((df_bp["Qg (Backpressure) (Mscf/day)"] - df_psi["Qg (Pseudo-pressure) (Mscf/day)"]) / df_psi["Qg (Pseudo-pressure) (Mscf/day)"]) * 100)),
-                  round(np.mean(np.abs((df_lit["Qg (LIT-Pressure²) (Mscf/day)"] - df_psi["Qg (Pseudo-pressure) (Mscf/day)"]) / df_psi["Qg (Pseudo-pressure) (Mscf/day)"]) * 100)),
-                  round(np.mean(np.abs((df_litp["Qg (LIT-Pressure Approx) (Mscf/day)"] - df_psi["Qg (Pseudo-pressure) (Mscf/day)"]) / df_psi["Qg (Pseudo-pressure) (Mscf/day)"]) * 100))
-            ]
-        })
-        error_df.reset_index(drop=True, inplace=True)
-        error_df.index = error_df.index + 1
-        error_df.index.name = "S.No."
-
         st.write("### Error Table (Compared with Pseudo-pressure Method)")
         st.dataframe(error_df)
 
+        if uncertainty is not None:
+            st.write("### AOF Uncertainty (Bootstrap of Test Points)")
+            st.dataframe(aof_table(uncertainty, {
+                "backpressure": "Back-Pressure", "lit_pressure_squared": "LIT Pressure²",
+                "lit_pressure_approx": "LIT Pressure Approx", "lit_pseudopressure": "Pseudo-pressure",
+            }, unit=" (Mscf/day)"))
+
+        col1, col2 = st.columns(2)
+        col1.download_button("Download IPR table (Parquet)", columnar.to_bytes(result_df.reset_index()),
+                             "gas_ipr.parquet", "application/octet-stream")
+        col2.download_button("Download error table (Parquet)", columnar.to_bytes(error_df.reset_index()),
+                             "gas_ipr_errors.parquet", "application/octet-stream")
+
+        with st.expander("Save to results store"):
+            well_id = st.text_input("Well ID:", "Well-1", key="store_well")
+            test_date = st.date_input("Test date:", key="store_date")
+            if st.button("Save fit and curves"):
+                pwf = data.iloc[:, 0].to_numpy(float)
+                psi = data.iloc[:, 1].to_numpy(float) if psi_fn is None else psi_fn(pwf)
+                fit = fit_gas_arrays([well_id] * len(data), pwf, psi, data.iloc[:, 2].to_numpy(float))
+                grid, rates = gas_curves(fit, num_points, psi_fn)
+                with ResultStore(default_store_path()) as store:
+                    store.upsert_fits(fit, test_date, "gas")
+                    store.upsert_curves(fit["well_id"], test_date, grid, rates)
+                st.success(f"Saved {well_id} ({test_date}) to {default_store_path()}")
+
         # Plot
-        fig, ax = plt.subplots()
-        ax.plot(qg_bp, pwf_bp, "-o", label="Back-Pressure")
-        ax.plot(qg_lit, pwf_lit, "-s", label="LIT Pressure²")
-        ax.plot(qg_litp, pwf_litp, "-^", label="LIT Pressure Approx")
-        ax.plot(qg_psi, pwf_psi, "-d", label="Pseudo-pressure")
-        ax.set_xlabel("Qg (Mscf/day)")
-        ax.set_ylabel("Pwf or Ψwf")
-        ax.set_title("Gas IPR Comparison (4 Methods)")
-        ax.grid(True, linestyle="--", alpha=0.5)
-        ax.legend()
-        plt.xlim(left=0)
-        plt.ylim(bottom=0)
-        st.pyplot(fig)
+        show_chart(chart, future)
+        show_render_timings()
+        stats = default_cache().stats()
+        st.sidebar.caption(f"Result cache: {stats['hits'] + stats['disk_hits']} hits, "
+                           f"{stats['misses']} misses, {stats['entries']} entries")
+        st.sidebar.caption(f"Recomputed {len(graph.recomputed)} of {len(graph.nodes)} steps")
 
     else:
         st.write("No data provided.")
 
 
 if __name__ == "__main__":
-    main()
+    diagnostics = st.sidebar.checkbox("Diagnostics panel", profiling.ENABLED)
+    with profiling.page_run("gas_reservoir", diagnostics) as run:
+        main()
+    show_diagnostics(run)
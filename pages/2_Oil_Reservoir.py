@@ -1,9 +1,22 @@
-import streamlit as st
+import os
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import minimize
+import streamlit as st
 import pandas as pd
 
+from ipr import profiling
+from ipr.cache import default_cache
+from ipr.commingled import commingled_aof, commingled_curves, oil_layers, static_pressure
+from ipr.graph import oil_page_graph
+from ipr.oil_batch import fit_oil_arrays, oil_curves
+from ipr.store import ResultStore, default_store_path
+from ipr.sweep import METRIC_LABELS, METRICS, heatmap_table, oil_sweep, sensitivity_table, tornado_table
+from ipr.uncertainty import aof_table
+from ipr.plots import commingled_chart, default_renderer, heatmap_figure, plotly_figure, tornado_figure, use_plotly
+
+# Largest sweep a session may run; sweeps run in the page's script thread
+SWEEP_MAX_COMBINATIONS = int(os.environ.get("IPR_SWEEP_MAX_COMBINATIONS", 5_000_000))
+
 if st.button("Go back to Homepage"):
    st.switch_page("Homepage.py")
 
@@ -44,45 +57,126 @@ def collect_data():
   }])
   return data
 
-def generate_pressure_points(Pws,end, num_points=10):
-    return np.linspace(Pws, end, num_points).tolist()
-
 st.divider()
 
-#Get Q_max:
-def return_Qmax(Qwf,Pwf,Pws):
-   Qmax=(Qwf/(1 - 0.2 * (Pwf / Pws) - 0.8 * (Pwf / Pws)**2))
-   return Qmax
-
-# Vogel IPR curve equation:
-def curve_IPR_Vogel(Pwf, Pws, Qmax):
-    return Qmax * (1 - 0.2 * (Pwf / Pws) - 0.8 * (Pwf / Pws)**2)
-
-#Find Productivity Index: 
-def Productivity_Index(Qwf,Pws,Pwf):
-    J=(Qwf/(Pws-Pwf))
-    return J
-# Constant J approach IPR curve equation:
-def curve_IPR_constJ(J,Pws,Pwf):
-    return J*(Pws-Pwf)
-
-def undersaturated1(Qob,J,Pb,Pwf):
-    Q=Qob+(((J*Pb)/1.8)*(1 - 0.2 * (Pwf / Pb) - 0.8 * (Pwf / Pb)**2))
-    return Q
+# Interactive Plotly chart for many curves, otherwise the PNG rendered in the background
+def show_chart(spec, future=None):
+    if use_plotly(spec):
+        with profiling.stage("plotly_chart"):
+            st.plotly_chart(plotly_figure(spec), use_container_width=True)
+    else:
+        with profiling.stage("plot_wait"):
+            image = (future or default_renderer().submit(spec)).result()
+        st.image(image)
 
-def Calc_J(Qwf,Pws,Pb,Pwf):
-    J=Qwf/((Pws-Pb)+((Pb/1.8)*(1 - 0.2 * (Pwf / Pb) - 0.8 * (Pwf / Pb)**2)))
-    return J
 
-#Function for Fekovich (ISME IMPROVEMENT KR SKTE H -WITH LINEAR REGRESSION ON BEST FIT LINE ON 4 DATA INPUTS POINTS)
-def fetkovich(Pwf,Qwf,Pwf1,Qwf1,Pws):
-    n=float(np.log(Qwf1/Qwf)/np.log((Pws**2-Pwf1**2)/(Pws**2-Pwf**2)))
-    c=(Qwf/((Pws**2-Pwf**2)**n))
-    return n,c
+def show_render_timings():
+    for name, t in default_renderer().timing_summary().items():
+        st.sidebar.caption(f"Plot {name}: {t['renders']} renders (p50 {t['p50_ms']:.0f} ms, "
+                           f"max {t['max_ms']:.0f} ms), {t['cache_hits']} cached")
 
-#Fetkvich ka Q ka function h:
-def curve_fetkovich(n,c,Pwf,Pws):
-    return c*((Pws**2-Pwf**2)**n)
+# Stage timings of this run plus Prometheus / JSON exports of the process totals
+def show_diagnostics(run):
+    if not run.enabled:
+        return
+    with st.expander(f"Diagnostics ({run.seconds * 1e3:.0f} ms)"):
+        st.dataframe(run.frame(), hide_index=True)
+        st.caption("Charts render on a background thread; see render_bytes in the exports.")
+        col1, col2 = st.columns(2)
+        col1.download_button("Metrics (Prometheus)", profiling.prometheus_text(), "ipr_metrics.prom", "text/plain")
+        col2.download_button("Run log (JSON)", run.to_json(), "ipr_run.json", "application/json")
+
+def show_uncertainty(uncertainty, labels):
+    if uncertainty is None:
+        return
+    st.subheader("AOF Uncertainty (Monte Carlo)")
+    regimes = uncertainty["regimes"][0]
+    if regimes.max() < 1:
+        st.caption(f"Replicates by regime: saturated {regimes[0]:.0%}, undersaturated with test above Pb "
+                   f"{regimes[1]:.0%}, below Pb {regimes[2]:.0%}")
+    st.dataframe(aof_table(uncertainty, labels, unit=" (m³/d)"))
+
+# The page's computation graph, kept for the session
+def session_graph():
+    if "oil_graph" not in st.session_state:
+        st.session_state["oil_graph"] = oil_page_graph()
+    return st.session_state["oil_graph"].begin()
+
+def save_to_store(Pb, Pws, Pwf, Qwf, second, num_points):
+    with st.expander("Save to results store"):
+        well_id = st.text_input("Well ID:", "Well-1", key="store_well")
+        test_date = st.date_input("Test date:", key="store_date")
+        if st.button("Save fit and curves"):
+            fit = fit_oil_arrays([Pb], [Pws], [Pwf], [Qwf], *second)
+            fit["well_id"] = [well_id]
+            grid, rates = oil_curves(fit, num_points)
+            with ResultStore(default_store_path()) as store:
+                store.upsert_fits(fit, test_date, "oil")
+                store.upsert_curves(fit["well_id"], test_date, grid, rates, "oil")
+            st.success(f"Saved {well_id} ({test_date}) to {default_store_path()}")
+
+# Grid sweep around the entered well: AOF / Q sensitivities, tornado and heat map
+def sensitivity_sweep(Pb, Pws, Pwf, Qwf, second):
+    with st.expander("Sensitivity sweep"):
+        spread = st.slider("Range around the entered values (±%):", 5, 90, 30, key="sweep_spread") / 100
+        col1, col2, col3 = st.columns(3)
+        steps = {"Pb": col1.number_input("Pb steps:", 2, 2000, 50, key="sweep_pb"),
+                 "Pws": col2.number_input("Pws steps:", 2, 2000, 50, key="sweep_pws"),
+                 "Qwf": col3.number_input("Rate steps:", 2, 100000, 100, key="sweep_q")}
+        target = st.number_input("Target Pwf for Q (bar):", 0.0, float(Pws), float(Pwf) / 2, key="sweep_target")
+        workers = st.number_input("Worker processes (0 = in this process):", 0, os.cpu_count() or 1, 0,
+                                  key="sweep_workers")
+        total = int(np.prod(list(steps.values())))
+        if total > SWEEP_MAX_COMBINATIONS:
+            st.warning(f"⚠️ {total:,} combinations is more than this server runs per sweep "
+                       f"({SWEEP_MAX_COMBINATIONS:,}); reduce the steps.")
+            return
+        if not st.checkbox(f"Run sweep ({total:,} combinations)", key="sweep_run"):
+            return
+        centre = {"Pb": Pb, "Pws": Pws, "Qwf": Qwf}
+        axes = {k: np.linspace(v * (1 - spread), v * (1 + spread), steps[k]) for k, v in centre.items()}
+        fixed = {"Pwf": Pwf, "Pwf1": second[0], "Qwf1": second[1], "target": target}
+        result = default_cache().get_or_compute(oil_sweep, axes, fixed, ("Pb", "Pws"), workers=workers)
+        summary = sensitivity_table(result)
+        st.dataframe(summary.round(2), hide_index=True)
+        by_label = {METRIC_LABELS[m]: m for m in METRICS}
+        metric = by_label[st.selectbox("Metric:", list(by_label), key="sweep_metric")]
+        tornado = tornado_table(result, metric)
+        base = summary.set_index("Metric").loc[METRIC_LABELS[metric], "Mean"]
+        st.plotly_chart(tornado_figure(tornado, f"Sensitivity of {METRIC_LABELS[metric]}", base),
+                        use_container_width=True)
+        st.plotly_chart(heatmap_figure(heatmap_table(result, metric), f"{METRIC_LABELS[metric]} (m³/d), "
+                                       "mean over rates", "m³/d"), use_container_width=True)
+
+# Several producing layers in one well: entered well as the first layer plus
+# rows added in the editor; curves of each layer and of the commingled well
+def commingled_layers(Pb, Pws, Pwf, Qwf, second, num_points):
+    with st.expander("Commingled layers"):
+        layers = pd.DataFrame({"Pb (bar)": [Pb, Pb], "Pws (bar)": [Pws, Pws * 0.8],
+                               "Pwf (bar)": [Pwf, Pwf * 0.8], "Rate (m3/d)": [Qwf, Qwf / 2]})
+        layers = st.data_editor(layers, num_rows="dynamic", key="layers_editor").dropna()
+        labels = {"Vogel": "vogel", "Fetkovich": "fetkovich", "Constant J": "constant_j"}
+        label = st.selectbox("Method:", list(labels), key="layers_method")
+        crossflow = st.checkbox("Crossflow into layers below Pwf", key="layers_crossflow")
+        if layers.empty:
+            return
+        Pb_l, Pws_l, Pwf_l, Qwf_l = (layers[c].to_numpy(dtype=float) for c in layers.columns[:4])
+        # the second test point belongs to the entered (first) layer only
+        Pwf1 = np.r_[second[0], np.full(len(layers) - 1, np.nan)]
+        Qwf1 = np.r_[second[1], np.full(len(layers) - 1, np.nan)]
+        well = oil_layers(np.zeros(len(layers)), Pb_l, Pws_l, Pwf_l, Qwf_l, Pwf1, Qwf1)
+        aof = commingled_aof(well)
+        st.dataframe(pd.DataFrame({"Method": list(labels), "Commingled AOF (m³/d)":
+                                   [aof[m][0] for m in labels.values()]}).round(2), hide_index=True)
+        pwf, total = commingled_curves(well, 3 * num_points, (labels[label],), crossflow)
+        if crossflow:
+            st.caption(f"Static pressure of the commingled well: "
+                       f"{static_pressure(pwf, total[labels[label]])[0]:.2f} bar")
+        # each layer on its own, on the well's pwf grid
+        single = oil_layers(np.arange(len(layers)), Pb_l, Pws_l, Pwf_l, Qwf_l, Pwf1, Qwf1)
+        _, by_layer = commingled_curves(single, methods=(labels[label],), crossflow=crossflow, pwf=pwf)
+        show_chart(commingled_chart(pwf[0], by_layer[labels[label]], total[labels[label]][0],
+                                    [f"Layer {i + 1}" for i in range(len(layers))], label))
 
 #YE MAIN FUNCTION H:-
 def main():
@@ -100,186 +194,73 @@ def main():
         Qwf1 = data["Rate (m3/d)1"].iloc[0]
 
     # YE SARA VOGEL'S, CONSTANT J APPROACH AND FETKOVICH EQUATION (ONLY FOR SATURATED RESERVOIR):-
+        num_points = st.sidebar.number_input("Curve points per segment:", 3, 20000, 10)
+        monte_carlo = None
+        if st.sidebar.checkbox("Uncertainty bands (Monte Carlo)"):
+            replicates = st.sidebar.number_input("Monte Carlo replicates:", 100, 100000, 2000, step=100)
+            sd = {"Pb": st.sidebar.number_input("Pb std. deviation (bar):", 0.0, 500.0, 5.0),
+                  "Pws": st.sidebar.number_input("Pws std. deviation (bar):", 0.0, 500.0, 5.0)}
+            sd["Pwf"] = sd["Pwf1"] = st.sidebar.number_input("Pwf gauge std. deviation (bar):", 0.0, 100.0, 1.0)
+            rate_cv = st.sidebar.number_input("Rate error (%):", 0.0, 100.0, 5.0) / 100
+            monte_carlo = {"sd": sd, "rate_cv": rate_cv, "replicates": replicates}
+        # only the nodes downstream of a changed input are recomputed on a rerun
+        graph = session_graph().update(Pb=Pb, Pws=Pws, Pwf=Pwf, Qwf=Qwf, Pwf1=Pwf1, Qwf1=Qwf1,
+                                       num_points=num_points, monte_carlo=monte_carlo)
+        second = graph.get("second")
+        uncertainty = graph.get("uncertainty")
         if Pws<Pb:
-            Pressure_points=generate_pressure_points(Pws,0)
-            n,c=fetkovich(Pwf,Qwf,Pwf1,Qwf1,Pws)
-            Qmax=return_Qmax(Qwf,Pwf,Pws)   
-            
-            
-            st.subheader("Reservoir is Saturated Reservoir.")
-            st.write(f"Performance Coefficient C is : {c:.2f}")
-            st.write(f"Fetkovich Exponent n is : {n:.2f}")
-            Vogels_Q_values = [curve_IPR_Vogel(i, Pws, Qmax) for i in Pressure_points]
-            J = Productivity_Index(Qwf, Pws, Pwf)
-            ConstantJ_Qvalues = [curve_IPR_constJ(J, Pws, i) for i in Pressure_points]
-
-            Fetkovich_Q_values=[curve_fetkovich(n,c,i,Pws) for i in Pressure_points]         
+            res = graph.get("saturated")
 
-            st.write(f"Calculated Absolute Open Potential(AOF) from Constant J approach IPR Equation : {ConstantJ_Qvalues[-1]:.2f} m³/d") 
-            st.write(f"Calculated Absolute Open Potential(AOF) from Vogel's IPR Equation : {Vogels_Q_values[-1]:.2f} m³/d") 
-            st.write(f"Calculated Absolute Open Potential(AOF) from Fetkovich's IPR Equation : {Fetkovich_Q_values[-1]:.2f} m³/d") 
-
-            Qmax=max(ConstantJ_Qvalues[-1],Vogels_Q_values[-1],Fetkovich_Q_values[-1])
-            # Create table with serial numbers
-            df = pd.DataFrame({
-                "Pwf (bar)": Pressure_points,
-                "Vogel's Q (m³/d)": Vogels_Q_values,
-                "Constant J approach Q (m³/d)": ConstantJ_Qvalues,
-                "Fetkovich_Q_values Q (m³/d)":Fetkovich_Q_values
-            })
+            st.subheader("Reservoir is Saturated Reservoir.")
+            st.write(f"Performance Coefficient C is : {res['c']:.2f}")
+            st.write(f"Fetkovich Exponent n is : {res['n']:.2f}")
 
-            # Add Serial Number starting from 1
-            df.index = df.index + 1
-            df.index.name = "S.No"
+            st.write(f"Calculated Absolute Open Potential(AOF) from Constant J approach IPR Equation : {res['AOF_constJ']:.2f} m³/d") 
+            st.write(f"Calculated Absolute Open Potential(AOF) from Vogel's IPR Equation : {res['AOF_vogel']:.2f} m³/d") 
+            st.write(f"Calculated Absolute Open Potential(AOF) from Fetkovich's IPR Equation : {res['AOF_fetkovich']:.2f} m³/d") 
 
             st.subheader("Comparison Table")
-            st.dataframe(df)
+            st.dataframe(res["table"])
 
-            # Plotting both curves
-            plt.figure(figsize=(10, 7))
-            plt.plot( df["Constant J approach Q (m³/d)"],df["Pwf (bar)"], marker="s", label="Constant J IPR")
-            plt.plot(df["Vogel's Q (m³/d)"],df["Pwf (bar)"] , marker="o", label="Vogel's IPR")
-            plt.plot(df["Fetkovich_Q_values Q (m³/d)"],df["Pwf (bar)"],  marker="v", label="Fetkovich_Q_values")
-            plt.xlabel("Flow Rate (m³/d)")
-            plt.ylabel("Flowing Pressure (Pwf) [bar]")
-            plt.title("IPR Curve Comparison: Vogel vs Constant J vs Fetkovich")
-            plt.grid(True)
-            plt.legend()
-            plt.ylim(0,Pws+100)
-            try:
-                plt.set_xlim(0, Qmax + 100)
-            except:
-                    st.write("") 
-
-            plt.xlim(left=0)
-            plt.ylim(bottom=0)
-            st.pyplot(plt)
+            show_uncertainty(uncertainty, {"constant_j": "Constant J", "vogel": "Vogel", "fetkovich": "Fetkovich"})
+            save_to_store(Pb, Pws, Pwf, Qwf, second, num_points)
+            sensitivity_sweep(Pb, Pws, Pwf, Qwf, second)
+            commingled_layers(Pb, Pws, Pwf, Qwf, second, num_points)
+            show_chart(graph.get("saturated_chart"))
         else:
             st.subheader("Reservoir is Unsaturated Reservoir.")
-
-            Pressure_points_Pwsto_Pb=generate_pressure_points(Pws,Pb)
-            Pressure_points_Pbto_0=generate_pressure_points(Pb,0)[1:]
+            res = graph.get("undersaturated")
 
             if Pwf>Pb :
-                J=Productivity_Index(Qwf,Pws,Pwf)
-                st.write(f"Productivity Index : {J:2f}")
-                Qob=J*(Pws-Pb)
-                # Vogel:-
-                st.write(f"Flow rate at Bubble Point Pressure : {Qob:.2f}")
-                Q_above_Pb=[curve_IPR_constJ(J,Pws,i) for i in Pressure_points_Pwsto_Pb]
-                Q_below_Pb=[undersaturated1(Qob,J,Pb,i) for i in Pressure_points_Pbto_0]
-                Qmax=undersaturated1(Qob,J,Pb,0)
-                        
-                
-
-                All_Pressure_points=Pressure_points_Pwsto_Pb+Pressure_points_Pbto_0
-                All_Q_values=Q_above_Pb+Q_below_Pb
-
-                # Fetkovich:-
-                Q_below_Pb1=[(J*( (Pws-Pb) + (1/(2*Pb))*(Pb**2-i**2) )) for i in Pressure_points_Pbto_0]
-                All_Q_values1=Q_above_Pb+Q_below_Pb1
-                Qmax1=All_Q_values1[-1]
-
-                st.write(f"Calculated Absolute Open Potential(AOF) according to Vogel's IPR Equation : {Qmax:.2f} m³/d")  # fix here
-                st.write(f"Calculated Absolute Open Potential(AOF) according to Fetkovich's IPR Equation : {Qmax1:.2f} m³/d")  # fix here
-
-                df=pd.DataFrame({
-                    "Pwf (bar)":All_Pressure_points,
-                    "Vogel's Q (m³/d)":All_Q_values,
-                    "Fetkovich's Q (m³/d)":All_Q_values1
-                })
-                df.index = df.index + 1
-                df.index.name = "S.No"
-                st.dataframe( df.style.set_table_styles(
-                        [{'selector': 'td', 'props': [('text-align', 'center'),('justify-content','center')]},
-                        {'selector': 'th', 'props': [('text-align', 'center'),('justify-content','center')]}]
-                    ).set_properties(**{'text-align': 'center'}))
-                
-
-                plt.figure(figsize=(10,7))
-                plt.plot( df["Vogel's Q (m³/d)"],df["Pwf (bar)"], marker="o", label="Vogel's IPR")
-                plt.plot( df["Fetkovich's Q (m³/d)"],df["Pwf (bar)"], marker="p", label="Fetkovich's IPR")
-                plt.xlabel("Flow Rate (m³/d)")
-                plt.ylabel("Flowing Pressure (Pwf) [bar]")
-                plt.title("IPR Curve")
-                plt.grid(True)
-                plt.legend()
-                try:
-                    plt.set_xlim(0, Qmax + 100)
-                except:
-                    st.write("")
-
-                plt.ylim(0,Pws+100)
-                plt.axhline(y=Pb, color="red", linestyle="--", label="Bubble Point (Pb)")
-                plt.text(Qmax*0.5, Pb+200, "Undersaturated Reservoir Region", color="green", fontsize=10, ha="center")
-                plt.text(Qmax*0.5, Pb-200, "Saturated Reservoir Region", color="blue", fontsize=10, ha="center")
-                plt.xlim(left=0)
-                plt.ylim(bottom=0)
-                st.pyplot(plt)
+                st.write(f"Productivity Index : {res['J']:2f}")
+                st.write(f"Flow rate at Bubble Point Pressure : {res['Qob']:.2f}")
+                st.write(f"Calculated Absolute Open Potential(AOF) according to Vogel's IPR Equation : {res['AOF_vogel']:.2f} m³/d")
+                st.write(f"Calculated Absolute Open Potential(AOF) according to Fetkovich's IPR Equation : {res['AOF_fetkovich']:.2f} m³/d")
             else:
-                J=Calc_J(Qwf,Pws,Pb,Pwf)
-                J1=Productivity_Index(Qwf,Pws,Pwf)
-                st.write(f"Vogels's productivity Index : {J:.2f}")
-                st.write(f"Fetkovich's productivity Index : {J1:.2f}")
-                # Vogel
-                Qob=J*(Pws-Pb)
-                st.write(f"Flow rate at Bubble Point Pressure using Vogel's Equation : {Qob:.2f} m³/d")
-
-                Pressure_points_Pwsto_Pb=generate_pressure_points(Pws,Pb)
-                Pressure_points_Pbto_0=generate_pressure_points(Pb,0)[1:]
-
-                Q_above_Pb=[(J*(Pws-i)) for i in Pressure_points_Pwsto_Pb]
-                Q_below_Pb=[(Qob + ((J*Pb)/1.8)*(1 - 0.2*(i/Pb) - 0.8*(i/Pb)**2)) for i in Pressure_points_Pbto_0]
-                
-                All_Pressure_points=Pressure_points_Pwsto_Pb+Pressure_points_Pbto_0
-                All_Q_values=Q_above_Pb+Q_below_Pb
-
-            # Fetkovich
-                Qob1=J1*(Pws-Pb)
-                st.write(f"Flow rate at Bubble Point Pressure using Fetkovich's Equation : {Qob1:.2f} m³/d")
-                Q_above_Pb1=[(J1*(Pws-i)) for i in Pressure_points_Pwsto_Pb]
-                Q_below_Pb1=[(J1*( (Pws-Pb) + (1/(2*Pb))*(Pb**2-i**2) )) for i in Pressure_points_Pbto_0]
-                All_Q_values1=Q_above_Pb1+Q_below_Pb1
-
-                Qmax=All_Q_values[-1]
-                Qmax1=All_Q_values1[-1]
-                st.write(f"Calculated Absolute Open Potential(AOF) from Vogel's IPR : {Qmax:.2f} m³/d") 
-                st.write(f"Calculated Absolute Open Potential(AOF) from Fetkovich's IPR : {Qmax1:.2f} m³/d") 
-
-                df=pd.DataFrame({
-                    "Pwf (bar)":All_Pressure_points,
-                    "Vogel's Q (m³/d)":All_Q_values,
-                    "Fetkovich's Q (m³/d)":All_Q_values1
-                })
-                df.index = df.index + 1
-                df.index.name = "S.No"
-                st.dataframe( df.style.set_table_styles(
-                        [{'selector': 'td', 'props': [('text-align', 'center'),('justify-content','center')]},
-                        {'selector': 'th', 'props': [('text-align', 'center'),('justify-content','center')]}]
-                    ).set_properties(**{'text-align': 'center'}))
-                
-                Qmaxt=max(All_Q_values[-1],All_Q_values1[-1])
-                plt.figure(figsize=(10,7))
-                plt.plot( df["Vogel's Q (m³/d)"],df["Pwf (bar)"], marker="o", label="Vogel's IPR")
-                plt.plot( df["Fetkovich's Q (m³/d)"],df["Pwf (bar)"], marker="p", label="Fetkovich IPR")
-                plt.xlabel("Flow Rate (m³/d)")
-                plt.ylabel("Flowing Pressure (Pwf) [bar]")
-                plt.title("IPR Curve")
-                plt.grid(True)
-                plt.legend()
-                try:
-                    plt.set_xlim(0, Qmaxt + 100)
-                except:
-                    st.write("")
-
-                plt.ylim(0,Pws+100)
-                plt.axhline(y=Pb, color="red", linestyle="--", label="Bubble Point (Pb)")
-                plt.text(Qmaxt*0.5, Pb+200, "Undersaturated Reservoir Region", color="green", fontsize=10, ha="center")
-                plt.text(Qmaxt*0.5, Pb-200, "Saturated Reservoir Region", color="blue", fontsize=10, ha="center")
-
-                plt.xlim(left=0)
-                plt.ylim(bottom=0)
-                st.pyplot(plt)
+                st.write(f"Vogels's productivity Index : {res['J']:.2f}")
+                st.write(f"Fetkovich's productivity Index : {res['J1']:.2f}")
+                st.write(f"Flow rate at Bubble Point Pressure using Vogel's Equation : {res['Qob']:.2f} m³/d")
+                st.write(f"Flow rate at Bubble Point Pressure using Fetkovich's Equation : {res['Qob1']:.2f} m³/d")
+                st.write(f"Calculated Absolute Open Potential(AOF) from Vogel's IPR : {res['AOF_vogel']:.2f} m³/d") 
+                st.write(f"Calculated Absolute Open Potential(AOF) from Fetkovich's IPR : {res['AOF_fetkovich']:.2f} m³/d") 
+
+            with profiling.stage("styled_table"):
+                st.dataframe(graph.get("styled_table"))
+
+            show_uncertainty(uncertainty, {"vogel": "Vogel", "fetkovich": "Fetkovich"})
+            save_to_store(Pb, Pws, Pwf, Qwf, second, num_points)
+            sensitivity_sweep(Pb, Pws, Pwf, Qwf, second)
+            commingled_layers(Pb, Pws, Pwf, Qwf, second, num_points)
+            show_chart(graph.get("undersaturated_chart"))
+
+        stats = default_cache().stats()
+        st.sidebar.caption(f"Result cache: {stats['hits'] + stats['disk_hits']} hits, "
+                           f"{stats['misses']} misses, {stats['entries']} entries")
+        st.sidebar.caption(f"Recomputed {len(graph.recomputed)} of {len(graph.nodes)} steps")
+        show_render_timings()
 
 if __name__ == "__main__":
-    main()
+    diagnostics = st.sidebar.checkbox("Diagnostics panel", profiling.ENABLED)
+    with profiling.page_run("oil_reservoir", diagnostics) as run:
+        main()
+    show_diagnostics(run)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from ipr.nodal import operating_points, quadratic_outflow, vogel_ipr
+
+
+def vogel(pwf, Pws=200.0, Qmax=1000.0):
+    return Qmax * (1 - 0.2 * pwf / Pws - 0.8 * (pwf / Pws) ** 2)
+
+
+# J-shaped outflow needing more than Pws at zero rate still crosses the IPR
+def test_j_shaped_outflow_flows_at_stable_point():
+    r = operating_points(vogel_ipr([200], [1000]), quadratic_outflow([0], [210], [-0.4], [4e-4]), 200)
+    assert r["flowing"].all()
+    pwf = r["pwf"][0, 0]
+    assert abs(pwf - 115.5) < 0.1
+    q = vogel(pwf)
+    assert abs(210 - 0.4 * q + 4e-4 * q**2 - pwf) < 1e-6
+    assert abs(r["q"][0, 0] - q) < 1e-6
+
+
+def test_monotone_outflow_matches_intersection():
+    r = operating_points(vogel_ipr([200, 300], [1000, 500]), quadratic_outflow([20, 40], [50, 60], 0.0, [1e-4, 2e-4]),
+                         np.array([[200.0], [300.0]]))
+    assert r["flowing"].all()
+    Pws = np.array([[200.0], [300.0]])
+    Qmax = np.array([[1000.0], [500.0]])
+    q = vogel(r["pwf"], Pws, Qmax)
+    vlp = np.array([[20, 40]]) + np.array([[50, 60]]) + np.array([[1e-4, 2e-4]]) * q**2
+    np.testing.assert_allclose(vlp, r["pwf"], atol=1e-6)
+
+
+def test_outflow_above_ipr_does_not_flow():
+    r = operating_points(vogel_ipr([200], [1000]), quadratic_outflow([0], [250]), 200)
+    assert not r["flowing"].any()
+    assert np.isnan(r["pwf"]).all() and (r["q"] == 0).all()
@@ -0,0 +1,11 @@
+import numpy as np
+
+from ipr.service import parse_oil_curve, run_oil_curve
+
+
+# Qob = 500 at Pb = 200 with J = 5 puts Pws at 300
+def test_composite_vogel_above_and_below_pb():
+    body = {"method": "composite_vogel", "Qob": 500, "J": 5, "Pb": 200, "pwf": [300, 250, 200, 100, 0]}
+    rate = run_oil_curve([parse_oil_curve(body)])[0]["rate"]
+    vogel = 500 + 5 * 200 / 1.8 * (1 - 0.2 * 0.5 - 0.8 * 0.5**2)
+    np.testing.assert_allclose(rate, [0.0, 250.0, 500.0, vogel, 500 + 5 * 200 / 1.8])
@@ -0,0 +1,27 @@
+import numpy as np
+
+from ipr.store import ResultStore
+
+
+# A gas and an oil fit of the same well and date are both kept
+def test_gas_and_oil_fit_same_well_and_date(tmp_path):
+    with ResultStore(tmp_path / "results.db") as store:
+        store.upsert_fits({"well_id": ["W1"], "Pr": [3000.0], "AOF_psi": [9000.0]}, "2024-01-01", "gas")
+        store.upsert_fits({"well_id": ["W1"], "Pws": [250.0], "AOF_vogel": [800.0]}, "2024-01-01", "oil")
+        pwf = np.array([[3000.0, 0.0]])
+        store.upsert_curves(["W1"], "2024-01-01", pwf, {"bp": [[0.0, 9000.0]]}, "gas")
+        store.upsert_curves(["W1"], "2024-01-01", pwf / 12, {"vogel": [[0.0, 800.0]]}, "oil")
+
+        assert store.count("fits") == 2
+        assert store.count("curves") == 2
+        df = store.history(["W1"])
+        assert df["kind"].tolist() == ["gas", "oil"]
+        assert store.history(["W1"], kind="gas")["AOF_psi"].tolist() == [9000.0]
+        assert store.history(["W1"], kind="oil")["AOF_vogel"].tolist() == [800.0]
+        assert list(store.curves("W1", kind="gas")["2024-01-01"][1]) == ["bp"]
+        assert list(store.curves("W1", kind="oil")["2024-01-01"][1]) == ["vogel"]
+
+        # a refit replaces only the row of its own kind
+        store.upsert_fits({"well_id": ["W1"], "Pr": [3000.0], "AOF_psi": [9500.0]}, "2024-01-01", "gas")
+        assert store.count("fits") == 2
+        assert store.trend(["W1"], "AOF_psi", kind="gas").iloc[0, 0] == 9500.0